@@ -1,158 +1,25 @@
 import streamlit as st
 import pandas as pd
 import sys
-import plotly.express as px
 import numpy as np
 import json
 import io
 from datetime import datetime
 import os
-
-# ===== FINANCE TAXONOMY =====
-STANDARD_FINANCE_CATEGORIES = [
-    # Core Finance
-    "Quantitative Finance",
-    "Corporate Finance",
-    "Banking",
-    "Risk Management",
-    "Asset Pricing",
-    "Financial Econometrics",
-    "Investment Analysis",
-    "Financial Markets",
-
-    # Technology
-    "Fintech",
-    "Digital Finance",
-    "Cryptocurrency",
-
-    # Sustainability
-    "Sustainable Finance",
-    "Green Finance",
-    "Climate Finance",
-
-    # Policy & Regulation
-    "Financial Regulation",
-    "Monetary Policy",
-
-    # Chinese Research Categories
-    "养老金融",
-    "绿色金融",
-    "气候金融",
-    "数字金融",
-    "金融科技",
-    "货币政策"
-]
-
-# Keyword-based deep classification
-CATEGORY_KEYWORDS = {
-
-    # ===== Quantitative & Modeling =====
-    "Quantitative Finance": [
-        "quantitative", "stochastic", "pricing model", "ito",
-        "martingale", "numerical method",
-        "随机", "定价模型", "数值方法"
-    ],
-
-    "Asset Pricing": [
-        "asset pricing", "capm", "factor model",
-        "expected return", "risk premium",
-        "资产定价", "风险溢价", "因子模型"
-    ],
-
-    "Financial Econometrics": [
-        "econometric", "panel data", "time series",
-        "garch", "cointegration",
-        "计量经济", "面板数据", "时间序列", "协整"
-    ],
-
-    # ===== Corporate & Banking =====
-    "Corporate Finance": [
-        "corporate finance", "capital structure",
-        "dividend policy", "firm value",
-        "公司金融", "资本结构", "企业价值"
-    ],
-
-    "Banking": [
-        "bank", "commercial bank", "credit risk",
-        "loan", "deposit",
-        "银行", "信贷", "不良贷款"
-    ],
-
-    "Risk Management": [
-        "risk management", "var", "cvar",
-        "stress test", "volatility",
-        "风险管理", "压力测试", "波动率"
-    ],
-
-    # ===== Digital & Tech =====
-    "Fintech": [
-        "fintech", "financial technology",
-        "machine learning", "ai finance",
-        "金融科技", "人工智能金融"
-    ],
-
-    "Digital Finance": [
-        "digital finance", "platform finance",
-        "internet finance",
-        "数字金融", "互联网金融"
-    ],
-
-    "Cryptocurrency": [
-        "cryptocurrency", "bitcoin", "blockchain",
-        "defi", "smart contract",
-        "加密货币", "区块链"
-    ],
-
-    # ===== Sustainability =====
-    "Sustainable Finance": [
-        "sustainable finance", "esg",
-        "responsible investment",
-        "可持续金融", "责任投资"
-    ],
-
-    "Green Finance": [
-        "green finance", "green bond", "green credit",
-        "renewable energy finance",
-        "绿色金融", "绿色债券", "绿色信贷"
-    ],
-
-    "Climate Finance": [
-        "climate finance", "climate risk",
-        "carbon pricing", "carbon market",
-        "carbon emission",
-        "气候金融", "气候风险",
-        "碳定价", "碳交易", "碳排放"
-    ],
-
-    # ===== Policy =====
-    "Monetary Policy": [
-        "monetary policy", "interest rate",
-        "central bank",
-        "货币政策", "利率", "央行"
-    ],
-
-    # ===== Chinese-specific =====
-    "养老金融": [
-        "养老金融", "养老金", "退休"
-    ]
-}
-
-def deep_classify_paper(title, abstract):
-    text = f"{title} {abstract}".lower()
-    scores = {}
-
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        score = 0
-        for kw in keywords:
-            if kw.lower() in text:
-                score += 1
-        if score > 0:
-            scores[category] = score
-
-    if scores:
-        return max(scores, key=scores.get)
-
-    return "Financial Markets"
+from concurrent.futures.process import BrokenProcessPool
+
+from src.analytics import open_stats_cube
+from src.batch_extract import DEFAULT_WORKERS, MAX_WORKERS, extract_upload, iter_extracted, make_pool
+from src.facets import FACET_COLUMNS, FacetIndex
+from src.result_cache import ResultCache, cache_key, content_hash
+from src.search_index import open_search_index
+from src.similarity import open_similarity_index
+from src.core import (
+    classifier_fingerprint, classify_text, find_corpus_file, load_classifier, open_library, ranked_results, temperature
+)
+from src.taxonomy import TAXONOMY
+from src.text_model import MODEL_PATH
+from src.timing import TIMINGS_ENV, timings
 
 st.set_page_config(
     page_title="Finance Research Classifier",
@@ -216,154 +83,224 @@ def safe_link_button(label, url, key=None):
         unsafe_allow_html=True
     )
 
-# ===== LOAD RESEARCH PAPERS FROM JSON =====
+# ===== LOAD RESEARCH PAPERS FROM JSON / JSON LINES =====
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGE_SIZES = [10, 25, 50, 100]
+
+@st.cache_resource(max_entries=4, show_spinner="Loading research library...")
+def build_papers_frame(corpus_path, mtime_ns, file_size):
+    """
+    Open the columnar corpus cache once per (path, mtime, size), building it
+    from the JSON on first use. Abstracts stay on disk until needed.
+    The result is shared by every session, so callers must not mutate it.
+    """
+    return open_library(corpus_path)
+
+
+@st.cache_resource(max_entries=2)
+def load_facet_index(cache_dir, _papers_df):
+    """Facet bitmaps for the library filters, built once per corpus"""
+    return FacetIndex(_papers_df)
+
+
+@st.cache_resource(max_entries=2, show_spinner="Building statistics...")
+def load_stats_cube(cache_dir, _corpus, _papers_df):
+    """Category x year x language aggregates, built once per corpus"""
+    return open_stats_cube(_corpus, _papers_df)
+
+
+@st.cache_resource(max_entries=2, show_spinner="Building search index...")
+def load_search_index(cache_dir, _corpus):
+    """Inverted index stored next to the columnar cache, built once per corpus"""
+    return open_search_index(_corpus)
+
+
+@st.cache_resource(max_entries=2, show_spinner="Building related-papers index...")
+def load_similarity_index(cache_dir, _corpus):
+    """Title + abstract vectors for "Related papers", built once per corpus"""
+    return open_similarity_index(_corpus)
+
+
 def load_research_papers():
     try:
-        BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-        json_file_path = os.path.join(BASE_DIR, "finance_research_papers.json")
-
-        if not os.path.exists(json_file_path):
-            st.error(f"❌ Missing file: {json_file_path}")
-            return pd.DataFrame(), []
-
-        with open(json_file_path, "r", encoding="utf-8") as f:
-            all_papers = json.load(f)
-
-        papers_df = pd.DataFrame(all_papers)
-
-        # Fill NaN values for URL columns
-        for col in ["arxiv_url", "pdf_url", "doi"]:
-            if col in papers_df.columns:
-                papers_df[col] = papers_df[col].fillna("")
-
-        # Apply deep classification
-        papers_df["category"] = papers_df.apply(
-            lambda row: deep_classify_paper(
-                row.get("title", ""),
-                row.get("abstract", "")
-            ),
-            axis=1
-        )
-
-        papers_df["year"] = pd.to_numeric(
-            papers_df.get("year", 2025),
-            errors="coerce"
-        ).fillna(2025).astype(int)
+        corpus_path = find_corpus_file(APP_DIR)
+
+        if not os.path.exists(corpus_path):
+            st.error(f"❌ Missing file: {corpus_path}")
+            return pd.DataFrame(), None
+
+        # Cache key changes whenever the file is rewritten
+        file_stat = os.stat(corpus_path)
+        with timings.stage("load_library"):
+            papers_df, corpus = build_papers_frame(
+                corpus_path,
+                file_stat.st_mtime_ns,
+                file_stat.st_size
+            )
 
-        papers_df["language"] = papers_df.get("language", "Unknown")
+        if papers_df.empty:
+            st.sidebar.error("❌ No papers found in the corpus file!")
+            return papers_df, corpus
 
         # Debug info
         st.sidebar.success(f"✅ Loaded {len(papers_df)} papers")
+        n_duplicates = corpus.meta.get("duplicates_removed", 0)
+        if n_duplicates:
+            st.sidebar.write(f"🧹 Near-duplicates removed: {n_duplicates}")
         st.sidebar.write(f"📊 Categories: {papers_df['category'].nunique()}")
         st.sidebar.write(f"🌐 Languages: {papers_df['language'].value_counts().to_dict()}")
 
-        return papers_df, all_papers
+        return papers_df, corpus
 
     except Exception as e:
         st.error(f"❌ Load error: {e}")
-        return pd.DataFrame(), []
+        return pd.DataFrame(), None
 
 
-# ===== DEEP CLASSIFICATION FOR LIBRARY =====
-        papers_df["category"] = papers_df.apply(
-            lambda row: deep_classify_paper(
-                row.get("title", ""),
-                row.get("abstract", "")
-            ),
-            axis=1
-        )
+# Load papers
+papers_df, papers_corpus = load_research_papers()
 
-        
-        # Debug: Show raw data info
-        st.sidebar.write("📊 Data Load Debug:")
-        st.sidebar.write(f"  Number of papers: {len(papers_df)}")
-        st.sidebar.write(f"  DataFrame columns: {papers_df.columns.tolist()}")
-        
-        # Check if DataFrame is empty
-        if papers_df.empty:
-            st.sidebar.error("❌ DataFrame is EMPTY after loading!")
-            return pd.DataFrame(), []
-        
-        # Ensure required columns exist
-        required_columns = ['title', 'authors', 'abstract', 'year', 'category', 'language']
-        missing_columns = [col for col in required_columns if col not in papers_df.columns]
-        
-        if missing_columns:
-            st.sidebar.warning(f"⚠️ Missing columns: {missing_columns}")
-            for col in missing_columns:
-                if col == 'title':
-                    papers_df[col] = [f"Paper {i+1}" for i in range(len(papers_df))]
-                elif col == 'authors':
-                    papers_df[col] = [["Unknown Author"] for _ in range(len(papers_df))]
-                elif col == 'abstract':
-                    papers_df[col] = ["No abstract available" for _ in range(len(papers_df))]
-                elif col == 'year':
-                    papers_df[col] = 2025
-                elif col == 'category':
-                    papers_df[col] = 'Uncategorized'
-                elif col == 'language':
-                    papers_df[col] = 'Unknown'
-        
-        # Convert year to integer
-        if 'year' in papers_df.columns:
-            papers_df['year'] = pd.to_numeric(papers_df['year'], errors='coerce').fillna(2025).astype(int)
-        
-        # Ensure URLs exist
-        papers_df['arxiv_url'] = papers_df.get('arxiv_url', '')
-        papers_df['pdf_url'] = papers_df.get('pdf_url', '')
-        papers_df['doi'] = papers_df.get('doi', '')
-        
-        # Clean authors column
-        def clean_authors(authors):
-            if isinstance(authors, list):
-                return authors
-            elif isinstance(authors, str):
-                try:
-                    import ast
-                    return ast.literal_eval(authors)
-                except:
-                    return [authors]
-            else:
-                return ["Unknown Author"]
-        
-        if 'authors' in papers_df.columns:
-            papers_df['authors'] = papers_df['authors'].apply(clean_authors)
-        
-        # Show data summary
-        st.sidebar.success(f"✅ Successfully processed {len(papers_df)} papers")
-        
-        # Show sample of data
-        with st.sidebar.expander("📋 Show Data Sample", expanded=False):
-            st.write("First 3 papers:")
-            st.dataframe(papers_df[['id', 'title', 'category', 'language', 'year']].head(3))
-            
-            # Language distribution
-            if 'language' in papers_df.columns:
-                lang_dist = papers_df['language'].value_counts()
-                st.write("Language distribution:")
-                for lang, count in lang_dist.items():
-                    st.write(f"  {lang}: {count}")
-            
-            # Category distribution
-            if 'category' in papers_df.columns:
-                cat_dist = papers_df['category'].value_counts()
-                st.write("Category distribution:")
-                for cat, count in cat_dist.head(10).items():  # Show top 10
-                    st.write(f"  {cat}: {count}")
-        
-        return papers_df, all_papers
-        
-    except Exception as e:
-        st.sidebar.error(f"❌ Error in load_research_papers: {str(e)}")
-        import traceback
-        st.sidebar.error(f"Traceback: {traceback.format_exc()}")
-        # Return empty DataFrame and list
-        return pd.DataFrame(), []
 
-# Load papers
-papers_df, papers_list = load_research_papers()
+def get_paper_abstract(row_id):
+    """Read one abstract from the columnar cache"""
+    if papers_corpus is None:
+        return ""
+    return papers_corpus.text("abstract", row_id)
 
 # ===== RESEARCH LIBRARY FUNCTIONS =====
+def display_paper_details(row_id, paper):
+    """Full card for one paper: metadata, abstract, links and classify button"""
+    paper_id = paper.get('id', row_id)
+    paper_title = paper.get('title', 'Untitled')
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        # Paper title and authors
+        st.markdown(f"### {paper_title}")
+    
+        # Authors
+        authors = paper.get('authors', [])
+        if authors and isinstance(authors, list):
+            authors_str = ", ".join(authors)
+            st.markdown(f"**Authors:** {authors_str}")
+        elif authors:
+            st.markdown(f"**Authors:** {authors}")
+    
+        # Year and category
+        meta_cols = st.columns(4)
+        with meta_cols[0]:
+            if 'year' in paper:
+                st.metric("Year", int(paper['year']))
+        with meta_cols[1]:
+            if 'category' in paper:
+                st.metric("Category", paper['category'])
+        with meta_cols[2]:
+            if 'language' in paper:
+                st.metric("Language", paper['language'])
+        with meta_cols[3]:
+            if 'word_count' in paper:
+                st.metric("Words", paper['word_count'])
+    
+        # Abstract
+        st.markdown("#### Abstract")
+        abstract = get_paper_abstract(row_id) or 'No abstract available'
+        if isinstance(abstract, str):
+            if len(abstract) > 500:
+                st.write(abstract[:500] + "...")
+            else:
+                st.write(abstract)
+        else:
+            st.write(str(abstract))
+    
+        # Source and keywords
+        source = paper.get('source', '')
+        if source:
+            st.markdown(f"**Source:** {source}")
+    
+        keywords = paper.get('keywords', '')
+        if keywords:
+            st.markdown(f"**Keywords:** {keywords}")
+    
+    with col2:
+        # Quick actions and links
+        st.markdown("#### 🔗 Quick Links")
+    
+        # Use safe_link_button for all links
+        arxiv_url = paper.get('arxiv_url', '')
+        pdf_url = paper.get('pdf_url', '')
+        doi_value = paper.get('doi', '')
+    
+        # arXiv button
+        safe_link_button(
+            "📄 arXiv", 
+            arxiv_url,
+            key=f"arxiv_{paper_id}"
+        )
+    
+        # PDF button
+        safe_link_button(
+            "📥 PDF", 
+            pdf_url,
+            key=f"pdf_{paper_id}"
+        )
+    
+        # DOI button
+        if doi_value and isinstance(doi_value, str) and doi_value.strip():
+            doi_url = f"https://doi.org/{doi_value}"
+            safe_link_button(
+                "🔗 DOI", 
+                doi_url,
+                key=f"doi_{paper_id}"
+            )
+    
+        # Search link
+        if 'title' in paper:
+            search_url = f"https://scholar.google.com/scholar?q={paper['title'].replace(' ', '+')}"
+            st.link_button("🔍 Search", search_url)
+    
+        # Additional info
+        st.markdown("---")
+        keywords = paper.get('keywords', '')
+        if keywords and isinstance(keywords, str) and keywords.strip():
+            if len(keywords) > 50:
+                st.caption(f"**Keywords:** {keywords[:50]}...")
+            else:
+                st.caption(f"**Keywords:** {keywords}")
+    
+        # Classify this paper button
+        if st.button("🤖 Classify this paper", key=f"classify_{paper_id}"):
+            st.session_state.selected_paper_for_classification = paper.get('title', '')
+            st.session_state.paper_abstract_for_classification = get_paper_abstract(row_id)
+            st.rerun()
+    
+        show_related = st.toggle("🧭 Related papers", key=f"related_{paper_id}")
+    
+    if show_related:
+        display_related_papers(row_id)
+
+
+def display_related_papers(row_id, k=5):
+    """The k papers closest to row_id by title + abstract (cosine similarity)"""
+    if papers_corpus is None:
+        return
+    with timings.stage("related_papers"):
+        index = load_similarity_index(papers_corpus.cache_dir, papers_corpus)
+        related_rows, scores = index.related(row_id, k)
+    
+    st.markdown("#### 🧭 Related papers")
+    if not len(related_rows):
+        st.caption("No related papers found.")
+        return
+    for related_row, score in zip(related_rows, scores):
+        related = papers_df.iloc[int(related_row)]
+        title = related.get('title', 'Untitled')
+        url = related.get('arxiv_url', '')
+        label = f"[{title}]({url})" if isinstance(url, str) and url.startswith("http") else title
+        details = " · ".join(str(v) for v in (related.get('year', ''), related.get('category', '')) if v != '')
+        st.markdown(f"- {label} ({details}) — similarity {score:.2f}")
+
+
 def display_research_library():
     """Display the research library interface"""
     st.header("📚 Research Library")
@@ -395,35 +332,25 @@ def display_research_library():
     # Show data info
     st.success(f"✅ Loaded {len(papers_df)} research papers")
     
-    # Display statistics
+    # Display statistics (from the precomputed aggregate cube)
+    cube = load_stats_cube(papers_corpus.cache_dir, papers_corpus, papers_df)
+    languages = cube.marginal("language")
     stats_cols = st.columns(5)
     with stats_cols[0]:
-        st.metric("Total Papers", len(papers_df))
+        st.metric("Total Papers", cube.total)
     with stats_cols[1]:
-        if 'category' in papers_df.columns:
-            unique_categories = papers_df['category'].nunique()
-        else:
-            unique_categories = 0
-        st.metric("Categories", unique_categories)
+        st.metric("Categories", len(cube.marginal("category")))
     with stats_cols[2]:
-        if 'year' in papers_df.columns:
-            recent_year = int(papers_df['year'].max())
-        else:
-            recent_year = 2025
-        st.metric("Latest Year", recent_year)
+        st.metric("Latest Year", max(cube.marginal("year"), default=2025))
     with stats_cols[3]:
-        if 'language' in papers_df.columns:
-            english_count = len(papers_df[papers_df['language'] == 'English'])
-            chinese_count = len(papers_df[papers_df['language'] == 'Chinese'])
-            st.metric("Languages", f"EN:{english_count}/CN:{chinese_count}")
-        else:
-            st.metric("Languages", "Unknown")
+        english_count = languages.get('English', 0)
+        chinese_count = languages.get('Chinese', 0)
+        st.metric("Languages", f"EN:{english_count}/CN:{chinese_count}")
     with stats_cols[4]:
-        if 'word_count' in papers_df.columns:
-            total_words = papers_df['word_count'].sum()
-            st.metric("Total Words", f"{total_words:,}")
-        else:
-            st.metric("Total Words", "N/A")
+        st.metric("Total Words", f"{cube.total_words:,}")
+    
+    # Facet bitmaps for the category / year / language filters
+    facets = load_facet_index(papers_corpus.cache_dir, papers_df)
     
     # Search and filter section
     with st.container():
@@ -431,98 +358,96 @@ def display_research_library():
         
         search_cols = st.columns([2, 1, 1, 1, 1])
         with search_cols[0]:
-            search_query = st.text_input("Search papers (title, authors, abstract)", "")
+            search_query = st.text_input(
+                "Search papers (title, authors, abstract)",
+                "",
+                help='Words match as prefixes; use "quotes" for exact phrases'
+            )
         
+        # Apply search first so the facet counts below reflect it
+        hit_ids = None
+        search_mask = None
+        if search_query:
+            try:
+                # Ranked lookup in the inverted index (row ids, best BM25 first)
+                search_index = load_search_index(papers_corpus.cache_dir, papers_corpus)
+                with timings.stage("search"):
+                    hit_ids, _ = search_index.search(search_query)
+                search_mask = facets.rows_bitmap(hit_ids)
+                st.sidebar.info(f"After search: {len(hit_ids)} papers")
+            except Exception as e:
+                st.error(f"Search error: {e}")
+
+        # Counts for each dropdown apply the search and the other filters
+        previous = {
+            col: st.session_state.get(f"library_{col}", "All")
+            for col in FACET_COLUMNS
+        }
+        with timings.stage("facet_counts"):
+            counts = facets.facet_counts(
+                {col: (None if value == "All" else value) for col, value in previous.items()},
+                base=search_mask
+            )
+
+        def facet_selectbox(label, column):
+            column_counts = counts.get(column, {})
+            return st.selectbox(
+                label,
+                ["All"] + facets.values.get(column, []),
+                format_func=lambda v: v if v == "All" else f"{v} ({column_counts.get(v, 0)})",
+                key=f"library_{column}"
+            )
+
         with search_cols[1]:
-            # Get available categories
-            if 'category' in papers_df.columns and not papers_df.empty:
-                # Get unique categories, handle NaN values
-                categories = papers_df['category'].dropna().unique().tolist()
-                categories = sorted([str(c) for c in categories if c])  # Convert to string and remove empty
-            else:
-                categories = []
-            selected_category = st.selectbox("Category", ["All"] + categories)
+            selected_category = facet_selectbox("Category", "category")
         
         with search_cols[2]:
-            # Get available years
-            if 'year' in papers_df.columns and not papers_df.empty:
-                years = sorted(papers_df['year'].dropna().unique().tolist(), reverse=True)
-                years = [int(y) for y in years]  # Ensure integer
-            else:
-                years = []
-            selected_year = st.selectbox("Year", ["All"] + [str(y) for y in years])
+            selected_year = facet_selectbox("Year", "year")
         
         with search_cols[3]:
-            # Get available languages
-            if 'language' in papers_df.columns and not papers_df.empty:
-                languages = sorted(papers_df['language'].dropna().unique().tolist())
-            else:
-                languages = []
-            selected_language = st.selectbox("Language", ["All"] + languages)
+            selected_language = facet_selectbox("Language", "language")
         
         with search_cols[4]:
-            sort_by = st.selectbox("Sort by", ["Newest", "Oldest", "Title A-Z", "Title Z-A"])
-    
-    # Apply filters
-    filtered_df = papers_df.copy()
+            sort_by = st.selectbox(
+                "Sort by",
+                ["Newest", "Oldest", "Title A-Z", "Title Z-A", "Relevance"],
+                help="Relevance ranks search results by BM25"
+            )
     
     # Debug: Show initial count
-    st.sidebar.info(f"Initial papers: {len(filtered_df)}")
-    
-    # Apply search
-    if search_query:
-        try:
-            # Search in title
-            title_mask = filtered_df['title'].astype(str).str.contains(search_query, case=False, na=False)
-            
-            # Search in abstract
-            abstract_mask = filtered_df['abstract'].astype(str).str.contains(search_query, case=False, na=False)
-            
-            # Search in authors
-            def search_in_authors(authors, query):
-                if isinstance(authors, list):
-                    return any(query.lower() in str(auth).lower() for auth in authors)
-                elif isinstance(authors, str):
-                    return query.lower() in authors.lower()
-                return False
-            
-            author_mask = filtered_df['authors'].apply(lambda x: search_in_authors(x, search_query))
-            
-            # Combine conditions
-            mask = title_mask | abstract_mask | author_mask
-            filtered_df = filtered_df[mask]
-            st.sidebar.info(f"After search: {len(filtered_df)} papers")
-        except Exception as e:
-            st.error(f"Search error: {e}")
+    st.sidebar.info(f"Initial papers: {len(papers_df)}")
     
-    # Apply category filter
-    if selected_category != "All" and 'category' in filtered_df.columns and len(filtered_df) > 0:
-        filtered_df = filtered_df[filtered_df['category'] == selected_category]
-        st.sidebar.info(f"After category filter: {len(filtered_df)} papers")
-    
-    # Apply year filter
-    if selected_year != "All" and 'year' in filtered_df.columns and len(filtered_df) > 0:
-        filtered_df = filtered_df[filtered_df['year'] == int(selected_year)]
-        st.sidebar.info(f"After year filter: {len(filtered_df)} papers")
-    
-    # Apply language filter
-    if selected_language != "All" and 'language' in filtered_df.columns and len(filtered_df) > 0:
-        filtered_df = filtered_df[filtered_df['language'] == selected_language]
-        st.sidebar.info(f"After language filter: {len(filtered_df)} papers")
+    # Apply filters by intersecting the precomputed facet bitmaps
+    selections = {
+        "category": None if selected_category == "All" else selected_category,
+        "year": None if selected_year == "All" else selected_year,
+        "language": None if selected_language == "All" else selected_language,
+    }
+    with timings.stage("filter"):
+        mask = facets.select(selections, base=search_mask)
     
-    # Apply sorting
-    if len(filtered_df) > 0:
+        # Apply sorting on row ids
         try:
-            if sort_by == "Newest" and 'year' in filtered_df.columns:
-                filtered_df = filtered_df.sort_values('year', ascending=False)
-            elif sort_by == "Oldest" and 'year' in filtered_df.columns:
-                filtered_df = filtered_df.sort_values('year', ascending=True)
-            elif sort_by == "Title A-Z" and 'title' in filtered_df.columns:
-                filtered_df = filtered_df.sort_values('title')
-            elif sort_by == "Title Z-A" and 'title' in filtered_df.columns:
-                filtered_df = filtered_df.sort_values('title', ascending=False)
+            if sort_by == "Relevance" and hit_ids is not None:
+                # Keep the BM25 order returned by the search index
+                row_ids = hit_ids[facets.contains(mask, hit_ids)]
+            else:
+                row_ids = facets.rows(mask)
+                if sort_by == "Newest":
+                    row_ids = facets.sort_rows(row_ids, "year", descending=True)
+                elif sort_by == "Oldest":
+                    row_ids = facets.sort_rows(row_ids, "year")
+                elif sort_by == "Title A-Z":
+                    row_ids = facets.sort_rows(row_ids, "title")
+                elif sort_by == "Title Z-A":
+                    row_ids = facets.sort_rows(row_ids, "title", descending=True)
         except Exception as e:
             st.error(f"Sorting error: {e}")
+            row_ids = facets.rows(mask)
+    
+        # Only the matching rows are materialized
+        filtered_df = papers_df.iloc[row_ids]
+    st.sidebar.info(f"After filters: {facets.count(mask)} papers")
     
     # Display results
     if filtered_df.empty or len(filtered_df) == 0:
@@ -550,249 +475,147 @@ def display_research_library():
     else:
         st.success(f"Found {len(filtered_df)} papers")
         
-        # Display papers
-        for idx, paper in filtered_df.iterrows():
-            paper_id = paper.get('id', idx)
-            paper_title = paper.get('title', 'Untitled')
-            paper_language = paper.get('language', 'Unknown')
+        # Pagination: only the papers on the visible page build widgets
+        page_cols = st.columns([2, 1, 1])
+        with page_cols[0]:
+            view_mode = st.radio(
+                "View",
+                ["Cards", "Compact table"],
+                horizontal=True,
+                key="library_view"
+            )
+        with page_cols[1]:
+            page_size = st.selectbox("Per page", PAGE_SIZES, index=1, key="library_page_size")
+        
+        n_pages = max(1, -(-len(row_ids) // page_size))
+        # Back to the first page whenever the result set changes
+        result_key = (search_query, selected_category, selected_year, selected_language, sort_by, page_size)
+        if st.session_state.get("library_result_key") != result_key:
+            st.session_state.library_result_key = result_key
+            st.session_state.library_page = 1
+        st.session_state.library_page = min(st.session_state.get("library_page", 1), n_pages)
+        
+        with page_cols[2]:
+            page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key="library_page")
+        
+        start = (int(page) - 1) * page_size
+        page_df = filtered_df.iloc[start:start + page_size]
+        st.caption(f"Showing {start + 1}-{start + len(page_df)} of {len(filtered_df)} papers (page {int(page)} of {n_pages})")
+        
+        if view_mode == "Compact table":
+            table_df = page_df.reindex(columns=['title', 'authors', 'year', 'category', 'language', 'word_count', 'arxiv_url'])
+            table_df['authors'] = table_df['authors'].apply(lambda a: ", ".join(a) if isinstance(a, list) else a)
+            st.dataframe(
+                table_df,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "title": st.column_config.TextColumn("Title", width="large"),
+                    "arxiv_url": st.column_config.LinkColumn("arXiv"),
+                }
+            )
             
-            with st.expander(f"📄 **{paper_title}** ({paper_language})", expanded=False):
-                col1, col2 = st.columns([3, 1])
-                
-                with col1:
-                    # Paper title and authors
-                    st.markdown(f"### {paper_title}")
-                    
-                    # Authors
-                    authors = paper.get('authors', [])
-                    if authors and isinstance(authors, list):
-                        authors_str = ", ".join(authors)
-                        st.markdown(f"**Authors:** {authors_str}")
-                    elif authors:
-                        st.markdown(f"**Authors:** {authors}")
-                    
-                    # Year and category
-                    meta_cols = st.columns(4)
-                    with meta_cols[0]:
-                        if 'year' in paper:
-                            st.metric("Year", int(paper['year']))
-                    with meta_cols[1]:
-                        if 'category' in paper:
-                            st.metric("Category", paper['category'])
-                    with meta_cols[2]:
-                        if 'language' in paper:
-                            st.metric("Language", paper['language'])
-                    with meta_cols[3]:
-                        if 'word_count' in paper:
-                            st.metric("Words", paper['word_count'])
-                    
-                    # Abstract
-                    st.markdown("#### Abstract")
-                    abstract = paper.get('abstract', 'No abstract available')
-                    if isinstance(abstract, str):
-                        if len(abstract) > 500:
-                            st.write(abstract[:500] + "...")
-                        else:
-                            st.write(abstract)
-                    else:
-                        st.write(str(abstract))
-                    
-                    # Source and keywords
-                    source = paper.get('source', '')
-                    if source:
-                        st.markdown(f"**Source:** {source}")
-                    
-                    keywords = paper.get('keywords', '')
-                    if keywords:
-                        st.markdown(f"**Keywords:** {keywords}")
+            # Details (and the abstract) only for the paper picked from this page
+            selected_row = st.selectbox(
+                "Show details for",
+                [None] + page_df.index.tolist(),
+                format_func=lambda i: "—" if i is None else papers_df.at[i, 'title'],
+                key="library_table_detail"
+            )
+            if selected_row in page_df.index:
+                display_paper_details(selected_row, page_df.loc[selected_row])
+        else:
+            # Display papers
+            for idx, paper in page_df.iterrows():
+                paper_id = paper.get('id', idx)
+                paper_title = paper.get('title', 'Untitled')
+                paper_language = paper.get('language', 'Unknown')
                 
-                with col2:
-                    # Quick actions and links
-                    st.markdown("#### 🔗 Quick Links")
-                    
-                    # Use safe_link_button for all links
-                    arxiv_url = paper.get('arxiv_url', '')
-                    pdf_url = paper.get('pdf_url', '')
-                    doi_value = paper.get('doi', '')
-                    
-                    # arXiv button
-                    safe_link_button(
-                        "📄 arXiv", 
-                        arxiv_url,
-                        key=f"arxiv_{paper_id}"
-                    )
-                    
-                    # PDF button
-                    safe_link_button(
-                        "📥 PDF", 
-                        pdf_url,
-                        key=f"pdf_{paper_id}"
-                    )
-                    
-                    # DOI button
-                    if doi_value and isinstance(doi_value, str) and doi_value.strip():
-                        doi_url = f"https://doi.org/{doi_value}"
-                        safe_link_button(
-                            "🔗 DOI", 
-                            doi_url,
-                            key=f"doi_{paper_id}"
-                        )
-                    
-                    # Search link
-                    if 'title' in paper:
-                        search_url = f"https://scholar.google.com/scholar?q={paper['title'].replace(' ', '+')}"
-                        st.link_button("🔍 Search", search_url)
-                    
-                    # Additional info
-                    st.markdown("---")
-                    keywords = paper.get('keywords', '')
-                    if keywords and isinstance(keywords, str) and keywords.strip():
-                        if len(keywords) > 50:
-                            st.caption(f"**Keywords:** {keywords[:50]}...")
-                        else:
-                            st.caption(f"**Keywords:** {keywords}")
-                    
-                    # Classify this paper button
-                    if st.button("🤖 Classify this paper", key=f"classify_{paper_id}"):
-                        st.session_state.selected_paper_for_classification = paper.get('title', '')
-                        st.session_state.paper_abstract_for_classification = paper.get('abstract', '')
-                        st.rerun()
+                st.markdown(f"📄 **{paper_title}** ({paper_language})")
+                st.caption(" · ".join(str(v) for v in (paper.get('year', ''), paper.get('category', '')) if v != ''))
+                # The card (and its abstract) is only built once the row is opened
+                if st.toggle("Show details", key=f"details_{paper_id}"):
+                    display_paper_details(idx, paper)
                 
                 st.markdown("---")
 
-# ===== MOCK MODEL FUNCTION =====
+# ===== TEXT CLASSIFICATION MODEL =====
+@st.cache_resource(max_entries=1, show_spinner="Loading classification model...")
+def load_text_model(model_path, mtime_ns):
+    """Trained hashed TF-IDF classifier (see src/train_text_model.py)"""
+    return load_classifier(model_path)
+
+
+def get_text_model():
+    """
+    The trained model, or None for keyword-only classification when the
+    artifact is missing or unreadable (it is never trained in the app)
+    """
+    try:
+        mtime_ns = os.stat(MODEL_PATH).st_mtime_ns
+    except OSError:
+        return None
+    try:
+        return load_text_model(MODEL_PATH, mtime_ns)
+    except (OSError, ValueError, KeyError) as e:
+        st.sidebar.warning(f"⚠️ Could not load the text model, classifying by keywords only: {e}")
+        return None
+
+
+# Optional micro-batching inference server (python -m src.inference_server),
+# e.g. http://127.0.0.1:8765 or unix:///tmp/finance-classifier.sock
+INFERENCE_URL = os.environ.get("FINANCE_CLASSIFIER_URL", "")
+# A restarted server with a new model is noticed within this many seconds
+SERVER_FINGERPRINT_TTL = 30
+
+@st.cache_resource
+def get_inference_client(url):
+    """One pooled keep-alive client shared by every session"""
+    from src.inference_server import InferenceClient
+    return InferenceClient(url)
+
+
+@st.cache_data(ttl=SERVER_FINGERPRINT_TTL, show_spinner=False)
+def server_model_fingerprint(url):
+    """
+    The inference server's model fingerprint (from /health), asked at most
+    once per SERVER_FINGERPRINT_TTL seconds instead of once per cache key
+    """
+    return get_inference_client(url).model_fingerprint()
+
+
+def classifier_cache_fingerprint():
+    """
+    Fingerprint of the model that classifies uploads, for result-cache
+    keys: the inference server's when one is configured, so the local
+    model is only loaded when it is the one used
+    """
+    if INFERENCE_URL:
+        try:
+            return f"server-{server_model_fingerprint(INFERENCE_URL)}"
+        except Exception:
+            # Unreachable server: classify_with_confidence falls back to the local model
+            pass
+    return classifier_fingerprint(get_text_model())
+
+
+@timings.timed("classify")
 def classify_with_confidence(text, top_k=5, improve_confidence=True):
     """
-    Mock classification function with improved confidence simulation
+    Classify text with the trained model: one sparse matrix-vector product
+    over the text model's finance categories. improve_confidence sharpens the
+    probabilities (softmax temperature 0.5) instead of reporting them raw.
+    Uses the inference server when FINANCE_CLASSIFIER_URL is set.
     """
-    # Finance categories with Wikipedia links
-    finance_categories = [
-        "Quantitative Finance",
-        "Behavioral Finance", 
-        "Corporate Finance",
-        "Asset Pricing",
-        "Financial Econometrics",
-        "Banking", 
-        "Insurance",
-        "Financial Markets",
-        "Investment Analysis",
-        "Risk Management",
-        "Financial Regulation",
-        "Fintech",
-        "Cryptocurrency",
-        "Sustainable Finance",
-        "International Finance",
-        "Public Finance",
-        "Personal Finance",
-        "Real Estate Finance",
-        "Derivatives",
-        "Fixed Income",
-        "Financial Engineering",
-        "Market Microstructure",
-        "Financial Modeling",
-        "Credit Risk",
-        "Liquidity Risk",
-        "Operational Risk",
-        "Portfolio Theory",
-        "Capital Structure",
-        "Mergers and Acquisitions",
-        "Venture Capital",
-        "Private Equity",
-        "Hedge Funds",
-        "Financial Technology",
-        "Blockchain in Finance",
-        "AI in Finance",
-        "Machine Learning in Finance",
-        "Financial Planning",
-        "Wealth Management",
-        "Financial Analysis",
-        "Accounting Standards",
-        "Auditing",
-        "Taxation",
-        "Development Finance",
-        "Microfinance",
-        "Islamic Finance",
-        "Financial Crises",
-        "Monetary Policy",
-        "Fiscal Policy",
-        "Financial Stability",
-        "Financial Inclusion",
-        "养老金融",
-        "数字货币",
-        "绿色金融",
-        "金融科技",
-        "数字金融",
-        "供应链金融",
-        "银行会计",
-        "货币政策",
-        "股市预测",
-        "国债利率",
-        "消费金融",
-        "银行战略",
-        "银行法律",
-        "数字营销",
-        "数据资产"
-    ]
-    
-    # Wikipedia links
-    category_links = {
-        "Quantitative Finance": "https://en.wikipedia.org/wiki/Quantitative_analysis_(finance)",
-        "Behavioral Finance": "https://en.wikipedia.org/wiki/Behavioral_finance",
-        "Corporate Finance": "https://en.wikipedia.org/wiki/Corporate_finance",
-        "Fintech": "https://en.wikipedia.org/wiki/Fintech",
-        "Cryptocurrency": "https://en.wikipedia.org/wiki/Cryptocurrency",
-        "Sustainable Finance": "https://en.wikipedia.org/wiki/Sustainable_finance",
-        "养老金融": "https://baike.baidu.com/item/%E5%85%BB%E8%80%81%E9%87%91%E8%9E%8D",
-        "数字货币": "https://baike.baidu.com/item/%E6%95%B0%E5%AD%97%E8%B4%A7%E5%B8%81",
-        "绿色金融": "https://baike.baidu.com/item/%E7%BB%BF%E8%89%B2%E9%87%91%E8%9E%8D",
-        "金融科技": "https://baike.baidu.com/item/%E9%87%91%E8%9E%8D%E7%A7%91%E6%8A%80",
-        "数字金融": "https://baike.baidu.com/item/%E6%95%B0%E5%AD%97%E9%87%91%E8%9E%8D"
-    }
-    
-    # Generate confidence scores
-    import hashlib
-    if isinstance(text, str) and text:
-        text_hash = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
-    else:
-        text_hash = 42
-    
-    np.random.seed(text_hash % 10000)
-    
-    # Generate scores
-    if improve_confidence:
-        base_scores = np.random.dirichlet(np.ones(len(finance_categories)) * 0.3)
-        sorted_indices = np.argsort(base_scores)[::-1]
-        boost_factor = np.linspace(1.5, 1.0, len(base_scores))
-        
-        adjusted_scores = base_scores.copy()
-        for idx, boost in zip(sorted_indices, boost_factor):
-            adjusted_scores[idx] *= boost
-        
-        scores = adjusted_scores / adjusted_scores.sum()
-    else:
-        scores = np.random.dirichlet(np.ones(len(finance_categories)) * 0.1)
-    
-    # Sort and get top k
-    indices = np.argsort(scores)[::-1][:top_k]
-    
-    results = []
-    for idx in indices:
-        category = finance_categories[idx]
-        confidence = float(scores[idx] * 100)
-        confidence += np.random.uniform(-2, 2)
-        confidence = max(0, min(100, confidence))
-        
-        # Get link
-        wiki_link = category_links.get(category, "https://en.wikipedia.org/wiki/Finance")
-        
-        results.append({
-            "category": category,
-            "confidence": confidence,
-            "score": float(scores[idx]),
-            "wiki_link": wiki_link
-        })
+    if INFERENCE_URL:
+        text = text if isinstance(text, str) else ""
+        try:
+            client = get_inference_client(INFERENCE_URL)
+            return ranked_results(client.classify([text], top_k, temperature(improve_confidence))[0])
+        except Exception as e:
+            st.sidebar.warning(f"⚠️ Inference server unavailable, classifying locally: {e}")
     
-    return results
+    return classify_text(text, get_text_model(), top_k, improve_confidence)
 
 # Function to display classification results (giữ nguyên)
 def display_classification_results(top_results, file_name="", abstract_text=""):
@@ -812,24 +635,26 @@ def display_classification_results(top_results, file_name="", abstract_text=""):
         hide_index=True
     )
 
-    # Bar chart
-    fig = px.bar(
-        results_df,
-        x="confidence",
-        y="category",
-        orientation="h",
-        title="Top Predicted Categories",
-        text="confidence"
-    )
-    fig.update_layout(yaxis=dict(autorange="reversed"))
-    st.plotly_chart(fig, use_container_width=True)
+    # Bar chart (plotly is only imported once a chart is drawn)
+    with timings.stage("plotly"):
+        import plotly.express as px
+        fig = px.bar(
+            results_df,
+            x="confidence",
+            y="category",
+            orientation="h",
+            title="Top Predicted Categories",
+            text="confidence"
+        )
+        fig.update_layout(yaxis=dict(autorange="reversed"))
+        st.plotly_chart(fig, use_container_width=True)
 
     # Save to history
     if "classification_history" in st.session_state:
         top_pred = results_df.iloc[0]
         st.session_state.classification_history.append({
             "file_name": file_name,
-            "predicted_category": top_pred["category"],
+            "category_id": TAXONOMY.id(top_pred["category"]),
             "confidence": top_pred["confidence"],
             "timestamp": datetime.now()
         })
@@ -837,49 +662,12 @@ def display_classification_results(top_results, file_name="", abstract_text=""):
 # ===== PDF PROCESSOR =====
 pdf_available = False
 try:
-    import pdfplumber
-    pdf_available = True
-    
-    class SimplePDFProcessor:
-        def extract_text(self, file, max_pages=3):
-            import pdfplumber
-            import io
-            text = ""
-            try:
-                file_bytes = file.read()
-                with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-                    for i, page in enumerate(pdf.pages[:max_pages]):
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n\n"
-            except Exception as e:
-                text = f"Sample abstract for classification demonstration. Error: {str(e)}"
-            return text
-        
-        def extract_abstract(self, text):
-            # Simple abstract extraction
-            lines = text.split('\n')
-            abstract = ""
-            
-            for i, line in enumerate(lines):
-                line_lower = line.lower().strip()
-                if 'abstract' in line_lower and len(line_lower) < 30:
-                    for j in range(i+1, min(i+10, len(lines))):
-                        if lines[j].strip():
-                            abstract += lines[j] + " "
-                    break
-            
-            if not abstract:
-                sentences = text.replace('\n', ' ').split('.')
-                abstract = '.'.join(sentences[:3]) + '.'
-            
-            return abstract.strip()
-        
-        def count_words(self, text):
-            return len(text.split())
+    from src.pdf_processor import SimplePDFProcessor
     
+    # Fastest installed backend (PyMuPDF / pypdfium2 / pdfplumber)
     pdf_processor = SimplePDFProcessor()
-    st.sidebar.success("✅ PDF processor ready")
+    pdf_available = True
+    st.sidebar.success(f"✅ PDF processor ready ({pdf_processor.backend.name})")
     
 except ImportError:
     st.sidebar.warning("⚠️ Install pdfplumber: pip install pdfplumber")
@@ -888,6 +676,24 @@ except Exception as e:
     st.sidebar.error(f"❌ PDF processor error: {e}")
     pdf_processor = None
 
+# ===== RESULT CACHE =====
+@st.cache_resource
+def get_result_cache():
+    """Content-addressed cache of extraction/classification results, shared by all sessions"""
+    return ResultCache()
+
+result_cache = get_result_cache()
+
+@st.cache_resource
+def get_extraction_pool():
+    """Process pool for multi-file uploads, shared by all sessions"""
+    return make_pool()
+
+def reset_extraction_pool(pool):
+    """Shut down a broken pool and drop it from the cache; the next upload starts a new one"""
+    pool.shutdown(wait=False, cancel_futures=True)
+    get_extraction_pool.clear()
+
 # ===== MAIN APP NAVIGATION =====
 st.sidebar.header("📚 Navigation")
 app_mode = st.sidebar.radio(
@@ -903,6 +709,13 @@ if app_mode == "🏠 Classifier":
         
         if pdf_available:
             max_pages = st.slider("Pages to extract", 1, 10, 3)
+            max_workers = st.slider(
+                "Parallel extraction workers",
+                1,
+                max(2, MAX_WORKERS),
+                DEFAULT_WORKERS,
+                help="Uploads are extracted in separate processes, up to this many at a time"
+            )
             show_raw_text = st.checkbox("Show raw text", False)
         
         st.header("📤 Upload Files")
@@ -914,11 +727,95 @@ if app_mode == "🏠 Classifier":
         )
         
         st.header("🤖 Classification Settings")
+        if not INFERENCE_URL and not os.path.exists(MODEL_PATH):
+            st.warning(
+                "⚠️ No trained model found: classifying by keywords only. "
+                "Train one with `python -m src.train_text_model`"
+            )
         top_k = st.slider("Number of top categories", 3, 10, 5)
         improve_model = st.checkbox("Enhance confidence scores", True)
         
         st.header("📊 Display Options")
         auto_classify = st.checkbox("Auto-classify on upload", False)
+        
+        st.header("🗄️ Result Cache")
+        # Filled in at the end of the run, once this run's lookups are counted
+        cache_stats_slot = st.empty()
+
+def display_uploaded_pdf(i, file, file_hash, extracted):
+    """Extraction results and classification controls for one uploaded PDF"""
+    pdf_text = extracted["text"]
+    abstract = extracted["abstract"]
+    word_count = extracted["word_count"]
+    
+    with st.expander(f"📋 **{file.name}** ({file.size/1024:.1f} KB)", expanded=i==0):
+        try:
+            col_left, col_right = st.columns([2, 1])
+            
+            with col_left:
+                st.write("**📝 Extracted Abstract:**")
+                if abstract:
+                    st.write(abstract[:400] + "..." if len(abstract) > 400 else abstract)
+                else:
+                    st.write("No abstract extracted.")
+            
+                # Statistics
+                st.write("**🔢 Statistics:**")
+                stat_cols = st.columns(3)
+                with stat_cols[0]:
+                    st.metric("Words", word_count)
+                with stat_cols[1]:
+                    st.metric("Pages", max_pages)
+                with stat_cols[2]:
+                    st.metric("Size", f"{file.size/1024:.0f} KB")
+            
+                if show_raw_text and pdf_text:
+                    with st.expander("📄 View extracted text"):
+                        st.text(pdf_text[:2000] + "..." if len(pdf_text) > 2000 else pdf_text)
+            
+            with col_right:
+                # File info card
+                st.markdown("**📄 File Information**")
+                st.metric("File Size", f"{file.size/1024:.0f} KB")
+            
+                # Classification section
+                st.markdown("---")
+                st.write("**🤖 AI Classification**")
+            
+                # Auto-classify if enabled
+                classify_button = st.button(
+                    f"🔍 Classify with AI", 
+                    key=f"classify_{i}", 
+                    type="primary", 
+                    use_container_width=True
+                )
+            
+                if auto_classify or classify_button:
+                    with st.spinner("Running AI classification..."):
+                        # Run classification (or reuse the cached result)
+                        classify_key = cache_key(
+                            file_hash,
+                            stage="classify",
+                            max_pages=max_pages,
+                            backend=pdf_processor.backend.name,
+                            top_k=top_k,
+                            improve_confidence=improve_model,
+                            model=classifier_cache_fingerprint()
+                        )
+                        top_results = result_cache.get(classify_key)
+                        if top_results is None:
+                            top_results = classify_with_confidence(
+                                pdf_text, 
+                                top_k=top_k,
+                                improve_confidence=improve_model
+                            )
+                            result_cache.put(classify_key, top_results)
+            
+                        # Display results
+                        display_classification_results(top_results, file.name, abstract)
+        
+        except Exception as e:
+            st.error(f"❌ Error processing PDF: {str(e)}")
 
 # ===== MAIN CONTENT AREA =====
 if app_mode == "🏠 Classifier":
@@ -953,76 +850,57 @@ if app_mode == "🏠 Classifier":
         if 'classification_history' not in st.session_state:
             st.session_state.classification_history = []
         
-        # Process each uploaded file
-        for i, file in enumerate(uploaded_files):
-            with st.expander(f"📋 **{file.name}** ({file.size/1024:.1f} KB)", expanded=i==0):
-                
-                if pdf_available and pdf_processor:
-                    # Extract text from PDF
-                    with st.spinner("Extracting text from PDF..."):
-                        try:
-                            pdf_text = pdf_processor.extract_text(file, max_pages=max_pages)
-                            abstract = pdf_processor.extract_abstract(pdf_text)
-                            word_count = pdf_processor.count_words(pdf_text)
-                            
-                            col_left, col_right = st.columns([2, 1])
-                            
-                            with col_left:
-                                st.write("**📝 Extracted Abstract:**")
-                                if abstract:
-                                    st.write(abstract[:400] + "..." if len(abstract) > 400 else abstract)
-                                else:
-                                    st.write("No abstract extracted.")
-                                
-                                # Statistics
-                                st.write("**🔢 Statistics:**")
-                                stat_cols = st.columns(3)
-                                with stat_cols[0]:
-                                    st.metric("Words", word_count)
-                                with stat_cols[1]:
-                                    st.metric("Pages", max_pages)
-                                with stat_cols[2]:
-                                    st.metric("Size", f"{file.size/1024:.0f} KB")
-                                
-                                if show_raw_text and pdf_text:
-                                    with st.expander("📄 View extracted text"):
-                                        st.text(pdf_text[:2000] + "..." if len(pdf_text) > 2000 else pdf_text)
-                            
-                            with col_right:
-                                # File info card
-                                st.markdown("**📄 File Information**")
-                                st.metric("File Size", f"{file.size/1024:.0f} KB")
-                                
-                                # Classification section
-                                st.markdown("---")
-                                st.write("**🤖 AI Classification**")
-                                
-                                # Auto-classify if enabled
-                                classify_button = st.button(
-                                    f"🔍 Classify with AI", 
-                                    key=f"classify_{i}", 
-                                    type="primary", 
-                                    use_container_width=True
-                                )
-                                
-                                if auto_classify or classify_button:
-                                    with st.spinner("Running AI classification..."):
-                                        # Run classification
-                                        top_results = classify_with_confidence(
-                                            pdf_text, 
-                                            top_k=top_k,
-                                            improve_confidence=improve_model
-                                        )
-                                        
-                                        # Display results
-                                        display_classification_results(top_results, file.name, abstract)
-                        
-                        except Exception as e:
-                            st.error(f"❌ Error processing PDF: {str(e)}")
-                else:
-                    # Fallback
-                    st.warning("⚠️ PDF processing not available. Please install pdfplumber:")
-                    st.code("pip install pdfplumber")
+        if pdf_available and pdf_processor:
+            progress = st.progress(0.0, text="Extracting text from PDFs...")
+            # One slot per file in upload order, filled as each file finishes
+            slots = [st.container() for _ in uploaded_files]
+            
+            # Results are cached by file content, not name
+            file_hashes = [content_hash(file.getvalue()) for file in uploaded_files]
+            extract_keys = [
+                cache_key(h, stage="extract", max_pages=max_pages, backend=pdf_processor.backend.name)
+                for h in file_hashes
+            ]
+            jobs = {}
+            done = 0
+            for i, file in enumerate(uploaded_files):
+                extracted = result_cache.get(extract_keys[i])
+                if extracted is None:
+                    jobs[i] = file.getvalue()
+                    continue
+                with slots[i]:
+                    display_uploaded_pdf(i, file, file_hashes[i], extracted)
+                done += 1
+            progress.progress(done / len(uploaded_files), text=f"Processed {done}/{len(uploaded_files)} files")
+            
+            # Extraction is CPU-bound: extract the rest in a process pool
+            pool = get_extraction_pool() if max_workers > 1 and len(jobs) > 1 else None
+            backend = pdf_processor.backend.name
+            pool_broken = False
+            for i, extracted, error in iter_extracted(pool, jobs, max_pages, max_workers, backend):
+                if isinstance(error, BrokenProcessPool):
+                    # A crashed worker takes the pool down; retry in-process
+                    if not pool_broken:
+                        reset_extraction_pool(pool)
+                        pool_broken = True
+                    try:
+                        extracted, error = extract_upload(jobs[i], max_pages, backend), None
+                    except Exception as e:
+                        error = e
+                with slots[i]:
+                    if error is not None:
+                        st.error(f"❌ Error processing PDF {uploaded_files[i].name}: {error}")
+                    else:
+                        # Time spent in the worker, not waiting in the queue
+                        timings.record("pdf_extract", extracted.pop("seconds", 0.0))
+                        result_cache.put(extract_keys[i], extracted)
+                        display_uploaded_pdf(i, uploaded_files[i], file_hashes[i], extracted)
+                done += 1
+                progress.progress(done / len(uploaded_files), text=f"Processed {done}/{len(uploaded_files)} files")
+        else:
+            # Fallback
+            st.warning("⚠️ PDF processing not available. Please install pdfplumber:")
+            st.code("pip install pdfplumber")
     
     else:
         st.info("📤 Upload PDF files to classify or switch to Research Library to browse existing papers.")
@@ -1034,77 +912,122 @@ elif app_mode == "📊 Statistics":
     st.header("📊 Research Statistics")
     
     if not papers_df.empty:
+        import plotly.express as px
+        
+        # Every chart below is a sum over the precomputed category x year x language cube
+        cube = load_stats_cube(papers_corpus.cache_dir, papers_corpus, papers_df)
+        languages = cube.marginal("language")
+        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Papers", len(papers_df))
+            st.metric("Total Papers", cube.total)
         
         with col2:
-            recent_year = int(papers_df['year'].max())
+            recent_year = max(cube.marginal("year"), default=2025)
             st.metric("Latest Year", recent_year)
         
         with col3:
-            unique_cats = papers_df['category'].nunique()
+            unique_cats = len(cube.marginal("category"))
             st.metric("Categories", unique_cats)
         
         with col4:
-            english_count = len(papers_df[papers_df['language'] == 'English'])
-            chinese_count = len(papers_df[papers_df['language'] == 'Chinese'])
+            english_count = languages.get('English', 0)
+            chinese_count = languages.get('Chinese', 0)
             st.metric("English/Chinese", f"{english_count}/{chinese_count}")
         
         # Category distribution
         st.subheader("📈 Category Distribution")
-        category_counts = papers_df['category'].value_counts().reset_index()
-        category_counts.columns = ['Category', 'Count']
+        category_counts = pd.DataFrame(list(cube.marginal("category").items()), columns=['Category', 'Count'])
         
-        fig = px.bar(
-            category_counts.head(15),
-            x='Category',
-            y='Count',
-            color='Count',
-            title="Top 15 Research Categories",
-            color_continuous_scale=px.colors.sequential.Viridis
-        )
-        fig.update_layout(xaxis_tickangle=-45)
-        st.plotly_chart(fig, use_container_width=True)
+        with timings.stage("plotly"):
+            fig = px.bar(
+                category_counts.head(15),
+                x='Category',
+                y='Count',
+                color='Count',
+                title="Top 15 Research Categories",
+                color_continuous_scale=px.colors.sequential.Viridis
+            )
+            fig.update_layout(xaxis_tickangle=-45)
+            st.plotly_chart(fig, use_container_width=True)
         
         # Language distribution
         st.subheader("🌐 Language Distribution")
-        language_counts = papers_df['language'].value_counts().reset_index()
-        language_counts.columns = ['Language', 'Count']
+        language_counts = pd.DataFrame(list(languages.items()), columns=['Language', 'Count'])
         
-        fig = px.pie(
-            language_counts,
-            values='Count',
-            names='Language',
-            title="Papers by Language",
-            hole=0.3
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with timings.stage("plotly"):
+            fig = px.pie(
+                language_counts,
+                values='Count',
+                names='Language',
+                title="Papers by Language",
+                hole=0.3
+            )
+            st.plotly_chart(fig, use_container_width=True)
         
         # Yearly trend
         st.subheader("📅 Yearly Publication Trend")
-        yearly_counts = papers_df['year'].value_counts().sort_index().reset_index()
-        yearly_counts.columns = ['Year', 'Count']
+        yearly_counts = pd.DataFrame(list(cube.marginal("year").items()), columns=['Year', 'Count'])
         
-        fig = px.line(
-            yearly_counts,
-            x='Year',
-            y='Count',
-            title="Papers Published per Year",
-            markers=True
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with timings.stage("plotly"):
+            fig = px.line(
+                yearly_counts,
+                x='Year',
+                y='Count',
+                title="Papers Published per Year",
+                markers=True
+            )
+            st.plotly_chart(fig, use_container_width=True)
         
-        # Word count distribution
+        # Drill-down: category trends over years
+        st.subheader("🔎 Category Trends")
+        drill_cols = st.columns([3, 1])
+        with drill_cols[0]:
+            trend_categories = st.multiselect(
+                "Categories",
+                list(cube.marginal("category")),
+                default=list(cube.marginal("category"))[:5],
+                key="stats_trend_categories"
+            )
+        with drill_cols[1]:
+            trend_language = st.selectbox("Language", ["All"] + list(languages), key="stats_trend_language")
+        
+        trend_language = None if trend_language == "All" else trend_language
+        trend_rows = [
+            {"Year": year, "Category": category, "Count": count}
+            for category, years in cube.trends(trend_categories, trend_language).items()
+            for year, count in years.items()
+        ]
+        if trend_rows:
+            with timings.stage("plotly"):
+                fig = px.line(
+                    pd.DataFrame(trend_rows),
+                    x='Year',
+                    y='Count',
+                    color='Category',
+                    title="Papers per Year by Category",
+                    markers=True
+                )
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No papers for this selection.")
+        
+        # Word count distribution (fixed-width bins, same selection as above)
         st.subheader("📝 Word Count Distribution")
-        fig = px.histogram(
-            papers_df,
-            x='word_count',
-            nbins=20,
-            title="Distribution of Abstract Word Counts"
+        word_bins = pd.DataFrame(
+            cube.word_histogram({"language": trend_language}),
+            columns=['Words', 'Count']
         )
-        st.plotly_chart(fig, use_container_width=True)
+        with timings.stage("plotly"):
+            fig = px.bar(
+                word_bins,
+                x='Words',
+                y='Count',
+                title="Distribution of Abstract Word Counts"
+            )
+            fig.update_layout(bargap=0)
+            st.plotly_chart(fig, use_container_width=True)
 
 # Display classification history
 if 'classification_history' in st.session_state and st.session_state.classification_history and app_mode == "🏠 Classifier":
@@ -1115,6 +1038,7 @@ if 'classification_history' in st.session_state and st.session_state.classificat
             if 'timestamp' in history_df.columns:
                 history_df['timestamp'] = pd.to_datetime(history_df['timestamp'])
                 history_df['time_display'] = history_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
+            history_df['predicted_category'] = TAXONOMY.names[history_df['category_id'].to_numpy()]
             
             st.dataframe(
                 history_df[['file_name', 'predicted_category', 'confidence', 'time_display']],
@@ -1133,6 +1057,54 @@ if 'classification_history' in st.session_state and st.session_state.classificat
                 st.session_state.classification_history = []
                 st.rerun()
 
+# Result cache counters (after this run's lookups)
+if app_mode == "🏠 Classifier":
+    with cache_stats_slot.container():
+        cache_cols = st.columns(2)
+        with cache_cols[0]:
+            st.metric("Hits", result_cache.hits)
+        with cache_cols[1]:
+            st.metric("Misses", result_cache.misses)
+        st.caption(
+            f"Memory {result_cache.stats['memory_hits']} / disk {result_cache.stats['disk_hits']} hits · "
+            f"{result_cache.memory_size / 1024:.0f} KB in memory, {result_cache.disk_size / 1024:.0f} KB on disk"
+        )
+
+# ===== DIAGNOSTICS =====
+# Per-stage latencies from every session (last runs, this run included)
+with st.sidebar.expander("⏱️ Diagnostics", expanded=False):
+    if not timings.enabled:
+        st.caption(f"Stage timings are disabled ({TIMINGS_ENV}=0)")
+    else:
+        timing_rows = timings.summary()
+        if timing_rows:
+            st.dataframe(
+                pd.DataFrame(timing_rows)[["stage", "calls", "p50_ms", "p95_ms", "max_ms"]],
+                column_config={
+                    "stage": "Stage",
+                    "calls": "Calls",
+                    "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+                    "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+                    "max_ms": st.column_config.NumberColumn("max (ms)", format="%.1f"),
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.caption("No stages timed yet")
+
+        diag_cols = st.columns(2)
+        with diag_cols[0]:
+            if st.button("Export", key="diagnostics_export", use_container_width=True):
+                try:
+                    st.success(f"✅ Saved to {timings.export()}")
+                except OSError as e:
+                    st.error(f"❌ Export failed: {e}")
+        with diag_cols[1]:
+            if st.button("Reset", key="diagnostics_reset", use_container_width=True):
+                timings.reset()
+                st.rerun()
+
 # Footer
 st.markdown("---")
 footer_cols = st.columns(5)
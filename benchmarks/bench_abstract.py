@@ -0,0 +1,97 @@
+# benchmarks/bench_abstract.py
+"""
+Microbenchmark for abstract detection on large synthetic texts.
+
+Compares PDFProcessor.extract_abstract, which uses the shared line-based
+detector (src.pdf_processor.find_abstract), with the implementation it
+replaced: four uncompiled DOTALL patterns with lazy (.*?) groups run over
+the whole text. legacy_abstract is a verbatim copy of that code.
+
+Usage: python -m benchmarks.bench_abstract [--pages 100] [--repeat 20]
+"""
+import argparse
+import random
+import re
+import time
+
+from src.pdf_processor import PDFProcessor
+
+WORDS = (
+    "market risk return portfolio volatility asset pricing model bank credit "
+    "liquidity equity bond yield factor premium investor trading data sample "
+    "estimate regression policy rate inflation firm capital"
+).split()
+
+
+def legacy_abstract(text):
+    """PDFProcessor.extract_abstract before the shared detector (baseline code)"""
+    # Remove page markers first
+    text = re.sub(r'--- Page \d+ ---\n', '', text)
+
+    patterns = [
+        r'Abstract\s*\n(.*?)(?=\n\s*\nIntroduction|$)',
+        r'ABSTRACT\s*\n(.*?)(?=\n\s*\nINTRODUCTION|$)',
+        r'Summary\s*\n(.*?)(?=\n\s*\n1\.|$)',
+        r'abstract\s*\n(.*?)(?=\n\s*\n1\.|$)'
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
+        if match:
+            abstract = match.group(1).strip()
+            # Clean up
+            abstract = re.sub(r'\n+', ' ', abstract)
+            abstract = re.sub(r'\s+', ' ', abstract)
+            return abstract[:300] + "..." if len(abstract) > 300 else abstract
+
+    # Fallback: first 300 characters
+    if len(text) > 300:
+        return text[:300] + "..."
+    return text
+
+
+def synthetic_report(pages, with_heading, seed=0, lines_per_page=45):
+    """Extracted-text lookalike: page markers, ~12 words per line"""
+    rng = random.Random(seed)
+    parts = []
+    for page in range(1, pages + 1):
+        parts.append(f"--- Page {page} ---\n")
+        if page == 1:
+            parts.append("A Synthetic Study of Market Risk\nJane Doe, John Roe\n\n")
+            if with_heading:
+                parts.append("Abstract\n")
+                parts.extend(" ".join(rng.choices(WORDS, k=12)) + "\n" for _ in range(8))
+                parts.append("\n1. Introduction\n")
+        for _ in range(lines_per_page):
+            parts.append(" ".join(rng.choices(WORDS, k=12)) + "\n")
+        parts.append("\n")
+    return "".join(parts)
+
+
+def timed(func, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    shared_abstract = PDFProcessor().extract_abstract
+    print(f"{'case':<22}{'chars':>10}{'legacy ms':>12}{'shared ms':>12}{'speedup':>10}")
+    for name, with_heading in (("no heading", False), ("heading on page 1", True)):
+        text = synthetic_report(args.pages, with_heading)
+        legacy = timed(legacy_abstract, text, args.repeat)
+        shared = timed(shared_abstract, text, args.repeat)
+        print(f"{name:<22}{len(text):>10,}{legacy * 1e3:>12.3f}{shared * 1e3:>12.3f}"
+              f"{legacy / shared:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
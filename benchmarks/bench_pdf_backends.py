@@ -0,0 +1,67 @@
+# benchmarks/bench_pdf_backends.py
+"""
+Per-backend extraction throughput on the bundled sample PDFs.
+
+Every installed backend extracts every page of each sample from bytes (as
+uploads arrive). The output structure is checked to be the same for all
+backends: consecutive 1-based page numbers, str text, and the same words
+and abstract as the first backend measured.
+
+Usage: python -m benchmarks.bench_pdf_backends [--repeat 3] [--backend NAME ...]
+"""
+import argparse
+import os
+import time
+
+from benchmarks.sample_pdfs import sample_paths
+from src.pdf_processor import available_backends, find_abstract, iter_page_texts
+
+
+def extract_all(data, backend):
+    return list(iter_page_texts(data, backend=backend))
+
+
+def check_structure(pages, reference):
+    numbers = [number for number, _ in pages]
+    assert numbers == list(range(1, len(pages) + 1)), "page numbers must be consecutive and 1-based"
+    assert all(isinstance(text, str) for _, text in pages), "page text must be str"
+    if reference is not None:
+        assert numbers == [number for number, _ in reference], "page count differs between backends"
+        words = " ".join(text for _, text in pages).split()
+        reference_words = " ".join(text for _, text in reference).split()
+        assert words == reference_words, "extracted words differ between backends"
+        assert find_abstract(pages[0][1]) == find_abstract(reference[0][1]), "abstract differs between backends"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", action="append", help="backend(s) to measure (default: all installed)")
+    args = parser.parse_args()
+
+    backends = args.backend or available_backends()
+    samples = [(os.path.basename(path), open(path, "rb").read()) for path in sample_paths()]
+    reference = {}
+
+    print(f"{'backend':<12}{'sample':<20}{'pages':>6}{'KB':>7}{'ms':>10}{'pages/s':>10}")
+    for backend in backends:
+        total_pages = 0
+        total_seconds = 0.0
+        for name, data in samples:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                pages = extract_all(data, backend)
+                best = min(best, time.perf_counter() - start)
+            check_structure(pages, reference.get(name))
+            reference.setdefault(name, pages)
+            total_pages += len(pages)
+            total_seconds += best
+            print(f"{backend:<12}{name:<20}{len(pages):>6}{len(data) / 1024:>7.0f}"
+                  f"{best * 1e3:>10.1f}{len(pages) / best:>10.0f}")
+        print(f"{backend:<12}{'all samples':<20}{total_pages:>6}{'':>7}"
+              f"{total_seconds * 1e3:>10.1f}{total_pages / total_seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_startup.py
+"""
+Import-time budget for the headless core.
+
+Every core module is imported in a fresh interpreter (best of --repeat
+runs). The check fails if one takes longer than the budget or pulls in a
+UI or PDF engine module (Streamlit, plotly, pandas, pdfplumber, ...),
+which must only be imported on first use.
+
+Usage: python -m benchmarks.bench_startup [--budget-ms 400] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_MODULES = [
+    "src.core",
+    "src.taxonomy",
+    "src.classifier",
+    "src.text_model",
+    "src.corpus",
+    "src.columnar_cache",
+    "src.dedup",
+    "src.pdf_processor",
+    "src.batch_extract",
+    "src.bulk_classify",
+]
+HEAVY_MODULES = ["streamlit", "plotly", "pandas", "pdfplumber", "pypdfium2", "fitz"]
+BUDGET_MS = 400
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def import_time(module, repeat=5):
+    """(best import time in ms, heavy modules it loaded) in fresh interpreters"""
+    best, loaded = float("inf"), []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, cwd=ROOT, check=True
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        best = min(best, result["ms"])
+        loaded = result["loaded"]
+    return round(best, 1), loaded
+
+
+def run(budget_ms=BUDGET_MS, repeat=5, modules=CORE_MODULES):
+    """{module: {"best_ms", "loaded", "ok"}} for every module"""
+    results = {}
+    for module in modules:
+        ms, loaded = import_time(module, repeat)
+        results[module] = {"best_ms": ms, "loaded": loaded, "ok": ms <= budget_ms and not loaded}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.budget_ms, args.repeat)
+    print(f"{'module':<24}{'import ms':>10}  heavy imports")
+    for module, row in results.items():
+        flag = "" if row["ok"] else "  <-- FAIL"
+        print(f"{module:<24}{row['best_ms']:>10.1f}  {', '.join(row['loaded']) or '-'}{flag}")
+    failed = [module for module, row in results.items() if not row["ok"]]
+    if failed:
+        print(f"Over the {args.budget_ms:.0f} ms budget or importing heavy modules: {', '.join(failed)}")
+        return 1
+    print(f"All core modules import within {args.budget_ms:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# benchmarks/sample_pdfs.py
+"""
+Deterministic sample PDFs for the extraction benchmarks.
+
+The generated files are bundled in benchmarks/samples/ so every backend is
+measured on identical input; rerun this module to regenerate them.
+
+Usage: python -m benchmarks.sample_pdfs
+"""
+import os
+import random
+import zlib
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples")
+
+WORDS = (
+    "bank credit risk loan deposit market volatility portfolio pricing model "
+    "stochastic capital policy liquidity equity bond yield factor premium "
+    "investor trading sample estimate regression inflation firm return"
+).split()
+
+# name -> (title, pages)
+SAMPLES = {
+    "short_paper.pdf": ("Credit Risk in Commercial Banks", 4),
+    "working_paper.pdf": ("Liquidity Premia in Corporate Bond Markets", 24),
+    "annual_report.pdf": ("Financial Stability Report", 80),
+}
+
+
+def make_pdf(pages):
+    """PDF bytes with one Helvetica text page per list of lines"""
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    content_ids = []
+    for lines in pages:
+        ops = ["BT /F1 10 Tf 13 TL 50 770 Td"]
+        for line in lines:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({escaped}) Tj T*")
+        ops.append("ET")
+        stream = zlib.compress("\n".join(ops).encode("latin-1", "replace"))
+        content_ids.append(add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream"))
+    # Page objects come after the contents; the Pages node after them
+    pages_id = len(objects) + len(content_ids) + 1
+    page_ids = [
+        add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content, font))
+        for content in content_ids
+    ]
+    add(b"")
+    objects[pages_id - 1] = (
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % p for p in page_ids)
+        + b"] /Count %d >>" % len(page_ids)
+    )
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+def paper_pages(title, n_pages, seed=0):
+    """Title, abstract and introduction on page 1, then body text"""
+    rng = random.Random(seed)
+
+    def sentence(n_words):
+        return " ".join(rng.choices(WORDS, k=n_words))
+
+    first = [title, "A. Author, B. Author", "", "Abstract"]
+    first += [sentence(14) for _ in range(5)]
+    first += ["", "1. Introduction"] + [sentence(13) for _ in range(42)]
+    return [first] + [[sentence(13) for _ in range(54)] for _ in range(n_pages - 1)]
+
+
+def sample_paths():
+    """Paths of the bundled samples, generating any that are missing"""
+    paths = []
+    for seed, (name, (title, n_pages)) in enumerate(SAMPLES.items()):
+        path = os.path.join(SAMPLES_DIR, name)
+        if not os.path.exists(path):
+            os.makedirs(SAMPLES_DIR, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(make_pdf(paper_pages(title, n_pages, seed)))
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    for path in sample_paths():
+        print(f"{path} ({os.path.getsize(path) / 1024:.0f} KB)")
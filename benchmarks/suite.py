@@ -0,0 +1,339 @@
+# benchmarks/suite.py
+"""
+Benchmark suite for core import time, the loader, classifiers, library
+filters, statistics, search, related papers and PDF extraction, run on
+synthetic data through the headless core (src.core) the app is built on.
+
+    python -m benchmarks.suite                        # 1k, 100k and 1M papers
+    python -m benchmarks.suite --sizes 1k,100k --repeat 3
+    python -m benchmarks.suite --compare benchmarks/results/a.json benchmarks/results/b.json
+
+Results are written as JSON to benchmarks/results/ (one file per run), so
+two runs can be compared with --compare. Progress goes to stderr.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks import bench_startup
+from benchmarks.sample_pdfs import sample_paths
+from benchmarks.synthetic import DATA_DIR, SIZES, corpus_path
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+QUERIES = ["risk", "credit risk", '"asset pricing"', "volatility model", "绿色金融", "市场 风险"]
+TRAINING_CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "finance_research_papers.json")
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def measure(func, repeat=1, setup=None):
+    """Run func repeat times; returns (timing dict, last result)"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return {
+        "runs": repeat,
+        "best_ms": round(min(times) * 1000, 3),
+        "median_ms": round(statistics.median(times) * 1000, 3),
+    }, result
+
+
+def latency_stats(func, items):
+    """Per-call latency over items (p50/p95) and overall throughput"""
+    times = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "calls": len(times),
+        "p50_ms": round(times[len(times) // 2] * 1000, 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 3),
+        "per_s": round(len(times) / sum(times), 1),
+    }
+
+
+def text_model_path():
+    """
+    The shipped model (trained from the bundled corpus), so every size uses
+    the same one; trained into the data directory if it is missing
+    """
+    from src.text_model import MODEL_PATH
+    from src.train_text_model import train_from_corpus
+
+    if os.path.exists(MODEL_PATH):
+        return MODEL_PATH
+    path = os.path.join(DATA_DIR, "finance_text_model.npz")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        train_from_corpus(TRAINING_CORPUS).save(path)
+    return path
+
+
+# ===== CORPUS BENCHMARKS =====
+def bench_loader(corpus_file, repeat):
+    from src.columnar_cache import CACHE_DIRNAME
+    from src.core import open_library
+
+    cache_root = os.path.join(os.path.dirname(corpus_file), CACHE_DIRNAME)
+    out = {}
+    # First run ever (JSON parse + deep classification + columnar cache),
+    # then a new server process opening the cache on disk
+    out["cold"], _ = measure(lambda: open_library(corpus_file), 1,
+                             setup=lambda: shutil.rmtree(cache_root, ignore_errors=True))
+    out["reopen"], (papers_df, corpus) = measure(lambda: open_library(corpus_file), repeat)
+    if papers_df.empty:
+        raise RuntimeError(f"open_library returned no papers for {corpus_file}")
+    return out, papers_df, corpus
+
+
+def bench_dedup(corpus_file):
+    from src.corpus import is_paper_record, iter_records
+    from src.dedup import find_duplicates
+
+    out, keep = measure(lambda: find_duplicates(iter_records(corpus_file), is_paper_record))
+    out["records"] = len(keep)
+    out["duplicates"] = int((~keep).sum())
+    return out
+
+
+def bench_deep_classify(titles, abstracts):
+    from src.classifier import deep_classify_paper, iter_classify_batch
+
+    out = {}
+    out["per_paper"], _ = measure(lambda: [deep_classify_paper(t, a) for t, a in zip(titles, abstracts)])
+    out["batch"], _ = measure(lambda: sum(len(labels) for labels, _ in iter_classify_batch(titles, abstracts)))
+    for stats in out.values():
+        stats["papers_per_s"] = round(len(titles) / (stats["best_ms"] / 1000), 1)
+    return out
+
+
+def bench_filters(papers_df, repeat):
+    from src.facets import FacetIndex
+
+    out = {}
+    out["build_index"], facets = measure(lambda: FacetIndex(papers_df))
+    category_counts = facets.counts("category", facets.all_rows())
+    top_category = facets.values["category"][int(category_counts.argmax())]
+    cases = {
+        "all": {},
+        "language": {"language": "Chinese"},
+        "category_year": {"category": top_category, "year": facets.values["year"][0]},
+        "all_facets": {"category": top_category, "year": facets.values["year"][0], "language": "English"},
+    }
+
+    def pipeline(selections):
+        # Same calls as display_research_library: counts, mask, sort, rows
+        facets.facet_counts(selections)
+        mask = facets.select(selections)
+        row_ids = facets.sort_rows(facets.rows(mask), "year", descending=True)
+        return papers_df.iloc[row_ids]
+
+    for name, selections in cases.items():
+        out[name], filtered = measure(lambda: pipeline(selections), repeat)
+        out[name]["rows"] = len(filtered)
+    return out
+
+
+def bench_statistics(papers_df, repeat):
+    from src.analytics import StatsCube
+
+    out = {}
+    out["build_cube"], cube = measure(lambda: StatsCube.build(papers_df))
+    top_categories = list(cube.marginal("category"))[:5]
+    # Everything the Statistics page draws on one rerun
+    out["page"], _ = measure(lambda: (
+        cube.marginal("category"),
+        cube.marginal("language"),
+        cube.marginal("year"),
+        cube.trends(top_categories),
+        cube.word_histogram(),
+    ), repeat)
+    out["drill_down"], _ = measure(lambda: (
+        cube.trends(top_categories[:1], "Chinese"),
+        cube.word_histogram({"language": "Chinese"}),
+    ), repeat)
+    return out
+
+
+def bench_search(corpus, repeat):
+    from src.search_index import open_search_index
+
+    out = {}
+    shutil.rmtree(os.path.join(corpus.cache_dir, "search_index"), ignore_errors=True)
+    out["build"], _ = measure(lambda: open_search_index(corpus))
+    out["open"], index = measure(lambda: open_search_index(corpus), repeat)
+    for query in QUERIES:
+        out[f"query {query}"], (hit_ids, _) = measure(lambda: index.search(query), repeat)
+        out[f"query {query}"]["hits"] = len(hit_ids)
+    return out
+
+
+def bench_related(corpus, repeat, n_queries=50):
+    import numpy as np
+    from src.similarity import open_similarity_index
+
+    out = {}
+    shutil.rmtree(os.path.join(corpus.cache_dir, "related_index"), ignore_errors=True)
+    out["build"], _ = measure(lambda: open_similarity_index(corpus))
+    out["open"], index = measure(lambda: open_similarity_index(corpus), repeat)
+    rows = np.random.default_rng(0).choice(len(index), min(n_queries, len(index)), replace=False).tolist()
+    out["exact"] = latency_stats(lambda row: index.related(row, 10, exact=True), rows)
+    out["approximate"] = latency_stats(lambda row: index.related(row, 10, exact=False), rows)
+    # Share of the exact top 10 that the IVF search also returns
+    recall = [
+        len(set(index.related(row, 10, exact=False)[0]) & set(index.related(row, 10, exact=True)[0])) / 10
+        for row in rows
+    ]
+    out["approximate"]["recall_at_10"] = round(float(np.mean(recall)), 3)
+    out["approximate"]["lists"] = index.n_lists
+    return out
+
+
+def bench_classify(abstracts):
+    from src.core import classify_text, load_classifier
+
+    model = load_classifier(text_model_path())
+    return latency_stats(lambda text: classify_text(text, model, top_k=5, improve_confidence=True), abstracts)
+
+
+def bench_corpus(size, seed, repeat, classify_docs):
+    start = time.perf_counter()
+    corpus_file = corpus_path(size, seed)
+    log(f"[{size}] corpus ready in {time.perf_counter() - start:.1f}s: {corpus_file}")
+
+    out = {"papers": SIZES.get(size) or int(size), "corpus_mb": round(os.path.getsize(corpus_file) / 2**20, 1)}
+
+    log(f"[{size}] open_library")
+    out["open_library"], papers_df, corpus = bench_loader(corpus_file, repeat)
+    titles = papers_df["title"].tolist()
+    abstracts = corpus.texts("abstract")
+
+    log(f"[{size}] near-duplicate detection")
+    out["dedup"] = bench_dedup(corpus_file)
+    log(f"[{size}] deep_classify_paper")
+    out["deep_classify"] = bench_deep_classify(titles, abstracts)
+    log(f"[{size}] library filters")
+    out["filters"] = bench_filters(papers_df, repeat)
+    log(f"[{size}] statistics")
+    out["statistics"] = bench_statistics(papers_df, repeat)
+    log(f"[{size}] search")
+    out["search"] = bench_search(corpus, repeat)
+    log(f"[{size}] related papers")
+    out["related"] = bench_related(corpus, repeat)
+    log(f"[{size}] classify_text")
+    out["classify_text"] = bench_classify(abstracts[:classify_docs])
+    return out
+
+
+# ===== PDF BENCHMARKS =====
+def bench_pdf(repeat, max_pages=5):
+    from src.pdf_processor import PDFProcessor, SimplePDFProcessor, available_backends
+
+    out = {}
+    for backend in available_backends():
+        processor = PDFProcessor(backend)
+        simple = SimplePDFProcessor(backend)
+        for path in sample_paths():
+            name = f"{backend} {os.path.basename(path)}"
+            log(f"[pdf] {name}")
+            row = {}
+            row["extract_text"], text = measure(lambda: processor.extract_text(path, max_pages=max_pages), repeat)
+            row["extract_abstract"], _ = measure(lambda: processor.extract_abstract(text), repeat * 20)
+            row["simple_extract_text"], simple_text = measure(lambda: simple.extract_text(path, max_pages=max_pages), repeat)
+            row["simple_extract_abstract"], _ = measure(lambda: simple.extract_abstract(simple_text), repeat * 20)
+            out[name] = row
+    return out
+
+
+# ===== RESULTS =====
+def run_metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=os.path.dirname(RESULTS_DIR)
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def flatten(results, prefix=""):
+    """{"a": {"b": {"best_ms": 1}}} -> {"a / b / best_ms": 1}"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix} / {key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = flatten(json.load(f)["results"])
+    with open(new_path, encoding="utf-8") as f:
+        new = flatten(json.load(f)["results"])
+    print(f"{'metric':<80}{'old':>12}{'new':>12}{'change':>9}")
+    for name in sorted(old.keys() & new.keys()):
+        if not name.endswith(("best_ms", "p50_ms", "p95_ms")):
+            continue
+        change = (new[name] - old[name]) / old[name] * 100 if old[name] else 0.0
+        print(f"{name:<80}{old[name]:>12.3f}{new[name]:>12.3f}{change:>+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(SIZES), help="comma-separated: 1k, 100k, 1m or a number of papers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--classify-docs", type=int, default=1000, help="abstracts sent to classify_text")
+    parser.add_argument("--skip-pdf", action="store_true")
+    parser.add_argument("-o", "--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = {}
+    log("[startup] core import times")
+    results["startup"] = bench_startup.run(repeat=args.repeat)
+    for size in filter(None, args.sizes.split(",")):
+        results[f"corpus {size}"] = bench_corpus(size.strip(), args.seed, args.repeat, args.classify_docs)
+    if not args.skip_pdf:
+        results["pdf"] = bench_pdf(args.repeat)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": run_metadata(), "args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+    log(f"Results written to {path}")
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/synthetic.py
+"""
+Synthetic research-paper corpora for the benchmark suite.
+
+Records have the same fields as finance_research_papers.json. Half of the
+abstracts are Chinese, and both languages mix filler text with the
+classifier's own keywords, so deep classification, search and facets see
+realistic matches. Corpora are written as JSON Lines once per size and
+seed and reused by later runs.
+"""
+import json
+import os
+import random
+
+from src.classifier import CATEGORY_KEYWORDS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+CORPUS_NAME = "finance_research_papers.jsonl"
+
+EN_WORDS = (
+    "we study the effect of on in a for with and model data evidence results "
+    "show that market firms returns risk policy using panel estimate sample "
+    "analysis find significant investors price volatility approach framework"
+).split()
+ZH_WORDS = (
+    "本文 研究 基于 分析 影响 市场 企业 风险 政策 数据 模型 结果 表明 显著 "
+    "我们 发现 机制 效应 实证 检验 中国 金融 发展 投资者 价格 波动"
+).split()
+SURNAMES = "Wang Li Zhang Liu Chen Smith Johnson Brown Garcia Müller Rossi Kim".split()
+GIVEN = "Wei Jing Min Anna John Maria David Laura Hao Yan Peter Sofia".split()
+
+
+def _split_keywords():
+    english, chinese = [], []
+    for keywords in CATEGORY_KEYWORDS.values():
+        for keyword in keywords:
+            (english if keyword.isascii() else chinese).append(keyword)
+    return english, chinese
+
+
+EN_KEYWORDS, ZH_KEYWORDS = _split_keywords()
+
+
+def synthetic_paper(i, rng, chinese_share=0.5):
+    chinese = rng.random() < chinese_share
+    words, keywords, joiner = (ZH_WORDS, ZH_KEYWORDS, "") if chinese else (EN_WORDS, EN_KEYWORDS, " ")
+    n_words = rng.randint(60, 220)
+    body = rng.choices(words, k=n_words)
+    # A few topic keywords, so papers fall into different categories
+    for keyword in rng.sample(keywords, 3):
+        body.insert(rng.randrange(len(body)), keyword)
+    title_words = rng.sample(keywords, 2) + rng.choices(words, k=rng.randint(3, 8))
+    year = rng.randint(2015, 2025)
+    return {
+        "id": i,
+        "title": joiner.join(title_words).capitalize(),
+        "authors": [f"{rng.choice(GIVEN)} {rng.choice(SURNAMES)}" for _ in range(rng.randint(1, 4))],
+        "year": year,
+        "month": rng.randint(1, 12),
+        "abstract": joiner.join(body) + ("。" if chinese else "."),
+        "arxiv_url": f"http://arxiv.org/abs/{year % 100:02d}{rng.randint(1, 12):02d}.{i:05d}v1",
+        "pdf_url": f"http://arxiv.org/pdf/{year % 100:02d}{rng.randint(1, 12):02d}.{i:05d}v1.pdf",
+        "word_count": len(body),
+        "language": "Chinese" if chinese else "English",
+        "source": "synthetic",
+        "doi": "",
+    }
+
+
+def write_corpus(path, n_papers, seed=0):
+    """Stream n_papers records to a JSON Lines file"""
+    rng = random.Random(seed)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for i in range(n_papers):
+            f.write(json.dumps(synthetic_paper(i, rng), ensure_ascii=False))
+            f.write("\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def corpus_path(size, seed=0):
+    """
+    Directory and corpus file for a named size ("1k", "100k", "1m") or a
+    plain number of papers, generated on first use.
+    """
+    n_papers = SIZES.get(size) or int(size)
+    directory = os.path.join(DATA_DIR, f"{size}-seed{seed}")
+    path = os.path.join(directory, CORPUS_NAME)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        write_corpus(path, n_papers, seed)
+    return path
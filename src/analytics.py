@@ -0,0 +1,200 @@
+# src/analytics.py
+"""
+Aggregate cube behind the Statistics mode.
+
+Papers are counted once per (category, year, language) cell, together with
+the sum of their word counts and a fixed-width word-count histogram per
+cell. Every chart and metric is then a sum over a few axes of these small
+arrays, independent of the number of papers.
+
+The cube is built once per corpus version, in batches through add(), and
+saved next to the columnar cache. add() also updates it in place when new
+papers are appended; new categories / years / languages simply grow the
+axes.
+"""
+import json
+import os
+
+import numpy as np
+
+DIMENSIONS = ("category", "year", "language")
+WORD_BIN_WIDTH = 20
+WORD_BINS = 50          # 0-19, 20-39, ..., 980-999, then one bin for 1000+
+BUILD_BATCH = 100000
+
+
+def _label(value):
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return value if isinstance(value, int) else str(value)
+
+
+class StatsCube:
+    def __init__(self, values=None, counts=None, word_sums=None, word_hist=None):
+        self.values = values or {dim: [] for dim in DIMENSIONS}
+        shape = tuple(len(self.values[dim]) for dim in DIMENSIONS)
+        self.counts = np.zeros(shape, dtype=np.int64) if counts is None else counts
+        self.word_sums = np.zeros(shape, dtype=np.int64) if word_sums is None else word_sums
+        self.word_hist = np.zeros(shape + (WORD_BINS + 1,), dtype=np.int64) if word_hist is None else word_hist
+        self._positions = {dim: {v: i for i, v in enumerate(self.values[dim])} for dim in DIMENSIONS}
+
+    @classmethod
+    def build(cls, papers_df, batch_size=BUILD_BATCH):
+        cube = cls()
+        for start in range(0, len(papers_df), batch_size):
+            cube.add(papers_df.iloc[start:start + batch_size])
+        return cube
+
+    # ===== INCREMENTAL UPDATES =====
+    def _position(self, dim, value):
+        positions = self._positions[dim]
+        if value not in positions:
+            positions[value] = len(self.values[dim])
+            self.values[dim].append(value)
+        return positions[value]
+
+    def _codes(self, dim, papers_df):
+        """Axis positions for a column, growing the axis for new values"""
+        import pandas as pd
+
+        # Missing values (or a missing column) are counted as "Unknown"
+        missing = 0 if dim == "year" else "Unknown"
+        if dim not in papers_df.columns:
+            return np.full(len(papers_df), self._position(dim, missing), dtype=np.int64)
+        series = papers_df[dim]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object)
+        codes, uniques = pd.factorize(series)
+        mapping = np.empty(len(uniques) + 1, dtype=np.int64)
+        for i, value in enumerate(uniques):
+            mapping[i] = self._position(dim, _label(value))
+        if (codes < 0).any():
+            mapping[-1] = self._position(dim, missing)
+        return mapping[codes]
+
+    def _grow(self):
+        shape = tuple(len(self.values[dim]) for dim in DIMENSIONS)
+        if shape == self.counts.shape:
+            return
+        pad = [(0, new - old) for new, old in zip(shape, self.counts.shape)]
+        self.counts = np.pad(self.counts, pad)
+        self.word_sums = np.pad(self.word_sums, pad)
+        self.word_hist = np.pad(self.word_hist, pad + [(0, 0)])
+
+    def add(self, papers_df):
+        """Count a batch of papers (a DataFrame slice) into the cube"""
+        n = len(papers_df)
+        if n == 0:
+            return
+        codes = [self._codes(dim, papers_df) for dim in DIMENSIONS]
+        self._grow()
+
+        if "word_count" in papers_df.columns:
+            words = np.nan_to_num(papers_df["word_count"].to_numpy(dtype=np.float64)).astype(np.int64)
+        else:
+            words = np.zeros(n, dtype=np.int64)
+        bins = np.minimum(np.maximum(words, 0) // WORD_BIN_WIDTH, WORD_BINS)
+
+        cell = np.ravel_multi_index(codes, self.counts.shape)
+        size = self.counts.size
+        self.counts += np.bincount(cell, minlength=size).reshape(self.counts.shape)
+        self.word_sums += np.bincount(cell, weights=words, minlength=size).astype(np.int64).reshape(self.counts.shape)
+        hist_cell = cell * (WORD_BINS + 1) + bins
+        self.word_hist += np.bincount(hist_cell, minlength=self.word_hist.size).reshape(self.word_hist.shape)
+
+    # ===== QUERIES =====
+    def _select(self, array, selections):
+        """Restrict array to the selected value of each dimension (None = all)"""
+        index = []
+        for dim in DIMENSIONS:
+            value = (selections or {}).get(dim)
+            if value is None:
+                index.append(slice(None))
+            else:
+                position = self._positions[dim].get(_label(value))
+                if position is None:
+                    return np.zeros((0,) * len(DIMENSIONS) + array.shape[len(DIMENSIONS):], dtype=array.dtype)
+                index.append(slice(position, position + 1))
+        return array[tuple(index)]
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    @property
+    def total_words(self):
+        return int(self.word_sums.sum())
+
+    def marginal(self, dim, selections=None):
+        """
+        {value: papers} for one dimension, most frequent first (years
+        ascending), within the selected values of the other dimensions
+        """
+        axis = DIMENSIONS.index(dim)
+        other = tuple(i for i in range(len(DIMENSIONS)) if i != axis)
+        selections = {d: v for d, v in (selections or {}).items() if d != dim}
+        totals = self._select(self.counts, selections).sum(axis=other)
+        pairs = [(v, int(c)) for v, c in zip(self.values[dim], totals) if c > 0]
+        if dim == "year":
+            pairs.sort(key=lambda pair: pair[0])
+        else:
+            pairs.sort(key=lambda pair: (-pair[1], str(pair[0])))
+        return dict(pairs)
+
+    def trends(self, categories=None, language=None):
+        """
+        Papers per (category, year) as {category: {year: count}}, for the
+        given categories (default all), optionally within one language
+        """
+        selected = self._select(self.counts, {"language": language}).sum(axis=2)
+        years = sorted((y, i) for i, y in enumerate(self.values["year"]))
+        out = {}
+        for category in categories or self.values["category"]:
+            row = self._positions["category"].get(category)
+            if row is None or selected.shape[0] == 0:
+                continue
+            out[category] = {year: int(selected[row, i]) for year, i in years if selected[row, i] > 0}
+        return out
+
+    def word_histogram(self, selections=None):
+        """[(bin label, papers)] from the first to the last non-empty bin"""
+        hist = self._select(self.word_hist, selections).reshape(-1, WORD_BINS + 1).sum(axis=0)
+        nonzero = np.flatnonzero(hist)
+        if not len(nonzero):
+            return []
+        labels = [f"{i * WORD_BIN_WIDTH}-{(i + 1) * WORD_BIN_WIDTH - 1}" for i in range(WORD_BINS)]
+        labels.append(f"{WORD_BINS * WORD_BIN_WIDTH}+")
+        return [(labels[i], int(hist[i])) for i in range(nonzero[0], nonzero[-1] + 1)]
+
+    # ===== PERSISTENCE =====
+    def save(self, path):
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            counts=self.counts,
+            word_sums=self.word_sums,
+            word_hist=self.word_hist,
+            values=np.array(json.dumps(self.values, ensure_ascii=False))
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            values = json.loads(str(data["values"]))
+            return cls(values, data["counts"], data["word_sums"], data["word_hist"])
+
+
+def open_stats_cube(corpus, papers_df):
+    """Load the cube stored with a columnar corpus cache, building it once"""
+    path = os.path.join(corpus.cache_dir, "stats_cube.npz")
+    if os.path.exists(path):
+        return StatsCube.load(path)
+    cube = StatsCube.build(papers_df)
+    try:
+        cube.save(path)
+    except OSError:
+        pass
+    return cube
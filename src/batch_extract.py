@@ -0,0 +1,77 @@
+# src/batch_extract.py
+"""
+Parallel text extraction for multi-file PDF uploads.
+
+Extraction is CPU-bound (pdfplumber is pure Python, and the faster backends
+are not thread-safe), so threads would not help. Uploads are instead handed to a process pool and results are yielded
+as each file finishes, so the caller can render them incrementally.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+MAX_WORKERS = os.cpu_count() or 1
+DEFAULT_WORKERS = min(4, MAX_WORKERS)
+
+
+def extract_upload(data, max_pages=3, backend=None):
+    """
+    Worker entry point: text, abstract and word count of one PDF, plus the
+    extraction time measured inside the worker (seconds)
+    """
+    from src.pdf_processor import SimplePDFProcessor
+
+    start = time.perf_counter()
+    processor = SimplePDFProcessor(backend)
+    text = processor.extract_text(data, max_pages=max_pages)
+    return {
+        "text": text,
+        "abstract": processor.extract_abstract(text),
+        "word_count": processor.count_words(text),
+        "seconds": time.perf_counter() - start
+    }
+
+
+def make_pool(max_workers=MAX_WORKERS):
+    """
+    Shared pool; worker processes are started on demand, so a large
+    max_workers costs nothing until that many files are in flight.
+    spawn, not fork: the Streamlit server process is multi-threaded.
+    """
+    return ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def iter_extracted(pool, jobs, max_pages=3, max_workers=DEFAULT_WORKERS, backend=None):
+    """
+    jobs maps an arbitrary key to PDF bytes. Yield (key, result, error) in
+    completion order, with at most max_workers files in flight at a time.
+    Without a pool, files are extracted in-process one by one.
+    """
+    if pool is None:
+        for key, data in jobs.items():
+            try:
+                yield key, extract_upload(data, max_pages, backend), None
+            except Exception as e:
+                yield key, None, e
+        return
+
+    pending = iter(jobs.items())
+    in_flight = {}
+    while True:
+        for key, data in islice(pending, max(1, max_workers) - len(in_flight)):
+            try:
+                in_flight[pool.submit(extract_upload, data, max_pages, backend)] = key
+            except Exception as e:
+                # e.g. BrokenProcessPool after a worker crash
+                yield key, None, e
+        if not in_flight:
+            return
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            key = in_flight.pop(future)
+            try:
+                yield key, future.result(), None
+            except Exception as e:
+                yield key, None, e
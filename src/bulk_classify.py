@@ -0,0 +1,173 @@
+# src/bulk_classify.py
+"""
+Headless bulk classification of a paper corpus.
+
+    python -m src.bulk_classify papers.jsonl -o classified.jsonl --workers 8
+
+Records are streamed from a JSON, JSON Lines or CSV corpus, classified in
+chunks across a process pool and written out incrementally in input order.
+Only the classifier is imported in the workers, never Streamlit.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from src.classifier import classify_batch, category_labels
+from src.corpus import corpus_format, iter_records
+
+OUTPUT_FIELDS = ["id", "title", "category"]
+
+
+def classify_chunk(records):
+    """Return the deep-classification category of every record"""
+    category_ids, _ = classify_batch(
+        [r.get("title", "") for r in records],
+        [r.get("abstract", "") for r in records]
+    )
+    return category_labels(category_ids).tolist()
+
+
+def format_results(records, categories, fields, out_fmt):
+    """Render classified records as one block of JSON Lines or CSV rows"""
+    rows = []
+    for record, category in zip(records, categories):
+        row = {field: record.get(field, "") for field in fields}
+        row["category"] = category
+        rows.append(row)
+
+    if out_fmt == "csv":
+        buf = io.StringIO()
+        csv.DictWriter(buf, fieldnames=fields).writerows(rows)
+        return buf.getvalue()
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+
+def parse_records(chunk):
+    """
+    (records, skipped count): raw JSON Lines are decoded, and lines that
+    are not valid JSON or not a JSON object are skipped
+    """
+    records = []
+    skipped = 0
+    for item in chunk:
+        if isinstance(item, str):
+            try:
+                item = json.loads(item)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+        if isinstance(item, dict):
+            records.append(item)
+        else:
+            skipped += 1
+    return records, skipped
+
+
+def process_chunk(chunk, fields, out_fmt):
+    """
+    Worker entry point. JSON Lines chunks arrive as raw lines so that
+    parsing and formatting happen in the worker, not the parent.
+    Returns (output block, records classified, records skipped).
+    """
+    records, skipped = parse_records(chunk)
+    if not records:
+        return "", 0, skipped
+    return format_results(records, classify_chunk(records), fields, out_fmt), len(records), skipped
+
+
+def iter_input(path, fmt):
+    """Yield raw JSON Lines or parsed records for everything else"""
+    if fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield line
+    else:
+        yield from iter_records(path, fmt)
+
+
+def iter_chunks(items, chunk_size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(items, fields, out_fmt, workers=1, chunk_size=1000):
+    """
+    Yield (output block, record count, skipped count) per chunk, in input order.
+    At most two chunks per worker are in flight, so memory stays bounded.
+    """
+    chunks = iter_chunks(items, chunk_size)
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield process_chunk(chunk, fields, out_fmt)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(process_chunk, chunk, fields, out_fmt))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-classify a finance paper corpus")
+    parser.add_argument("input", help="JSON, JSON Lines or CSV corpus")
+    parser.add_argument("-o", "--output", default="-", help="output .jsonl or .csv file (default: stdout)")
+    parser.add_argument("--input-format", choices=["json", "jsonl", "csv"], help="override input format detection")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="records per worker task")
+    parser.add_argument("--fields", default=",".join(OUTPUT_FIELDS), help="comma-separated fields to write")
+    parser.add_argument("--report-every", type=int, default=100000, help="progress report interval (records)")
+    args = parser.parse_args(argv)
+
+    fields = [f.strip() for f in args.fields.split(",") if f.strip()]
+    if "category" not in fields:
+        fields.append("category")
+    out_fmt = "csv" if args.output.lower().endswith(".csv") else "jsonl"
+    items = iter_input(args.input, args.input_format or corpus_format(args.input))
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    start = time.perf_counter()
+    count = 0
+    skipped = 0
+    next_report = args.report_every
+    try:
+        if out_fmt == "csv":
+            csv.DictWriter(out, fieldnames=fields).writeheader()
+        for block, n, n_skipped in run(items, fields, out_fmt, args.workers, args.chunk_size):
+            out.write(block)
+            count += n
+            skipped += n_skipped
+            if args.report_every and count >= next_report:
+                next_report += args.report_every
+                elapsed = time.perf_counter() - start
+                print(f"{count:,} docs in {elapsed:.1f}s ({count / elapsed:,.0f} docs/sec)", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Classified {count:,} docs in {elapsed:.2f}s ({rate:,.0f} docs/sec)", file=sys.stderr)
+    if skipped:
+        print(f"Skipped {skipped:,} invalid records (bad JSON or not an object)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+# src/classifier.py
+import hashlib
+import json
+from itertools import islice
+
+import numpy as np
+
+from src.taxonomy import ID_DTYPE, TAXONOMY
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Keyword-based deep classification
+CATEGORY_KEYWORDS = {
+
+    # ===== Quantitative & Modeling =====
+    "Quantitative Finance": [
+        "quantitative", "stochastic", "pricing model", "ito",
+        "martingale", "numerical method",
+        "随机", "定价模型", "数值方法"
+    ],
+
+    "Asset Pricing": [
+        "asset pricing", "capm", "factor model",
+        "expected return", "risk premium",
+        "资产定价", "风险溢价", "因子模型"
+    ],
+
+    "Financial Econometrics": [
+        "econometric", "panel data", "time series",
+        "garch", "cointegration",
+        "计量经济", "面板数据", "时间序列", "协整"
+    ],
+
+    # ===== Corporate & Banking =====
+    "Corporate Finance": [
+        "corporate finance", "capital structure",
+        "dividend policy", "firm value",
+        "公司金融", "资本结构", "企业价值"
+    ],
+
+    "Banking": [
+        "bank", "commercial bank", "credit risk",
+        "loan", "deposit",
+        "银行", "信贷", "不良贷款"
+    ],
+
+    "Risk Management": [
+        "risk management", "var", "cvar",
+        "stress test", "volatility",
+        "风险管理", "压力测试", "波动率"
+    ],
+
+    # ===== Digital & Tech =====
+    "Fintech": [
+        "fintech", "financial technology",
+        "machine learning", "ai finance",
+        "金融科技", "人工智能金融"
+    ],
+
+    "Digital Finance": [
+        "digital finance", "platform finance",
+        "internet finance",
+        "数字金融", "互联网金融"
+    ],
+
+    "Cryptocurrency": [
+        "cryptocurrency", "bitcoin", "blockchain",
+        "defi", "smart contract",
+        "加密货币", "区块链"
+    ],
+
+    # ===== Sustainability =====
+    "Sustainable Finance": [
+        "sustainable finance", "esg",
+        "responsible investment",
+        "可持续金融", "责任投资"
+    ],
+
+    "Green Finance": [
+        "green finance", "green bond", "green credit",
+        "renewable energy finance",
+        "绿色金融", "绿色债券", "绿色信贷"
+    ],
+
+    "Climate Finance": [
+        "climate finance", "climate risk",
+        "carbon pricing", "carbon market",
+        "carbon emission",
+        "气候金融", "气候风险",
+        "碳定价", "碳交易", "碳排放"
+    ],
+
+    # ===== Policy =====
+    "Monetary Policy": [
+        "monetary policy", "interest rate",
+        "central bank",
+        "货币政策", "利率", "央行"
+    ],
+
+    # ===== Chinese-specific =====
+    "Pension Finance": [
+        "养老金融", "养老金", "退休"
+    ]
+}
+
+DEFAULT_CATEGORY = "Financial Markets"
+
+# Changes whenever the keyword taxonomy does; derived data keyed on it
+# (e.g. the columnar corpus cache) is rebuilt automatically
+KEYWORD_FINGERPRINT = hashlib.md5(
+    json.dumps(CATEGORY_KEYWORDS, sort_keys=True, ensure_ascii=False).encode("utf-8")
+).hexdigest()[:12]
+
+
+class KeywordMatcher:
+    """
+    Compiled multi-keyword matcher for the category taxonomy.
+
+    The keywords are compiled once into an Aho-Corasick automaton
+    (pyahocorasick), so a document is scanned in a single pass and every
+    occurrence is found, including overlapping ones such as
+    "credit risk" / "risk management". Without pyahocorasick it falls back
+    to one substring scan per unique, pre-lowercased keyword. A keyword
+    counts at most once per document, matching ``kw in text`` semantics.
+
+    Labels are taxonomy IDs and score vectors have one entry per taxonomy
+    category (zero for categories without keywords).
+    """
+
+    def __init__(self, category_keywords, default_category=DEFAULT_CATEGORY, taxonomy=TAXONOMY):
+        self.taxonomy = taxonomy
+        self.categories = list(category_keywords)
+        unknown = [name for name in self.categories + [default_category] if name not in taxonomy]
+        if unknown:
+            raise ValueError(f"Categories missing from the taxonomy: {unknown}")
+        # Taxonomy ID of every keyword category, in priority order
+        self.category_ids = taxonomy.ids(self.categories).astype(np.int64)
+        if len(set(self.category_ids.tolist())) != len(self.category_ids):
+            raise ValueError("Several keyword categories name the same taxonomy category")
+        self.default_id = taxonomy.id(default_category)
+
+        # keyword -> category indices (a keyword may be shared by categories)
+        keyword_categories = {}
+        for cat_idx, keywords in enumerate(category_keywords.values()):
+            for kw in keywords:
+                keyword_categories.setdefault(kw.lower(), []).append(cat_idx)
+
+        self.keywords = sorted(keyword_categories)
+        keyword_ids = {kw: i for i, kw in enumerate(self.keywords)}
+
+        # keyword x category incidence; a document's scores are the column
+        # sums over the keywords it contains
+        self._incidence = np.zeros((len(self.keywords), len(self.categories)), dtype=np.int32)
+        for kw, cat_indices in keyword_categories.items():
+            for cat_idx in cat_indices:
+                self._incidence[keyword_ids[kw], cat_idx] += 1
+
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for kw, kw_id in keyword_ids.items():
+                self._automaton.add_word(kw, kw_id)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+
+    def matched_keywords(self, text):
+        """Return the set of keyword ids occurring in already-lowercased text"""
+        if self._automaton is not None:
+            return {kw_id for _, kw_id in self._automaton.iter(text)}
+
+        return {kw_id for kw_id, kw in enumerate(self.keywords) if kw in text}
+
+    def _expand(self, scores):
+        """Keyword-category scores -> scores indexed by taxonomy ID"""
+        out = np.zeros(scores.shape[:-1] + (len(self.taxonomy),), dtype=np.int32)
+        out[..., self.category_ids] = scores
+        return out
+
+    def _category_scores(self, text):
+        found = self.matched_keywords(text)
+        if not found:
+            return np.zeros(len(self.categories), dtype=np.int32)
+        return self._incidence[list(found)].sum(axis=0, dtype=np.int32)
+
+    def score(self, text):
+        """Keyword hit counts per taxonomy ID for already-lowercased text"""
+        return self._expand(self._category_scores(text))
+
+    def classify(self, text):
+        """Return (category ID, score vector); ties go to the earlier keyword category"""
+        scores = self._category_scores(text)
+        category_id = int(self.category_ids[scores.argmax()]) if scores.any() else self.default_id
+        return category_id, self._expand(scores)
+
+    def _category_scores_batch(self, texts):
+        doc_ids = []
+        keyword_ids = []
+        n_docs = 0
+        for doc_id, text in enumerate(texts):
+            found = self.matched_keywords(text)
+            doc_ids.extend([doc_id] * len(found))
+            keyword_ids.extend(found)
+            n_docs = doc_id + 1
+
+        n_categories = len(self.categories)
+        if not keyword_ids:
+            return np.zeros((n_docs, n_categories), dtype=np.int32)
+
+        # Sparse (doc, keyword) hits -> dense scores in one bincount
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        hit_rows = self._incidence[np.asarray(keyword_ids, dtype=np.int64)]
+        flat = (doc_ids[:, None] * n_categories + np.arange(n_categories)).ravel()
+        scores = np.bincount(flat, weights=hit_rows.ravel(), minlength=n_docs * n_categories)
+        return scores.reshape(n_docs, n_categories).astype(np.int32)
+
+    def score_batch(self, texts):
+        """Score matrix (documents x taxonomy IDs) for already-lowercased texts"""
+        return self._expand(self._category_scores_batch(texts))
+
+    def classify_batch(self, texts):
+        """Return (category ID array, score matrix) for already-lowercased texts"""
+        scores = self._category_scores_batch(texts)
+        best = scores.argmax(axis=1) if scores.size else np.zeros(len(scores), dtype=np.int64)
+        category_ids = self.category_ids[best].astype(ID_DTYPE)
+        category_ids[~scores.any(axis=1)] = self.default_id
+        return category_ids, self._expand(scores)
+
+
+KEYWORD_MATCHER = KeywordMatcher(CATEGORY_KEYWORDS)
+# Category name of every taxonomy ID
+CATEGORY_LABELS = TAXONOMY.names
+
+
+def deep_classify_with_scores(title, abstract):
+    """Return the best category and the score vector indexed by taxonomy ID"""
+    text = f"{title} {abstract}".lower()
+    category_id, scores = KEYWORD_MATCHER.classify(text)
+    return TAXONOMY.name(category_id), scores
+
+
+def deep_classify_paper(title, abstract):
+    return deep_classify_with_scores(title, abstract)[0]
+
+
+def _batch_texts(titles, abstracts):
+    return (f"{title} {abstract}".lower() for title, abstract in zip(titles, abstracts))
+
+
+def classify_batch(titles, abstracts):
+    """
+    Classify a whole column of papers at once.
+    Returns (taxonomy ID array, score matrix indexed by taxonomy ID).
+    """
+    return KEYWORD_MATCHER.classify_batch(_batch_texts(titles, abstracts))
+
+
+def iter_classify_batch(titles, abstracts, chunk_size=10000):
+    """Chunked classify_batch: yields (category IDs, scores) per chunk"""
+    texts = _batch_texts(titles, abstracts)
+    while True:
+        chunk = list(islice(texts, chunk_size))
+        if not chunk:
+            return
+        yield KEYWORD_MATCHER.classify_batch(chunk)
+
+
+def category_labels(category_ids):
+    """Map category IDs from classify_batch to category names"""
+    return CATEGORY_LABELS[np.asarray(category_ids)]
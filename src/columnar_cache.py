@@ -0,0 +1,337 @@
+# src/columnar_cache.py
+"""
+Columnar on-disk cache of the parsed research library.
+
+The first load streams the corpus through src.corpus and writes one file
+per column into a cache directory keyed on the corpus path, mtime, size,
+keyword lists and category taxonomy, after dropping near-duplicate papers
+(src.dedup).
+Later starts just memory-map those files:
+
+- category is stored as taxonomy IDs (src.taxonomy)
+- language / source are integer codes plus a small vocabulary
+- year / month / word_count are compact integer arrays
+- text columns are a NUL-terminated UTF-8 blob with an int64 offset array,
+  so a single value (e.g. one abstract) can be read without decoding the
+  rest of the column
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from array import array
+
+import numpy as np
+
+from src.classifier import KEYWORD_FINGERPRINT
+from src.corpus import CHUNK_SIZE, is_paper_record, iter_corpus_chunks, iter_records
+from src.dedup import find_duplicates, unique_records_filter
+from src.taxonomy import FINGERPRINT as TAXONOMY_FINGERPRINT, ID_DTYPE, TAXONOMY
+from src.timing import timings
+
+CACHE_VERSION = 3
+CACHE_DIRNAME = ".corpus_cache"
+
+# Long text that is only decoded on demand, never put into the DataFrame
+LAZY_COLUMNS = ("abstract",)
+TAXONOMY_COLUMNS = ("category",)
+CODED_COLUMNS = ("language", "source")
+INT_COLUMNS = {"year": "int16", "month": "int8", "word_count": "int32"}
+LIST_COLUMNS = ("authors",)
+LIST_SEP = "\x1f"
+# Indexes stored in a cache that can be extended with appended papers
+CARRY_OVER = ("search_index",)
+PREVIOUS_SUFFIX = ".previous"
+
+
+def column_kind(name):
+    if name in TAXONOMY_COLUMNS:
+        return "taxonomy"
+    if name in CODED_COLUMNS:
+        return "codes"
+    if name in INT_COLUMNS:
+        return "int"
+    if name in LIST_COLUMNS:
+        return "list"
+    return "text"
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+class _ColumnWriter:
+    def __init__(self, cache_dir, name):
+        self.name = name
+        self.kind = column_kind(name)
+        self.rows = 0
+        if self.kind in ("text", "list"):
+            self._blob = open(os.path.join(cache_dir, f"{name}.bin"), "wb")
+            self._offsets = array("q", [0])
+        elif self.kind == "codes":
+            self._vocab = {}
+            self._codes = array("i")
+        elif self.kind == "taxonomy":
+            self._ids = []
+        else:
+            self._values = array("q")
+
+    def _encode(self, value):
+        if _is_missing(value):
+            text = ""
+        elif self.kind == "list" and isinstance(value, (list, tuple)):
+            text = LIST_SEP.join(str(v) for v in value)
+        else:
+            text = str(value)
+        return text.replace("\x00", " ").encode("utf-8") + b"\x00"
+
+    def append(self, values):
+        if self.kind == "taxonomy":
+            self._ids.append(TAXONOMY.codes(values))
+        elif self.kind in ("text", "list"):
+            end = self._offsets[-1]
+            for value in values:
+                data = self._encode(value)
+                self._blob.write(data)
+                end += len(data)
+                self._offsets.append(end)
+        elif self.kind == "codes":
+            vocab = self._vocab
+            self._codes.extend(
+                -1 if _is_missing(v) else vocab.setdefault(str(v), len(vocab))
+                for v in values
+            )
+        else:
+            import pandas as pd
+            numbers = pd.to_numeric(pd.Series(values), errors="coerce").fillna(0)
+            self._values.extend(numbers.astype("int64").tolist())
+        self.rows += len(values)
+
+    def pad(self, n):
+        """Append n missing values (column absent from a chunk)"""
+        self.append([None] * n)
+
+    def close(self, cache_dir):
+        meta = {"kind": self.kind}
+        if self.kind in ("text", "list"):
+            self._blob.close()
+            np.save(os.path.join(cache_dir, f"{self.name}.offsets.npy"), np.frombuffer(self._offsets, dtype=np.int64))
+        elif self.kind == "taxonomy":
+            ids = np.concatenate(self._ids) if self._ids else np.zeros(0, dtype=ID_DTYPE)
+            np.save(os.path.join(cache_dir, f"{self.name}.ids.npy"), ids.astype(ID_DTYPE))
+        elif self.kind == "codes":
+            dtype = np.int16 if len(self._vocab) < np.iinfo(np.int16).max else np.int32
+            np.save(os.path.join(cache_dir, f"{self.name}.codes.npy"), np.frombuffer(self._codes, dtype=np.int32).astype(dtype))
+            meta["categories"] = list(self._vocab)
+        else:
+            np.save(os.path.join(cache_dir, f"{self.name}.npy"), np.frombuffer(self._values, dtype=np.int64).astype(INT_COLUMNS[self.name]))
+        return meta
+
+
+def write_columnar_cache(corpus_path, cache_dir, chunk_size=CHUNK_SIZE, dedupe=True):
+    """
+    Stream the corpus chunk by chunk into a new columnar cache directory.
+    With dedupe, a first pass finds near-duplicate papers (src.dedup) and
+    only the canonical record of each cluster is classified and written.
+    """
+    os.makedirs(cache_dir)
+    record_filter = is_paper_record
+    n_duplicates = 0
+    if dedupe:
+        with timings.stage("dedup"):
+            keep = find_duplicates(iter_records(corpus_path), is_paper_record)
+        n_duplicates = int((~keep).sum())
+        record_filter = unique_records_filter(keep, is_paper_record)
+
+    writers = {}
+    n_rows = 0
+    for chunk_df in iter_corpus_chunks(corpus_path, chunk_size, record_filter):
+        for name in chunk_df.columns:
+            if name not in writers:
+                writers[name] = _ColumnWriter(cache_dir, name)
+                writers[name].pad(n_rows)
+            writers[name].append(chunk_df[name])
+        for name, writer in writers.items():
+            if name not in chunk_df.columns:
+                writer.pad(len(chunk_df))
+        n_rows += len(chunk_df)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(corpus_path),
+        "n_rows": n_rows,
+        "duplicates_removed": n_duplicates,
+        "order": list(writers),
+        "columns": {name: writer.close(cache_dir) for name, writer in writers.items()},
+    }
+    with open(os.path.join(cache_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+class ColumnarCorpus:
+    """Read-only, memory-mapped view of a columnar corpus cache"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.n_rows = self.meta["n_rows"]
+        self.columns = self.meta["order"]
+        self._arrays = {}
+
+    def __len__(self):
+        return self.n_rows
+
+    def _load(self, filename):
+        if filename not in self._arrays:
+            path = os.path.join(self.cache_dir, filename)
+            if filename.endswith(".npy"):
+                self._arrays[filename] = np.load(path, mmap_mode="r")
+            elif os.path.getsize(path) == 0:
+                self._arrays[filename] = np.empty(0, dtype=np.uint8)
+            else:
+                self._arrays[filename] = np.memmap(path, dtype=np.uint8, mode="r")
+        return self._arrays[filename]
+
+    def _decode_all(self, name):
+        blob = self._load(f"{name}.bin")
+        return bytes(blob).decode("utf-8").split("\x00")[:-1]
+
+    def column(self, name):
+        """Materialize one column as a pandas Series"""
+        import pandas as pd
+
+        info = self.meta["columns"][name]
+        kind = info["kind"]
+        if kind == "taxonomy":
+            values = TAXONOMY.categorical(self._load(f"{name}.ids.npy"))
+        elif kind == "codes":
+            codes = np.asarray(self._load(f"{name}.codes.npy"))
+            values = pd.Categorical.from_codes(codes, categories=info["categories"])
+        elif kind == "int":
+            values = np.asarray(self._load(f"{name}.npy"))
+        elif kind == "list":
+            values = [v.split(LIST_SEP) if v else [] for v in self._decode_all(name)]
+        else:
+            values = self._decode_all(name)
+        return pd.Series(values, name=name)
+
+    def frame(self, columns=None):
+        """DataFrame of all eagerly loaded columns (lazy text columns excluded)"""
+        import pandas as pd
+
+        if columns is None:
+            columns = [c for c in self.columns if c not in LAZY_COLUMNS]
+        return pd.DataFrame({name: self.column(name) for name in columns})
+
+    def text(self, name, row):
+        """Decode a single value of a text column, e.g. one abstract"""
+        if name not in self.meta["columns"]:
+            return ""
+        offsets = self._load(f"{name}.offsets.npy")
+        blob = self._load(f"{name}.bin")
+        return bytes(blob[offsets[row]:offsets[row + 1] - 1]).decode("utf-8")
+
+    def texts(self, name):
+        """Decode a whole text column"""
+        if name not in self.meta["columns"]:
+            return [""] * self.n_rows
+        return self._decode_all(name)
+
+    def prefix_digest(self, names, n_rows):
+        """
+        md5 of the first n_rows values of text/list columns, read straight
+        from the memory-mapped bytes: equal digests mean another corpus
+        starts with the same papers
+        """
+        digest = hashlib.md5(str(n_rows).encode("utf-8"))
+        for name in names:
+            digest.update(name.encode("utf-8") + b"\x00")
+            if name in self.meta["columns"] and n_rows:
+                offsets = self._load(f"{name}.offsets.npy")
+                digest.update(self._load(f"{name}.bin")[:offsets[n_rows]])
+        return digest.hexdigest()
+
+
+def _corpus_prefix(corpus_path):
+    """
+    Shared by every cache of one corpus file: its name plus a hash of its
+    absolute path, so corpora with the same name never match
+    """
+    path_hash = hashlib.md5(os.path.abspath(corpus_path).encode("utf-8")).hexdigest()[:8]
+    return f"{os.path.basename(corpus_path)}-{path_hash}-"
+
+
+def cache_key(corpus_path):
+    stat = os.stat(corpus_path)
+    return (
+        f"{_corpus_prefix(corpus_path)}{stat.st_mtime_ns}-{stat.st_size}-"
+        f"{KEYWORD_FINGERPRINT}-{TAXONOMY_FINGERPRINT}-v{CACHE_VERSION}"
+    )
+
+
+def _cache_root(corpus_path):
+    """Cache next to the corpus if writable, otherwise in the temp dir"""
+    root = os.path.join(os.path.dirname(os.path.abspath(corpus_path)), CACHE_DIRNAME)
+    try:
+        os.makedirs(root, exist_ok=True)
+        if os.access(root, os.W_OK):
+            return root
+    except OSError:
+        pass
+    root = os.path.join(tempfile.gettempdir(), "finance_research" + CACHE_DIRNAME)
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def _carry_over(cache_root, stale, cache_dir):
+    """
+    Move the extendable indexes of the newest stale cache into the new one
+    as <name>.previous, so papers appended to the corpus can be added to
+    them instead of rebuilding them (see src.search_index.open_search_index)
+    """
+    newest = max(stale, key=lambda name: os.path.getmtime(os.path.join(cache_root, name)), default=None)
+    if newest is None:
+        return
+    for name in CARRY_OVER:
+        previous = os.path.join(cache_root, newest, name)
+        if os.path.isdir(previous):
+            try:
+                os.replace(previous, os.path.join(cache_dir, name + PREVIOUS_SUFFIX))
+            except OSError:
+                pass
+
+
+def open_corpus(corpus_path, cache_root=None, chunk_size=CHUNK_SIZE):
+    """
+    Open the columnar cache for a corpus, building it on first use.
+    Stale caches of the same corpus file are removed, after handing their
+    extendable indexes to the new cache.
+    """
+    cache_root = cache_root or _cache_root(corpus_path)
+    key = cache_key(corpus_path)
+    cache_dir = os.path.join(cache_root, key)
+
+    if not os.path.exists(os.path.join(cache_dir, "meta.json")):
+        build_dir = tempfile.mkdtemp(prefix=key + ".", dir=cache_root)
+        try:
+            write_columnar_cache(corpus_path, os.path.join(build_dir, "cache"), chunk_size)
+            os.replace(os.path.join(build_dir, "cache"), cache_dir)
+        except OSError:
+            # Another process finished the same cache first
+            if not os.path.exists(os.path.join(cache_dir, "meta.json")):
+                raise
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+        prefix = _corpus_prefix(corpus_path)
+        stale = [
+            name for name in os.listdir(cache_root)
+            if name.startswith(prefix) and name != key and "." not in name[len(prefix):]
+        ]
+        _carry_over(cache_root, stale, cache_dir)
+        for name in stale:
+            shutil.rmtree(os.path.join(cache_root, name), ignore_errors=True)
+
+    return ColumnarCorpus(cache_dir)
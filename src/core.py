@@ -0,0 +1,111 @@
+# src/core.py
+"""
+Headless core behind the Streamlit app: locate and open the research
+library, load the text model and classify text.
+
+Importing this module has no side effects and pulls in numpy only; pandas
+is imported when a library is opened, and Streamlit, plotly and the PDF
+engines never. The app wraps these functions in its caches, and scripts,
+workers and benchmarks can call them directly:
+
+    from src.core import classify_text, load_classifier, open_library
+"""
+import os
+
+import numpy as np
+
+from src.classifier import KEYWORD_FINGERPRINT, KEYWORD_MATCHER
+from src.taxonomy import TAXONOMY
+from src.text_model import MODEL_PATH, TextClassifier
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_FILES = ["finance_research_papers.jsonl", "finance_research_papers.json"]
+# Softmax temperature when confidence scores are sharpened
+SHARP_TEMPERATURE = 0.5
+
+
+# ===== RESEARCH LIBRARY =====
+def find_corpus_file(base_dir=BASE_DIR):
+    """Prefer a JSON Lines corpus, fall back to the bundled JSON array"""
+    for name in CORPUS_FILES:
+        path = os.path.join(base_dir, name)
+        if os.path.exists(path):
+            return path
+    return os.path.join(base_dir, CORPUS_FILES[-1])
+
+
+def open_library(corpus_path):
+    """
+    (papers DataFrame, ColumnarCorpus) for a corpus, building the columnar
+    cache from the JSON on first use. Abstracts stay on disk until needed.
+    """
+    from src.columnar_cache import open_corpus
+
+    corpus = open_corpus(corpus_path)
+    return corpus.frame(), corpus
+
+
+# ===== CLASSIFICATION =====
+def load_classifier(model_path=MODEL_PATH):
+    """
+    Trained hashed TF-IDF classifier (see src/train_text_model.py). The
+    model is trained offline and shipped as an artifact; it is never
+    trained on demand.
+    """
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(
+            f"No trained text model at {model_path}. "
+            "Train one with: python -m src.train_text_model finance_research_papers.json"
+        )
+    return TextClassifier.load(model_path)
+
+
+def classifier_fingerprint(model):
+    """Identifies what produces classification results, for keying caches"""
+    if model is None:
+        return f"keywords-{KEYWORD_FINGERPRINT}"
+    return model.fingerprint
+
+
+def temperature(improve_confidence):
+    return SHARP_TEMPERATURE if improve_confidence else 1.0
+
+
+def ranked_results(ranked):
+    """[(category, probability), ...] -> result rows shown by the app"""
+    return [
+        {
+            "category": category,
+            "confidence": probability * 100,
+            "score": probability,
+            "wiki_link": TAXONOMY.link(category)
+        }
+        for category, probability in ranked
+    ]
+
+
+def keyword_top_k(text, k=5):
+    """
+    [(category, share of keyword hits), ...] best first, for keyword-only
+    mode; the default category with 0.0 when no keyword matches
+    """
+    scores = KEYWORD_MATCHER.score(text.lower())
+    total = scores.sum()
+    if not total:
+        return [(TAXONOMY.name(KEYWORD_MATCHER.default_id), 0.0)]
+    # Ties in keyword-category order, as in deep classification
+    ranked = KEYWORD_MATCHER.category_ids[np.argsort(-scores[KEYWORD_MATCHER.category_ids], kind="stable")]
+    return [(TAXONOMY.name(i), float(scores[i] / total)) for i in ranked[:k] if scores[i]]
+
+
+def classify_text(text, model, top_k=5, improve_confidence=True):
+    """
+    Classify text with the trained model: one sparse matrix-vector product
+    over the text model's finance categories. improve_confidence sharpens the
+    probabilities (softmax temperature 0.5) instead of reporting them raw.
+    With model=None (no trained model), or when the model knows none of the
+    text's terms, categories are ranked by keyword hits.
+    """
+    text = text if isinstance(text, str) else ""
+    ranked = model.top_k(text, top_k, temperature(improve_confidence)) if model is not None else []
+    return ranked_results(ranked or keyword_top_k(text, top_k))
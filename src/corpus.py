@@ -0,0 +1,187 @@
+# src/corpus.py
+import csv
+import json
+import os
+
+from src.timing import timings
+
+JSON_READ_SIZE = 1 << 16
+
+
+def corpus_format(path):
+    """Guess the corpus format ("json", "jsonl" or "csv") from the file name"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext == ".csv":
+        return "csv"
+    return "json"
+
+
+def _iter_json_array(f):
+    """Stream the elements of a top-level JSON array without loading it whole"""
+    decoder = json.JSONDecoder()
+    buf = f.read(JSON_READ_SIZE).lstrip()
+    if not buf.startswith("["):
+        # Not an array: a single record
+        data = json.loads(buf + f.read())
+        yield from (data if isinstance(data, list) else [data])
+        return
+
+    buf = buf[1:]
+    eof = False
+    while True:
+        buf = buf.lstrip().lstrip(",").lstrip()
+        if buf.startswith("]"):
+            return
+        try:
+            record, end = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = f.read(JSON_READ_SIZE)
+            eof = not more
+            buf += more
+            continue
+        yield record
+        buf = buf[end:]
+
+
+def _iter_jsonl(f):
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_no}: {e}") from e
+
+
+def iter_records(path, fmt=None):
+    """
+    Yield paper records one at a time from a JSON array, JSON Lines or CSV
+    corpus, so that arbitrarily large files can be processed in constant
+    memory.
+    """
+    fmt = fmt or corpus_format(path)
+    if fmt == "csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+    elif fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            yield from _iter_jsonl(f)
+    elif fmt == "json":
+        with open(path, "r", encoding="utf-8") as f:
+            yield from _iter_json_array(f)
+    else:
+        raise ValueError(f"Unsupported corpus format: {fmt}")
+
+
+# ===== CHUNKED LIBRARY LOADING =====
+CHUNK_SIZE = 5000
+URL_COLUMNS = ["arxiv_url", "pdf_url", "doi"]
+DEFAULT_YEAR = 2025
+
+
+def iter_record_chunks(path, chunk_size=CHUNK_SIZE, fmt=None):
+    """Yield lists of at most chunk_size records"""
+    chunk = []
+    for record in iter_records(path, fmt):
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def is_paper_record(record):
+    """Default per-chunk filter: keep records that have a title or abstract"""
+    return isinstance(record, dict) and bool(record.get("title") or record.get("abstract"))
+
+
+def normalize_authors(authors):
+    """Return authors as a list of names"""
+    if isinstance(authors, list):
+        return authors
+    elif isinstance(authors, str):
+        try:
+            import ast
+            parsed = ast.literal_eval(authors)
+            return parsed if isinstance(parsed, list) else [authors]
+        except (ValueError, SyntaxError):
+            return [authors]
+    else:
+        return ["Unknown Author"]
+
+
+def prepare_chunk(records):
+    """Build a normalized, deep-classified DataFrame from one chunk of records"""
+    import pandas as pd
+    from src.classifier import classify_batch
+    from src.taxonomy import TAXONOMY
+
+    chunk_df = pd.DataFrame(records)
+
+    # Fill NaN values for URL columns
+    for col in URL_COLUMNS:
+        if col in chunk_df.columns:
+            chunk_df[col] = chunk_df[col].fillna("")
+
+    # Apply deep classification to the whole column at once
+    blank = pd.Series("", index=chunk_df.index)
+    with timings.stage("deep_classify"):
+        category_ids, _ = classify_batch(
+            chunk_df.get("title", blank),
+            chunk_df.get("abstract", blank)
+        )
+    # Taxonomy IDs as categorical codes; names are only a shared lookup
+    chunk_df["category"] = TAXONOMY.categorical(category_ids)
+
+    chunk_df["year"] = pd.to_numeric(
+        chunk_df.get("year", DEFAULT_YEAR),
+        errors="coerce"
+    ).fillna(DEFAULT_YEAR).astype(int)
+
+    chunk_df["language"] = chunk_df.get("language", "Unknown")
+
+    if "authors" in chunk_df.columns:
+        chunk_df["authors"] = chunk_df["authors"].apply(normalize_authors)
+
+    return chunk_df
+
+
+def iter_corpus_chunks(path, chunk_size=CHUNK_SIZE, record_filter=is_paper_record, fmt=None):
+    """Yield prepared (filtered, normalized, classified) DataFrame chunks"""
+    chunks = iter_record_chunks(path, chunk_size, fmt)
+    while True:
+        with timings.stage("parse_corpus"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        if record_filter is not None:
+            chunk = [r for r in chunk if record_filter(r)]
+        if chunk:
+            yield prepare_chunk(chunk)
+
+
+def load_corpus_frame(path, chunk_size=CHUNK_SIZE, record_filter=is_paper_record, fmt=None):
+    """
+    Load a JSON / JSON Lines / CSV corpus into the library DataFrame.
+    Records are streamed in fixed-size chunks and filtered, normalized and
+    classified per chunk, so the raw record list never exists in full.
+    """
+    import pandas as pd
+
+    frames = list(iter_corpus_chunks(path, chunk_size, record_filter, fmt))
+    if not frames:
+        return pd.DataFrame()
+
+    papers_df = pd.concat(frames, ignore_index=True)
+    # Columns missing from some chunks come back as NaN after the concat
+    for col in URL_COLUMNS:
+        if col in papers_df.columns:
+            papers_df[col] = papers_df[col].fillna("")
+    papers_df["language"] = papers_df["language"].fillna("Unknown")
+    return papers_df
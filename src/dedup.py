@@ -0,0 +1,261 @@
+# src/dedup.py
+"""
+Near-duplicate detection at corpus ingest.
+
+Each paper's abstract (or title, when it has none) is lowercased, runs of
+punctuation and whitespace become one space, and it is cut into
+overlapping shingles of SHINGLE_SIZE characters. Hashing the shingles is
+a few vectorized operations on the UTF-32 code points, so it works the
+same for English and Chinese without tokenizing. To bound the work per
+paper only shingles whose mixed hash falls in a fixed 1/SHINGLE_SAMPLE
+slice are kept; the same shingles are kept in every document, so the
+Jaccard similarity of the samples still estimates that of the full sets.
+The sample is summarized by a MinHash signature of NUM_PERM values. Only the
+top 16 bits of each value are kept (b-bit MinHash), so the signatures of
+a million papers fit in 128 MB.
+
+Candidates come from LSH banding: the signature is split into BANDS bands
+of ROWS values and two papers are compared only if a whole band matches,
+found by sorting the band keys, so the cost grows as n log n instead of
+n^2. A candidate pair is a duplicate if its signatures agree on at least
+JACCARD_THRESHOLD of the values. Records with the same arXiv id (any
+version) are duplicates regardless of their text.
+
+Every cluster keeps one canonical record: the latest arXiv version, then
+the longest abstract, then the first in the corpus.
+"""
+import re
+
+import numpy as np
+
+SHINGLE_SIZE = 5
+SHINGLE_SAMPLE = 4
+NUM_PERM = 64
+ROWS = 4                        # values per band; 4 x 16 bits = one uint64 key
+BANDS = NUM_PERM // ROWS
+JACCARD_THRESHOLD = 0.8
+HASH_BATCH = 1000
+VERIFY_BATCH = 100000
+MINHASH_SEED = 0
+
+_ARXIV_RE = re.compile(r"arxiv\.org/(?:abs|pdf)/(.+?)(?:v(\d+))?(?:\.pdf)?/?$", re.IGNORECASE)
+_SEPARATOR_RE = re.compile(r"[\W_]+")
+_SHINGLE_BASE = np.uint64(0x100000001B3)
+_SHINGLE_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def arxiv_id(url):
+    """(arXiv id, version) of an arXiv abs/pdf URL, or (None, 0)"""
+    match = _ARXIV_RE.search(url) if isinstance(url, str) else None
+    if not match:
+        return None, 0
+    return match.group(1).lower(), int(match.group(2) or 0)
+
+
+def _clean(text):
+    return _SEPARATOR_RE.sub(" ", text.lower()).strip() if isinstance(text, str) else ""
+
+
+def shingle_hashes(texts, sample=SHINGLE_SAMPLE):
+    """
+    (hashes, document index) of the sampled SHINGLE_SIZE-character shingles
+    of a batch of texts, grouped by document. Repeats are kept (MinHash
+    ignores them). A text too short to keep any shingle keeps them all, and
+    one shorter than a shingle is a single shingle.
+    """
+    cleaned = [_clean(text) for text in texts]
+    lengths = np.array([len(text) for text in cleaned], dtype=np.int64)
+    # Zero padding between texts keeps every window inside its own text
+    padding = "\0" * (SHINGLE_SIZE - 1)
+    codes = np.frombuffer((padding.join(cleaned) + padding).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    n = len(codes) - SHINGLE_SIZE + 1
+    windows = np.zeros(n, dtype=np.uint64)
+    # Polynomial hash of every window (wrapping mod 2^64)
+    for i in range(SHINGLE_SIZE):
+        windows = windows * _SHINGLE_BASE + codes[i:i + n]
+    windows *= _SHINGLE_MIX
+
+    counts = np.where(lengths > 0, np.maximum(lengths - SHINGLE_SIZE + 1, 1), 0)
+    starts = np.cumsum(lengths + SHINGLE_SIZE - 1) - (lengths + SHINGLE_SIZE - 1)
+    docs = np.repeat(np.arange(len(cleaned)), counts)
+    first = np.cumsum(counts) - counts
+    hashes = windows[np.arange(len(docs)) - first[docs] + starts[docs]]
+
+    sampled = hashes < np.uint64(2 ** 64 // sample)
+    has_sample = np.bincount(docs[sampled], minlength=len(cleaned)) > 0
+    keep = sampled | ~has_sample[docs]
+    return hashes[keep], docs[keep]
+
+
+class MinHasher:
+    """b-bit MinHash with multiply-shift hash functions (a * x + b mod 2^64)"""
+
+    def __init__(self, num_perm=NUM_PERM, seed=MINHASH_SEED):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+
+    def signatures(self, shingles, docs, n_docs):
+        """
+        (n_docs, num_perm) uint16 signatures of shingles grouped by document
+        (as returned by shingle_hashes); rows of empty documents are 0
+        """
+        out = np.zeros((n_docs, len(self.a)), dtype=np.uint16)
+        if not len(shingles):
+            return out
+        nonempty = np.flatnonzero(np.bincount(docs, minlength=n_docs))
+        starts = np.searchsorted(docs, nonempty)
+        values = self.a[:, None] * shingles[None, :] + self.b[:, None]
+        minima = np.minimum.reduceat(values, starts, axis=1)
+        out[nonempty] = (minima >> np.uint64(48)).T.astype(np.uint16)
+        return out
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = np.arange(n, dtype=np.int64)
+
+    def find(self, i):
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+class DuplicateFinder:
+    """Collects signatures batch by batch, then clusters them once"""
+
+    def __init__(self, threshold=JACCARD_THRESHOLD, num_perm=NUM_PERM):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self._signatures = []
+        self._valid = []
+        self._arxiv = {}
+        self._versions = []
+        self._lengths = []
+        self.n_docs = 0
+
+    def add(self, records):
+        """Hash a batch of records (dicts); None marks a skipped record"""
+        texts = []
+        for i, record in enumerate(records):
+            text = ""
+            if record is not None:
+                text = record.get("abstract") or record.get("title") or ""
+                ident, version = arxiv_id(record.get("arxiv_url"))
+                if ident is not None:
+                    self._arxiv.setdefault(ident, []).append(self.n_docs + i)
+                self._versions.append(version)
+            else:
+                self._versions.append(0)
+            self._lengths.append(len(text) if isinstance(text, str) else 0)
+            texts.append(text)
+        shingles, docs = shingle_hashes(texts)
+        self._signatures.append(self.hasher.signatures(shingles, docs, len(records)))
+        self._valid.append(np.bincount(docs, minlength=len(records)) > 0)
+        self.n_docs += len(records)
+
+    def _candidate_pairs(self, signatures, valid):
+        """(i, j) pairs sharing at least one whole band"""
+        rows = np.flatnonzero(valid)
+        bands = np.ascontiguousarray(signatures[rows]).view(np.uint64)
+        pairs = []
+        for band in range(bands.shape[1]):
+            keys = bands[:, band]
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            same = np.flatnonzero(sorted_keys[1:] == sorted_keys[:-1]) + 1
+            if not len(same):
+                continue
+            # Pair every member of a run of equal keys with the run's first member
+            run_start = np.maximum.accumulate(np.where(
+                np.r_[True, sorted_keys[1:] != sorted_keys[:-1]], np.arange(len(keys)), 0
+            ))
+            pairs.append(np.stack([rows[order[run_start[same]]], rows[order[same]]], axis=1))
+        if not pairs:
+            return np.zeros((0, 2), dtype=np.int64)
+        return np.unique(np.concatenate(pairs), axis=0)
+
+    def clusters(self):
+        """Cluster root (lowest record ordinal) of every record"""
+        signatures = np.concatenate(self._signatures) if self._signatures else np.zeros((0, NUM_PERM), dtype=np.uint16)
+        valid = np.concatenate(self._valid) if self._valid else np.zeros(0, dtype=bool)
+        union_find = _UnionFind(self.n_docs)
+
+        pairs = self._candidate_pairs(signatures, valid)
+        for start in range(0, len(pairs), VERIFY_BATCH):
+            block = pairs[start:start + VERIFY_BATCH]
+            agreement = (signatures[block[:, 0]] == signatures[block[:, 1]]).mean(axis=1)
+            for i, j in block[agreement >= self.threshold]:
+                union_find.union(int(i), int(j))
+        for ordinals in self._arxiv.values():
+            for other in ordinals[1:]:
+                union_find.union(ordinals[0], other)
+        # Parents always point to a lower ordinal: jump until every record
+        # points at its root
+        roots = union_find.parent
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                return roots
+            roots = jumped
+
+    def keep_mask(self):
+        """True for the canonical record of every cluster (and every unique record)"""
+        roots = self.clusters()
+        keep = np.ones(self.n_docs, dtype=bool)
+        duplicated = np.flatnonzero(np.bincount(roots, minlength=self.n_docs) > 1)
+        if not len(duplicated):
+            return keep
+        members = np.flatnonzero(np.isin(roots, duplicated))
+        versions = np.asarray(self._versions, dtype=np.int64)[members]
+        lengths = np.asarray(self._lengths, dtype=np.int64)[members]
+        # Best first within each cluster: latest version, longest abstract, earliest
+        order = np.lexsort((members, -lengths, -versions, roots[members]))
+        ranked = members[order]
+        first = np.r_[True, roots[ranked][1:] != roots[ranked][:-1]]
+        keep[ranked[~first]] = False
+        return keep
+
+
+def find_duplicates(records, record_filter=None, batch_size=HASH_BATCH):
+    """
+    Keep mask over a record stream: False for every record of a
+    near-duplicate cluster except its canonical one. Records rejected by
+    record_filter are kept (the filter still drops them later) but never
+    matched.
+    """
+    finder = DuplicateFinder()
+    batch = []
+    for record in records:
+        accepted = isinstance(record, dict) and (record_filter is None or record_filter(record))
+        batch.append(record if accepted else None)
+        if len(batch) >= batch_size:
+            finder.add(batch)
+            batch = []
+    if batch:
+        finder.add(batch)
+    return finder.keep_mask()
+
+
+def unique_records_filter(keep, record_filter=None):
+    """
+    Record filter for iter_corpus_chunks that also drops duplicates. It
+    must see every record once, in corpus order (as iter_corpus_chunks does).
+    """
+    position = iter(range(len(keep)))
+
+    def accept(record):
+        i = next(position, None)
+        unique = i is None or bool(keep[i])
+        return unique and (record_filter is None or record_filter(record))
+
+    return accept
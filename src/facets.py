@@ -0,0 +1,130 @@
+# src/facets.py
+"""
+Precomputed facet bitmaps for the Research Library filters.
+
+For every value of category / year / language a packed bitmap of the rows
+having that value is built once per corpus version. Filtering is then a
+bitwise AND of a few bitmaps (n_rows / 8 bytes each), and facet counts for
+every dropdown option are popcounts of the same bitmaps, so no DataFrame
+is copied or scanned until the final rows are materialized.
+"""
+import numpy as np
+
+FACET_COLUMNS = ("category", "year", "language")
+SORT_COLUMNS = ("year", "title")
+
+# Number of set bits in every possible byte
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _label(value):
+    """Facet values are kept as display strings ("2025", "English", ...)"""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+class FacetIndex:
+    def __init__(self, papers_df, columns=FACET_COLUMNS, sort_columns=SORT_COLUMNS):
+        import pandas as pd
+
+        self.n_rows = len(papers_df)
+        self.values = {}
+        self.bitmaps = {}
+        for col in columns:
+            if col not in papers_df.columns:
+                continue
+            series = papers_df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Alphabetical rather than category-code order
+                series = series.astype(object)
+            codes, uniques = pd.factorize(series, sort=True)
+            values = [_label(v) for v in uniques]
+            if col == "year":
+                # Newest first, like the original year dropdown
+                values = values[::-1]
+                codes = np.where(codes >= 0, len(values) - 1 - codes, -1)
+            bitmaps = np.zeros((len(values), self.packed_size), dtype=np.uint8)
+            for i in range(len(values)):
+                bitmaps[i] = np.packbits(codes == i)
+            self.values[col] = values
+            self.bitmaps[col] = bitmaps
+
+        # Rank of every row under each sort key, so sorting a selection is
+        # an argsort of small integers instead of a DataFrame sort
+        self.ranks = {}
+        for col in sort_columns:
+            if col in papers_df.columns:
+                order = np.argsort(papers_df[col].to_numpy(), kind="stable")
+                ranks = np.empty(self.n_rows, dtype=np.int64)
+                ranks[order] = np.arange(self.n_rows)
+                self.ranks[col] = ranks
+
+    @property
+    def packed_size(self):
+        return (self.n_rows + 7) // 8
+
+    def all_rows(self):
+        return np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def rows_bitmap(self, row_ids):
+        """Packed bitmap of an arbitrary set of row ids (e.g. search hits)"""
+        selected = np.zeros(self.n_rows, dtype=bool)
+        selected[np.asarray(row_ids, dtype=np.int64)] = True
+        return np.packbits(selected)
+
+    def value_bitmap(self, column, value):
+        try:
+            return self.bitmaps[column][self.values[column].index(value)]
+        except (KeyError, ValueError):
+            return np.zeros(self.packed_size, dtype=np.uint8)
+
+    def select(self, selections, base=None, exclude=None):
+        """
+        AND together the bitmaps of the selected facet values.
+        selections maps column -> value label (None means no filter).
+        """
+        mask = self.all_rows() if base is None else base.copy()
+        for column, value in selections.items():
+            if value is not None and column != exclude:
+                np.bitwise_and(mask, self.value_bitmap(column, value), out=mask)
+        return mask
+
+    def counts(self, column, mask):
+        """Number of rows in mask for every value of a facet"""
+        if column not in self.bitmaps:
+            return np.zeros(0, dtype=np.int64)
+        return _POPCOUNT[self.bitmaps[column] & mask].sum(axis=1, dtype=np.int64)
+
+    def facet_counts(self, selections, base=None):
+        """
+        {column: {value: count}}, where each facet's counts apply every
+        other selected filter but not its own (standard faceted search).
+        """
+        out = {}
+        for column in self.bitmaps:
+            mask = self.select(selections, base, exclude=column)
+            out[column] = dict(zip(self.values[column], self.counts(column, mask).tolist()))
+        return out
+
+    def contains(self, mask, row_ids):
+        """Boolean array telling which row ids are set in mask"""
+        selected = np.unpackbits(mask, count=self.n_rows).astype(bool)
+        return selected[np.asarray(row_ids, dtype=np.int64)]
+
+    def rows(self, mask):
+        """Row ids set in mask, ascending"""
+        return np.flatnonzero(np.unpackbits(mask, count=self.n_rows))
+
+    def count(self, mask):
+        return int(_POPCOUNT[mask].sum(dtype=np.int64))
+
+    def sort_rows(self, row_ids, column, descending=False):
+        """Sort row ids by a precomputed sort key"""
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        if column not in self.ranks:
+            return row_ids
+        order = np.argsort(self.ranks[column][row_ids], kind="stable")
+        return row_ids[order[::-1]] if descending else row_ids[order]
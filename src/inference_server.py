@@ -0,0 +1,407 @@
+# src/inference_server.py
+"""
+Local inference service for the text classifier, with micro-batching.
+
+    python -m src.inference_server --port 8765 --workers 4
+    python -m src.inference_server --socket /tmp/finance-classifier.sock
+
+    POST /classify  {"texts": [...], "top_k": 5, "temperature": 1.0}
+                 -> {"results": [[{"category": ..., "probability": ...}, ...], ...]}
+    GET  /health    -> {"status": "ok", "model": <fingerprint>, "requests": ..., "texts": ..., "batches": ...}
+
+Texts from concurrent requests are queued and collected into micro-batches
+(up to MAX_BATCH texts, or WINDOW_MS after the first one arrives). Each
+batch is scored with one sparse matrix product by a process pool that
+loads the model once per worker; while every worker is busy, new requests
+keep accumulating into the next batch. InferenceClient is the thread-safe
+keep-alive client used by app.py. /health reports the fingerprint of the
+served model, which clients use to key cached results.
+
+Run with --bench-clients N to start a server in-process and report the
+throughput and p50/p99 latency of N concurrent clients.
+"""
+import argparse
+import http.client
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import urlparse
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+WINDOW_MS = 5
+MAX_BATCH = 64
+REQUEST_TIMEOUT = 60
+
+# ===== WORKERS =====
+_MODEL = None
+
+
+def _init_worker(model_path):
+    """Load the trained model once per worker process"""
+    global _MODEL
+    from src.core import load_classifier
+
+    _MODEL = load_classifier(model_path)
+
+
+def classify_items(items):
+    """
+    Worker entry point: score a micro-batch of (text, top_k, temperature).
+    Texts the model knows no terms of are ranked by keyword hits, as in
+    src.core.classify_text.
+    """
+    from src.core import keyword_top_k
+
+    texts = [text for text, _, _ in items]
+    temperatures = [temperature for _, _, temperature in items]
+    k = max(top_k for _, top_k, _ in items)
+    ranked = _MODEL.top_k_batch(texts, k, temperatures)
+    return [
+        r[:top_k] if r else keyword_top_k(text, top_k)
+        for r, (text, top_k, _) in zip(ranked, items)
+    ]
+
+
+# ===== MICRO-BATCHING =====
+class MicroBatcher:
+    """Collect single texts from many request threads into batches for the pool"""
+
+    def __init__(self, executor, max_inflight, window_ms=WINDOW_MS, max_batch=MAX_BATCH):
+        self._executor = executor
+        self._queue = queue.Queue()
+        self._slots = threading.Semaphore(max_inflight)
+        self._lock = threading.Lock()
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.stats = {"requests": 0, "texts": 0, "batches": 0}
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts, top_k=5, temperature=1.0):
+        """Queue texts and return one Future per text"""
+        futures = []
+        for text in texts:
+            future = Future()
+            self._queue.put(((text, top_k, temperature), future))
+            futures.append(future)
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["texts"] += len(texts)
+        return futures
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            # Wait for a free worker before sealing the batch, so requests
+            # keep piling up into it while the pool is saturated
+            self._slots.acquire()
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            stop = False
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            with self._lock:
+                self.stats["batches"] += 1
+            futures = [future for _, future in batch]
+            try:
+                done = self._executor.submit(classify_items, [item for item, _ in batch])
+            except RuntimeError as e:
+                # Pool already shut down
+                self._slots.release()
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                done.add_done_callback(partial(self._resolve, futures))
+            if stop:
+                return
+
+    def _resolve(self, futures, done):
+        self._slots.release()
+        try:
+            results = done.result()
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+
+# ===== HTTP ENDPOINT =====
+class InferenceHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so the pooled client reuses its connections; without
+    # TCP_NODELAY the split header/body writes stall on delayed ACKs
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send(404, {"error": "not found"})
+            return
+        with self.server.batcher._lock:
+            stats = dict(self.server.batcher.stats)
+        self._send(200, {"status": "ok", "model": self.server.model_fingerprint, **stats})
+
+    def do_POST(self):
+        if self.path != "/classify":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            texts = body["texts"]
+            if isinstance(texts, str):
+                texts = [texts]
+            texts = [text if isinstance(text, str) else "" for text in texts]
+            top_k = max(1, int(body.get("top_k", 5)))
+            temperature = float(body.get("temperature", 1.0))
+            if temperature <= 0:
+                raise ValueError("temperature must be positive")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": f"Bad request: {e}"})
+            return
+
+        futures = self.server.batcher.submit(texts, top_k, temperature)
+        try:
+            results = [
+                [{"category": category, "probability": probability} for category, probability in future.result(timeout=REQUEST_TIMEOUT)]
+                for future in futures
+            ]
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+            return
+        self._send(200, {"results": results})
+
+    def _send(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix-socket peers have no address
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixInferenceHandler(InferenceHandler):
+    disable_nagle_algorithm = False
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(batcher, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, model_fingerprint=None):
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, UnixInferenceHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), InferenceHandler)
+        server.daemon_threads = True
+    server.batcher = batcher
+    server.model_fingerprint = model_fingerprint
+    return server
+
+
+# ===== CLIENT =====
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class InferenceClient:
+    """
+    Thread-safe client with a pool of keep-alive connections.
+    url is "http://host:port" or "unix:///path/to.sock".
+    """
+
+    def __init__(self, url, pool_size=8, timeout=REQUEST_TIMEOUT):
+        parsed = urlparse(url)
+        self.url = url
+        self.timeout = timeout
+        if parsed.scheme == "unix":
+            self._new = partial(_UnixHTTPConnection, parsed.path, timeout)
+        elif parsed.scheme in ("http", ""):
+            self._new = partial(
+                http.client.HTTPConnection,
+                parsed.hostname or DEFAULT_HOST,
+                parsed.port or DEFAULT_PORT,
+                timeout=timeout
+            )
+        else:
+            raise ValueError(f"Unsupported inference URL: {url}")
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"}
+        for attempt in range(2):
+            try:
+                conn = self._pool.get_nowait() if attempt == 0 else self._new()
+            except queue.Empty:
+                conn = self._new()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if attempt:
+                    raise
+                # The server may have dropped an idle pooled connection
+                continue
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+            result = json.loads(data)
+            if response.status != 200:
+                raise RuntimeError(result.get("error", f"HTTP {response.status}"))
+            return result
+
+    def classify(self, texts, top_k=5, temperature=1.0):
+        """[(category, probability), ...] best first, for every text"""
+        result = self._request("POST", "/classify", {
+            "texts": list(texts),
+            "top_k": top_k,
+            "temperature": temperature
+        })
+        return [[(r["category"], r["probability"]) for r in ranked] for ranked in result["results"]]
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def model_fingerprint(self):
+        """Fingerprint of the model the server classifies with"""
+        return self.health()["model"]
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# ===== CLI =====
+def run_benchmark(url, clients, requests_per_client, texts):
+    """Fire concurrent single-text requests; return (docs/sec, p50 ms, p99 ms)"""
+    client = InferenceClient(url, pool_size=clients)
+
+    def worker(offset):
+        latencies = []
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            client.classify([texts[(offset + i) % len(texts)]])
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    client.classify(texts[:1])  # warm up the workers
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        latencies = [lat for lats in pool.map(worker, range(clients)) for lat in lats]
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    return len(latencies) / elapsed, p50, p99
+
+
+def main(argv=None):
+    from src.text_model import MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Micro-batching inference server for the paper classifier")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="Serve on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--window-ms", type=float, default=WINDOW_MS, help="Micro-batch collection window")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--model", default=MODEL_PATH, help="Model artifact (.npz)")
+    parser.add_argument("--corpus", default="finance_research_papers.json",
+                        help="Corpus whose papers --bench-clients sends")
+    parser.add_argument("--bench-clients", type=int, default=0,
+                        help="Benchmark N concurrent clients against an in-process server and exit")
+    parser.add_argument("--bench-requests", type=int, default=50, help="Requests per benchmark client")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.model):
+        print(f"No trained model at {args.model}: train one with python -m src.train_text_model", file=sys.stderr)
+        return 1
+
+    from src.core import load_classifier
+    fingerprint = load_classifier(args.model).fingerprint
+
+    executor = ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.model,))
+    batcher = MicroBatcher(executor, args.workers, args.window_ms, args.max_batch)
+    server = make_server(batcher, args.host, args.port, args.socket, fingerprint)
+    if args.socket:
+        url = f"unix://{os.path.abspath(args.socket)}"
+    else:
+        url = f"http://{args.host}:{server.server_address[1]}"
+
+    try:
+        if args.bench_clients:
+            from src.corpus import iter_records
+            texts = [f"{r.get('title', '')} {r.get('abstract', '')}" for r in iter_records(args.corpus)]
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                docs_per_sec, p50, p99 = run_benchmark(url, args.bench_clients, args.bench_requests, texts)
+            finally:
+                server.shutdown()
+            print(f"{args.bench_clients} clients, {args.workers} workers: "
+                  f"{docs_per_sec:,.0f} docs/sec, p50 {p50:.1f} ms, p99 {p99:.1f} ms, "
+                  f"{batcher.stats['texts'] / max(1, batcher.stats['batches']):.1f} docs/batch")
+        else:
+            print(f"Serving classifier on {url} ({args.workers} workers)", file=sys.stderr)
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+        executor.shutdown()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
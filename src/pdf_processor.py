@@ -1,56 +1,509 @@
 # src/pdf_processor.py
-import pdfplumber
+"""
+PDF text extraction shared by the app, the upload workers and benchmarks.
+
+Extraction goes through a backend: pdfplumber (layout-aware, pure Python),
+or a faster text-only engine (PyMuPDF, pypdfium2) when one is installed.
+The fastest installed backend is used unless one is named explicitly or via
+the FINANCE_PDF_BACKEND environment variable. Every backend yields the same
+structure: (page_number, text) with 1-based page numbers and "\n" newlines.
+"""
+import importlib.util
+import io
+import mmap
+import os
 import re
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# Below this many pages a process pool costs more than it saves
+PARALLEL_MIN_PAGES = 16
+SPOOL_CHUNK = 1 << 20
+PDF_BACKEND_ENV = "FINANCE_PDF_BACKEND"
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable, read-only file over a buffer (bytes, memoryview, mmap) that never copies it whole"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos:end].tobytes() if end > self._pos else b""
+        self._pos = max(self._pos, end)
+        return data
+
+    def getbuffer(self):
+        """The whole buffer as a memoryview (no copy), like BytesIO.getbuffer()"""
+        return self._view
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+@contextmanager
+def open_buffer(pdf_file):
+    """
+    Seekable view of a PDF for a backend with at most one copy in memory.
+    Paths are opened by the backend itself; bytes and in-memory uploads
+    (BytesIO, Streamlit's UploadedFile) are read through a memoryview; any
+    other stream is spooled once to a memory-mapped temporary file. The
+    upload's own position is never moved, so it can be extracted again
+    (e.g. with a different max_pages).
+    """
+    if isinstance(pdf_file, (str, os.PathLike)):
+        yield pdf_file
+        return
+
+    if isinstance(pdf_file, (bytes, bytearray, memoryview, mmap.mmap)):
+        buffer = pdf_file
+    elif isinstance(pdf_file, io.BytesIO):
+        # getvalue() shares the bytes a BytesIO was created from (as
+        # UploadedFile is), whereas getbuffer() would force a private copy
+        buffer = pdf_file.getvalue()
+    else:
+        buffer = None
+
+    if buffer is not None:
+        reader = BufferReader(buffer)
+        try:
+            yield reader
+        finally:
+            reader.close()
+        return
+
+    position = pdf_file.tell() if pdf_file.seekable() else None
+    with tempfile.TemporaryFile() as tmp:
+        if position is not None:
+            pdf_file.seek(0)
+        shutil.copyfileobj(pdf_file, tmp, SPOOL_CHUNK)
+        if position is not None:
+            pdf_file.seek(position)
+        tmp.flush()
+        if tmp.tell() == 0:
+            yield BufferReader(b"")
+            return
+        with mmap.mmap(tmp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            reader = BufferReader(mapped)
+            try:
+                yield reader
+            finally:
+                reader.close()
+
+
+# ===== BACKENDS =====
+class PDFBackend:
+    """Text extraction engine; subclasses yield raw (page_number, text)"""
+    name = None
+    module = None
+
+    @classmethod
+    def available(cls):
+        return importlib.util.find_spec(cls.module) is not None
+
+    def page_count(self, source):
+        raise NotImplementedError
+
+    def iter_pages(self, source, start=0, stop=None):
+        raise NotImplementedError
+
+
+class PdfplumberBackend(PDFBackend):
+    """Layout-aware extraction in pure Python (the original engine)"""
+    name = "pdfplumber"
+    module = "pdfplumber"
+
+    def page_count(self, source):
+        import pdfplumber
+
+        with pdfplumber.open(source) as pdf:
+            return len(pdf.pages)
+
+    def iter_pages(self, source, start=0, stop=None):
+        import pdfplumber
+
+        with pdfplumber.open(source) as pdf:
+            for page in pdf.pages[start:stop]:
+                number = page.page_number
+                text = page.extract_text() or ""
+                page.close()
+                yield number, text
+
+
+class PdfiumBackend(PDFBackend):
+    """Text-only extraction with PDFium through pypdfium2"""
+    name = "pypdfium2"
+    module = "pypdfium2"
+    # PDFium is not thread-safe and Streamlit runs sessions in threads
+    _lock = threading.Lock()
+
+    def page_count(self, source):
+        import pypdfium2
+
+        with self._lock:
+            pdf = pypdfium2.PdfDocument(source)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+
+    def iter_pages(self, source, start=0, stop=None):
+        import pypdfium2
+
+        with self._lock:
+            pdf = pypdfium2.PdfDocument(source)
+        try:
+            for index in range(*slice(start, stop).indices(len(pdf))):
+                with self._lock:
+                    page = pdf[index]
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_range()
+                    textpage.close()
+                    page.close()
+                yield index + 1, text
+        finally:
+            with self._lock:
+                pdf.close()
+
+
+class PyMuPDFBackend(PDFBackend):
+    """Text-only extraction with MuPDF through PyMuPDF"""
+    name = "pymupdf"
+    module = "fitz"
+    _lock = threading.Lock()
+
+    def _open(self, source):
+        import fitz
+
+        if isinstance(source, (str, os.PathLike)):
+            return fitz.open(source)
+        # Open the buffer behind the reader in place: the upload's own bytes
+        # when it has them (any PyMuPDF version), otherwise the memoryview
+        view = source.getbuffer()
+        stream = view.obj if isinstance(view.obj, bytes) else view
+        return fitz.open(stream=stream, filetype="pdf")
+
+    def page_count(self, source):
+        with self._lock, self._open(source) as doc:
+            return doc.page_count
+
+    def iter_pages(self, source, start=0, stop=None):
+        with self._lock:
+            doc = self._open(source)
+        try:
+            for index in range(*slice(start, stop).indices(doc.page_count)):
+                with self._lock:
+                    text = doc[index].get_text()
+                yield index + 1, text
+        finally:
+            with self._lock:
+                doc.close()
+
+
+# Fastest first
+BACKENDS = {
+    backend.name: backend
+    for backend in (PyMuPDFBackend, PdfiumBackend, PdfplumberBackend)
+}
+
+
+def available_backends():
+    """Names of the installed backends, fastest first"""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def get_backend(backend=None):
+    """
+    Backend instance by name, or the fastest installed one.
+    Raises ImportError when the requested (or every) backend is missing.
+    """
+    if isinstance(backend, PDFBackend):
+        return backend
+    name = backend or os.environ.get(PDF_BACKEND_ENV)
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown PDF backend '{name}' (choose from {', '.join(BACKENDS)})")
+        if not BACKENDS[name].available():
+            raise ImportError(f"PDF backend '{name}' is not installed")
+        return BACKENDS[name]()
+    for backend_class in BACKENDS.values():
+        if backend_class.available():
+            return backend_class()
+    raise ImportError("No PDF backend installed: pip install pdfplumber")
+
+
+def _clean_page_text(text):
+    """Same text conventions for every backend"""
+    return text.replace("\r\n", "\n").replace("\r", "\n").replace("\x0c", "").strip()
+
+
+def iter_page_texts(pdf_file, start=0, stop=None, backend=None):
+    """
+    Yield (page_number, text) one page at a time. Each page is released as
+    soon as it has been read, and nothing after the last requested page is
+    parsed, so callers can stop early.
+    """
+    backend = get_backend(backend)
+    with open_buffer(pdf_file) as source:
+        for number, text in backend.iter_pages(source, start, stop):
+            yield number, _clean_page_text(text or "")
+
+
+def page_count(pdf_file, backend=None):
+    backend = get_backend(backend)
+    with open_buffer(pdf_file) as source:
+        return backend.page_count(source)
+
+
+def _extract_page_range(source, start, stop, backend=None):
+    """Worker entry point for page-parallel extraction"""
+    return list(iter_page_texts(source, start, stop, backend))
+
+
+def _page_part(number, text):
+    return f"--- Page {number} ---\n{text}\n\n"
+
+
+# ===== ABSTRACT DETECTION =====
+ABSTRACT_MAX_CHARS = 300
+ABSTRACT_MAX_LINES = 40
+
+_PAGE_MARKER_RE = re.compile(r'--- Page \d+ ---\n')
+_WHITESPACE_RE = re.compile(r'\s+')
+# Abstract heading on a line of its own, or followed by a delimiter and the
+# first words of the abstract ("Abstract: We study ...", "摘要：本文..."), so
+# body text such as "Abstract algebra ..." is not a heading. Searching for a
+# literal "\n" prefix lets the regex engine skip ahead to line starts, so a
+# document without a heading costs one fast scan; line 1 is checked with match().
+_ABSTRACT_HEADING = (
+    r'[ \t]*(?:abstract|summary|摘\s*要)'
+    r'(?:[ \t]*$|[ \t]*[:.\uff1a\u2013\u2014][ \t]*|[ \t]+-[ \t]+|(?<=要)[ \t]+)'
+    r'(?P<inline>[^\n]*)'
+)
+_ABSTRACT_FIRST_LINE_RE = re.compile(_ABSTRACT_HEADING, re.IGNORECASE | re.MULTILINE)
+_ABSTRACT_LINE_RE = re.compile(r'\n' + _ABSTRACT_HEADING, re.IGNORECASE | re.MULTILINE)
+# Section numbers: "1", "2.", "3.1", "IV." (not years such as "2008")
+_SECTION_NUMBER = r'(?:\d{1,2}(?:\.\d{1,2})*\.?|[IVX]+\.)'
+# First line of the next section: a known heading, or a short numbered
+# title such as "1. Introduction" / "II. Data". Labels of structured
+# abstracts (Background, Methods, ...) do not end the abstract.
+_SECTION_RE = re.compile(
+    r'(?:' + _SECTION_NUMBER + r'\s+)?'
+    r'(?i:introduction|key\s*words?\b|jel\b|literature review|引言|关键词|关键字|一、)'
+    r'|' + _SECTION_NUMBER + r'\s+[A-Z][^\n.,;]{0,60}$'
+)
+
+
+def find_abstract(text, max_lines=ABSTRACT_MAX_LINES):
+    """
+    Locate the abstract in extracted PDF text in linear time.
+    The heading is found by one precompiled regex scan, then the body
+    is read line by line until the first section heading (or max_lines),
+    so nothing after the abstract is looked at. A heading with an empty
+    body (e.g. one followed straight by "Keywords") does not count, and
+    the scan moves on to the next heading.
+    Returns (abstract, complete): (None, False) without a heading, and
+    complete is False when the text ends inside the abstract.
+    """
+    match = _ABSTRACT_FIRST_LINE_RE.match(text) or _ABSTRACT_LINE_RE.search(text)
+    while match is not None:
+        abstract, complete, pos = _read_abstract(text, match, max_lines)
+        if abstract:
+            return abstract, complete
+        match = _ABSTRACT_LINE_RE.search(text, pos)
+    return None, False
+
+
+def _read_abstract(text, match, max_lines):
+    """(abstract, complete, end position) of the body after a heading match"""
+    parts = [match.group("inline")]
+    n_lines = 0
+    complete = False
+    pos = match.end()
+    while True:
+        start = text.find("\n", pos)
+        if start < 0:
+            break
+        start += 1
+        end = text.find("\n", start)
+        if end < 0:
+            end = len(text)
+        line = text[start:end].strip()
+        if not line or line.startswith("--- Page "):
+            pos = end
+            continue
+        if _SECTION_RE.match(line):
+            complete = True
+            break
+        pos = end
+        parts.append(line)
+        n_lines += 1
+        if max_lines and n_lines >= max_lines:
+            complete = True
+            break
+    return _WHITESPACE_RE.sub(" ", " ".join(parts)).strip(), complete, pos
+
 
 class PDFProcessor:
-    def extract_text(self, pdf_file, max_pages=5):
+    def __init__(self, backend=None):
+        self.backend = get_backend(backend)
+
+    def iter_pages(self, pdf_file, max_pages=None):
+        """Lazily yield (page_number, text) for the first max_pages pages"""
+        yield from iter_page_texts(pdf_file, 0, max_pages, self.backend)
+
+    def extract_text(self, pdf_file, max_pages=5, parallel=False, workers=None):
         """
-        Extract text from PDF (first few pages)
+        Extract text from PDF (first few pages).
+        With parallel=True, long documents are split into page ranges that
+        are extracted in separate processes; parts are joined once, in order.
         """
-        text = ""
         try:
-            with pdfplumber.open(pdf_file) as pdf:
-                for i, page in enumerate(pdf.pages[:max_pages]):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += f"--- Page {i+1} ---\n{page_text}\n\n"
+            if parallel:
+                pages = self._extract_parallel(pdf_file, max_pages, workers)
+            else:
+                pages = self.iter_pages(pdf_file, max_pages)
+            text = "".join(_page_part(number, page_text) for number, page_text in pages if page_text)
         except Exception as e:
             text = f"Error extracting PDF: {str(e)}\n\n"
             text += "Make sure pdfplumber is installed: pip install pdfplumber"
         
         return text
-    
+
+    def _extract_parallel(self, pdf_file, max_pages=None, workers=None, executor=None):
+        # Workers reopen the document themselves, so send a path or the bytes
+        source = pdf_file
+        if not isinstance(pdf_file, (str, bytes, os.PathLike)):
+            source = pdf_file.getvalue() if hasattr(pdf_file, "getvalue") else pdf_file.read()
+        n_pages = page_count(source, self.backend)
+        if max_pages is not None:
+            n_pages = min(n_pages, max_pages)
+        workers = workers or os.cpu_count() or 1
+        if n_pages < PARALLEL_MIN_PAGES or workers < 2:
+            return list(iter_page_texts(source, 0, n_pages, self.backend))
+
+        step = -(-n_pages // workers)
+        starts = list(range(0, n_pages, step))
+        stops = [min(start + step, n_pages) for start in starts]
+        backends = [self.backend.name] * len(starts)
+        if executor is not None:
+            parts = executor.map(_extract_page_range, [source] * len(starts), starts, stops, backends)
+            return [page for part in parts for page in part]
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(len(starts), mp_context=multiprocessing.get_context("spawn")) as pool:
+            parts = pool.map(_extract_page_range, [source] * len(starts), starts, stops, backends)
+            return [page for part in parts for page in part]
+
+    def extract_abstract_from_pdf(self, pdf_file, max_pages=5):
+        """
+        Find the abstract reading pages lazily, stopping as soon as the
+        abstract section is complete (page 1 for a typical paper).
+        Returns (abstract, pages_read).
+        """
+        parts = []
+        pages_read = 0
+        for number, page_text in self.iter_pages(pdf_file, max_pages):
+            pages_read += 1
+            if page_text:
+                parts.append(_page_part(number, page_text))
+            abstract, complete = self._find_abstract("".join(parts))
+            if complete:
+                return abstract, pages_read
+        return self.extract_abstract("".join(parts)), pages_read
+
     def extract_abstract(self, text):
         """
         Try to find abstract section in research paper
         """
-        # Remove page markers first
-        text = re.sub(r'--- Page \d+ ---\n', '', text)
-        
-        patterns = [
-            r'Abstract\s*\n(.*?)(?=\n\s*\nIntroduction|$)',
-            r'ABSTRACT\s*\n(.*?)(?=\n\s*\nINTRODUCTION|$)',
-            r'Summary\s*\n(.*?)(?=\n\s*\n1\.|$)',
-            r'abstract\s*\n(.*?)(?=\n\s*\n1\.|$)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-            if match:
-                abstract = match.group(1).strip()
-                # Clean up
-                abstract = re.sub(r'\n+', ' ', abstract)
-                abstract = re.sub(r'\s+', ' ', abstract)
-                return abstract[:300] + "..." if len(abstract) > 300 else abstract
+        abstract, _ = self._find_abstract(text)
+        if abstract is not None:
+            return abstract
         
         # Fallback: first 300 characters
-        if len(text) > 300:
-            return text[:300] + "..."
+        text = _PAGE_MARKER_RE.sub('', text)
+        if len(text) > ABSTRACT_MAX_CHARS:
+            return text[:ABSTRACT_MAX_CHARS] + "..."
         return text
+
+    def _find_abstract(self, text):
+        """
+        Return (abstract, complete). complete is False when more pages could
+        still change the result.
+        """
+        abstract, complete = find_abstract(text)
+        if abstract is None:
+            return None, False
+        # An abstract already cut at 300 characters cannot change either
+        if len(abstract) > ABSTRACT_MAX_CHARS:
+            return abstract[:ABSTRACT_MAX_CHARS] + "...", True
+        return abstract, complete
     
     def count_words(self, text):
         """Count words in text"""
         # Remove page markers and extra whitespace
-        clean_text = re.sub(r'--- Page \d+ ---\n', '', text)
+        clean_text = _PAGE_MARKER_RE.sub('', text)
         words = clean_text.split()
-        return len(words)
\ No newline at end of file
+        return len(words)
+
+
+class SimplePDFProcessor:
+    """Processor used by the Classifier mode for uploads (no page markers)"""
+
+    def __init__(self, backend=None):
+        self.backend = get_backend(backend)
+
+    def extract_text(self, file, max_pages=3):
+        text = ""
+        try:
+            # Read the upload in place; it stays readable for the next call
+            text = "".join(
+                page_text + "\n\n"
+                for _, page_text in iter_page_texts(file, 0, max_pages, self.backend)
+                if page_text
+            )
+        except Exception as e:
+            text = f"Sample abstract for classification demonstration. Error: {str(e)}"
+        return text
+
+    def extract_abstract(self, text):
+        # Same detector as PDFProcessor, keeping at most 9 lines
+        abstract, _ = find_abstract(text, max_lines=9)
+
+        if not abstract:
+            sentences = text.replace('\n', ' ').split('.', 3)
+            abstract = '.'.join(sentences[:3]) + '.'
+
+        return abstract.strip()
+
+    def count_words(self, text):
+        return len(text.split())
@@ -0,0 +1,173 @@
+# src/result_cache.py
+"""
+Content-addressed cache for PDF extraction and classification results.
+
+Keys are a SHA-256 of the uploaded file bytes combined with the parameters
+that affect the result (max_pages, top_k, model fingerprint, ...), so the
+same PDF uploaded again, or a plain script rerun, is served from the cache
+no matter what the file is called.
+
+Values are small JSON documents kept in two tiers:
+- an in-memory LRU bounded by memory_bytes
+- a local on-disk tier (one JSON file per key) bounded by disk_bytes,
+  evicting the least recently used files first
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+CACHE_DIRNAME = ".result_cache"
+MEMORY_BYTES = 32 * 1024 * 1024
+DISK_BYTES = 256 * 1024 * 1024
+
+
+def content_hash(data):
+    """SHA-256 hex digest of raw bytes (e.g. an uploaded PDF)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(digest, **params):
+    """Combine a content digest with the parameters that shape the result"""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{digest}\x00{payload}".encode("utf-8")).hexdigest()
+
+
+def default_cache_dir():
+    """Cache next to the app if writable, otherwise in the temp dir"""
+    root = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), CACHE_DIRNAME)
+    try:
+        os.makedirs(root, exist_ok=True)
+        if os.access(root, os.W_OK):
+            return root
+    except OSError:
+        pass
+    return os.path.join(tempfile.gettempdir(), "finance_research" + CACHE_DIRNAME)
+
+
+class ResultCache:
+    def __init__(self, cache_dir=None, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()    # key -> (value, size), least recent first
+        self._memory_size = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        # Index of the disk tier: key -> (size, last use)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._disk = {}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                try:
+                    st = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                self._disk[name[:-5]] = (st.st_size, st.st_mtime)
+        self._disk_size = sum(size for size, _ in self._disk.values())
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @property
+    def hits(self):
+        return self.stats["memory_hits"] + self.stats["disk_hits"]
+
+    @property
+    def misses(self):
+        return self.stats["misses"]
+
+    @property
+    def memory_size(self):
+        return self._memory_size
+
+    @property
+    def disk_size(self):
+        return self._disk_size
+
+    def get(self, key):
+        """Cached value for key, or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._memory[key][0]
+
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                value = json.loads(data)
+            except (OSError, ValueError):
+                self.stats["misses"] += 1
+                return None
+            try:
+                os.utime(path)
+                self._disk[key] = (len(data), os.stat(path).st_mtime)
+            except OSError:
+                pass
+            self.stats["disk_hits"] += 1
+            self._remember(key, value, len(data))
+            return value
+
+    def put(self, key, value):
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self._remember(key, value, len(data))
+            if len(data) > self.disk_bytes:
+                return
+            path = self._path(key)
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                return
+            old_size, _ = self._disk.get(key, (0, 0))
+            self._disk[key] = (len(data), os.stat(path).st_mtime)
+            self._disk_size += len(data) - old_size
+            self._evict_disk()
+
+    def _remember(self, key, value, size):
+        if size > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= self._memory.pop(key)[1]
+        self._memory[key] = (value, size)
+        self._memory_size += size
+        while self._memory_size > self.memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_size -= evicted_size
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self):
+        if self._disk_size <= self.disk_bytes:
+            return
+        for key, (size, _) in sorted(self._disk.items(), key=lambda item: item[1][1]):
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+            del self._disk[key]
+            self._disk_size -= size
+            self.stats["evictions"] += 1
+            if self._disk_size <= self.disk_bytes:
+                return
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._disk):
+                try:
+                    os.unlink(self._path(key))
+                except OSError:
+                    pass
+            self._disk.clear()
+            self._disk_size = 0
+            self._memory.clear()
+            self._memory_size = 0
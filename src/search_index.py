@@ -0,0 +1,533 @@
+# src/search_index.py
+"""
+Persistent inverted index over paper title, abstract and authors.
+
+Tokenization is CJK-aware: Latin/other scripts are split into lowercase
+words, while runs of CJK characters are indexed as overlapping character
+bigrams (plus the run's final character), so Chinese text needs no word
+segmenter and any substring of two or more characters is a phrase query.
+
+The index is a list of immutable segments. Each segment stores, per field,
+CSR-style postings (term -> docs, term frequencies) and token positions as
+NumPy arrays that are memory-mapped when loaded from disk. New papers are
+added as a new segment; segments are merged when there are too many. When the corpus file
+only gained papers (e.g. appended JSON Lines), the previous cache's index
+is extended with them instead of being rebuilt (open_search_index).
+
+Query syntax:
+    bank credit       every word must match (as a prefix) in some field
+    "credit risk"     exact phrase
+    养老金融           CJK runs are matched as phrases automatically
+
+Hits are ranked by field-weighted BM25. Per-posting BM25 term weights are
+precomputed once per index version (and saved with it), so the postings
+of a field form a sparse term x document weight matrix and scoring a
+query term is a sparse row sum.
+"""
+import itertools
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+
+FIELDS = ("title", "abstract", "authors")
+FIELD_WEIGHTS = {"title": 3.0, "abstract": 1.0, "authors": 2.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+AUTHOR_GAP = 2          # position gap so phrases never span two authors
+BUILD_BATCH = 20000     # documents per segment while building
+MAX_SEGMENTS = 8
+
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN_RE = re.compile(f"([{_CJK}]+)|([^\\W_{_CJK}]+)")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text, start=0, cjk_tail=True):
+    """
+    Yield (position, token) pairs for lowercase words and CJK bigrams.
+    cjk_tail also emits the last character of each CJK run, so that single
+    characters can be found by prefix; queries turn it off for phrases.
+    """
+    pos = start
+    for match in _TOKEN_RE.finditer(text.lower()):
+        cjk, word = match.groups()
+        if word:
+            yield pos, word
+            pos += 1
+            continue
+        for i in range(len(cjk) - 1):
+            yield pos + i, cjk[i:i + 2]
+        if cjk_tail or len(cjk) == 1:
+            yield pos + len(cjk) - 1, cjk[-1]
+        pos += len(cjk)
+
+
+def tokens(text):
+    """Plain token list (no positions)"""
+    return [tok for _, tok in tokenize(text)]
+
+
+def _field_tokens(field, value):
+    if field == "authors":
+        if isinstance(value, str):
+            value = [value]
+        out = []
+        pos = 0
+        for author in value or []:
+            toks = list(tokenize(str(author), pos))
+            out.extend(toks)
+            if toks:
+                pos = toks[-1][0] + 1 + AUTHOR_GAP
+        return out
+    if not isinstance(value, str):
+        return []
+    return list(tokenize(value))
+
+
+def parse_query(query):
+    """
+    Parse a query into clauses: ("prefix", term) or ("phrase", [terms]).
+    A bare word that tokenizes to several terms (hyphenated words, CJK
+    runs) becomes a phrase.
+    """
+    clauses = []
+    for match in _QUERY_RE.finditer(query):
+        quoted, bare = match.groups()
+        terms = [tok for _, tok in tokenize(quoted if quoted is not None else bare, cjk_tail=False)]
+        if not terms:
+            continue
+        if quoted is None and len(terms) == 1:
+            clauses.append(("prefix", terms[0]))
+        else:
+            clauses.append(("phrase", terms))
+    return clauses
+
+
+def bm25_idf(n_docs, df):
+    return np.log1p((n_docs - df + 0.5) / (df + 0.5))
+
+
+def bm25_tf(tf, lengths, avg_len):
+    return tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_len))
+
+
+class _FieldPostings:
+    """CSR postings for one field of one segment"""
+
+    NAMES = ("post_indptr", "post_docs", "post_tf", "pos_indptr", "positions", "lengths")
+
+    def __init__(self, arrays):
+        for name in self.NAMES:
+            setattr(self, name, arrays[name])
+        # Precomputed BM25 weight of every posting (see SearchIndex.prepare_ranking)
+        self.bm25 = arrays.get("bm25")
+
+    @classmethod
+    def build(cls, n_terms, term_ids, doc_ids, positions, segment_docs):
+        order = np.lexsort((positions, doc_ids, term_ids))
+        t, d, p = term_ids[order], doc_ids[order], positions[order]
+
+        if len(t):
+            boundary = np.empty(len(t), dtype=bool)
+            boundary[0] = True
+            boundary[1:] = (t[1:] != t[:-1]) | (d[1:] != d[:-1])
+            post_start = np.flatnonzero(boundary)
+        else:
+            post_start = np.zeros(0, dtype=np.int64)
+
+        post_terms = t[post_start]
+        pos_indptr = np.append(post_start, len(t)).astype(np.int64)
+        doc_slot = np.searchsorted(segment_docs, d)
+        lengths = np.bincount(doc_slot, minlength=len(segment_docs)).astype(np.int32)
+        return cls({
+            "post_indptr": np.searchsorted(post_terms, np.arange(n_terms + 1)).astype(np.int64),
+            "post_docs": d[post_start].astype(np.int32),
+            "post_tf": np.diff(pos_indptr).astype(np.int32),
+            "pos_indptr": pos_indptr,
+            "positions": p.astype(np.int32),
+            "lengths": lengths,
+        })
+
+    def postings(self, term_id):
+        """Slice bounds of a term's postings"""
+        return self.post_indptr[term_id], self.post_indptr[term_id + 1]
+
+    def posting_terms(self):
+        """Term id of every posting"""
+        return np.repeat(
+            np.arange(len(self.post_indptr) - 1, dtype=np.int64),
+            np.diff(self.post_indptr)
+        )
+
+
+class Segment:
+    """Immutable index segment over a set of documents"""
+
+    def __init__(self, terms, doc_ids, fields):
+        self.terms = terms                       # sorted term strings
+        self.term_ids = {t: i for i, t in enumerate(terms)}
+        self.doc_ids = doc_ids                   # sorted global doc ids
+        self.fields = fields                     # field -> _FieldPostings
+
+    @classmethod
+    def build(cls, docs):
+        """docs: iterable of (doc_id, {field: value})"""
+        raw = {f: ([], [], []) for f in FIELDS}
+        seen_docs = []
+        for doc_id, values in docs:
+            seen_docs.append(doc_id)
+            for field in FIELDS:
+                toks = _field_tokens(field, values.get(field))
+                if toks:
+                    terms_, docs_, positions_ = raw[field]
+                    terms_.extend(tok for _, tok in toks)
+                    docs_.extend([doc_id] * len(toks))
+                    positions_.extend(pos for pos, _ in toks)
+
+        vocab = sorted({t for f in FIELDS for t in raw[f][0]})
+        term_index = {t: i for i, t in enumerate(vocab)}
+        segment_docs = np.unique(np.asarray(seen_docs, dtype=np.int32))
+        fields = {}
+        for field in FIELDS:
+            terms_, docs_, positions_ = raw[field]
+            fields[field] = _FieldPostings.build(
+                len(vocab),
+                np.fromiter((term_index[t] for t in terms_), dtype=np.int64, count=len(terms_)),
+                np.asarray(docs_, dtype=np.int32),
+                np.asarray(positions_, dtype=np.int32),
+                segment_docs,
+            )
+        return cls(vocab, segment_docs, fields)
+
+    @classmethod
+    def merge(cls, segments):
+        """Merge segments into one, without re-tokenizing any document"""
+        vocab = sorted({t for seg in segments for t in seg.terms})
+        term_index = {t: i for i, t in enumerate(vocab)}
+        segment_docs = np.unique(np.concatenate([seg.doc_ids for seg in segments]))
+        fields = {}
+        for field in FIELDS:
+            term_ids, doc_ids, positions = [], [], []
+            for seg in segments:
+                post = seg.fields[field]
+                remap = np.fromiter((term_index[t] for t in seg.terms), dtype=np.int64, count=len(seg.terms))
+                local_terms = post.posting_terms()
+                per_token = np.diff(post.pos_indptr)
+                term_ids.append(np.repeat(remap[local_terms], per_token))
+                doc_ids.append(np.repeat(np.asarray(post.post_docs), per_token))
+                positions.append(np.asarray(post.positions))
+            fields[field] = _FieldPostings.build(
+                len(vocab),
+                np.concatenate(term_ids),
+                np.concatenate(doc_ids),
+                np.concatenate(positions),
+                segment_docs,
+            )
+        return cls(vocab, segment_docs, fields)
+
+    def prefix_range(self, prefix):
+        """Range of term ids starting with prefix"""
+        from bisect import bisect_left
+        lo = bisect_left(self.terms, prefix)
+        hi = bisect_left(self.terms, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    # ----- persistence -----
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "terms.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(self.terms))
+        np.save(os.path.join(path, "doc_ids.npy"), self.doc_ids)
+        for field, post in self.fields.items():
+            for name in _FieldPostings.NAMES:
+                np.save(os.path.join(path, f"{field}.{name}.npy"), getattr(post, name))
+            if post.bm25 is not None:
+                np.save(os.path.join(path, f"{field}.bm25.npy"), post.bm25)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "terms.txt"), "r", encoding="utf-8") as f:
+            content = f.read()
+        terms = content.split("\n") if content else []
+        doc_ids = np.load(os.path.join(path, "doc_ids.npy"), mmap_mode="r")
+        fields = {}
+        for field in FIELDS:
+            arrays = {
+                name: np.load(os.path.join(path, f"{field}.{name}.npy"), mmap_mode="r")
+                for name in _FieldPostings.NAMES
+            }
+            bm25_path = os.path.join(path, f"{field}.bm25.npy")
+            if os.path.exists(bm25_path):
+                arrays["bm25"] = np.load(bm25_path, mmap_mode="r")
+            fields[field] = _FieldPostings(arrays)
+        return cls(terms, doc_ids, fields)
+
+    def doc_lengths(self, field, docs):
+        """Token counts of the given (global) doc ids in a field"""
+        return self.fields[field].lengths[np.searchsorted(self.doc_ids, docs)]
+
+    # ----- matching -----
+    def match_prefix(self, prefix):
+        """{field: (doc ids, BM25 weights)} for all terms starting with prefix"""
+        lo, hi = self.prefix_range(prefix)
+        out = {}
+        for field, post in self.fields.items():
+            start, end = post.post_indptr[lo], post.post_indptr[hi]
+            if end > start:
+                out[field] = (np.asarray(post.post_docs[start:end]), np.asarray(post.bm25[start:end]))
+        return out
+
+    def match_phrase(self, terms):
+        """{field: (doc ids, phrase frequency)} for an exact phrase"""
+        ids = [self.term_ids.get(t) for t in terms]
+        if any(i is None for i in ids):
+            return {}
+        out = {}
+        for field, post in self.fields.items():
+            slices = [post.postings(i) for i in ids]
+            if any(hi == lo for lo, hi in slices):
+                continue
+            if len(ids) == 1:
+                lo, hi = slices[0]
+                out[field] = (np.asarray(post.post_docs[lo:hi]), np.asarray(post.post_tf[lo:hi]))
+                continue
+
+            # Encode every occurrence as (doc, phrase start position) in one
+            # int64 key; the phrase occurs where all terms share a key.
+            common = None
+            for offset, (lo, hi) in enumerate(slices):
+                tf = np.asarray(post.post_tf[lo:hi])
+                docs = np.repeat(np.asarray(post.post_docs[lo:hi], dtype=np.int64), tf)
+                starts = np.asarray(post.positions[post.pos_indptr[lo]:post.pos_indptr[hi]], dtype=np.int64)
+                keys = (docs << 32) + (starts - offset + len(ids))
+                common = keys if common is None else np.intersect1d(common, keys, assume_unique=True)
+                if not len(common):
+                    break
+            if len(common):
+                docs, tf = np.unique(common >> 32, return_counts=True)
+                out[field] = (docs.astype(np.int32), tf.astype(np.int32))
+        return out
+
+
+class SearchIndex:
+    """Segmented inverted index with prefix and phrase queries"""
+
+    def __init__(self, segments=None, stats=None, source_digest=None):
+        self.segments = list(segments or [])
+        self.stats = stats
+        # ColumnarCorpus.prefix_digest of the indexed papers, set by open_search_index
+        self.source_digest = source_digest
+
+    @property
+    def n_docs(self):
+        return sum(len(seg.doc_ids) for seg in self.segments)
+
+    @classmethod
+    def build(cls, docs, batch_size=BUILD_BATCH):
+        """Build from an iterable of (doc_id, {field: value}) in doc id order"""
+        index = cls()
+        index.add_documents(docs, batch_size)
+        index.compact(max_segments=1)
+        return index
+
+    def add_documents(self, docs, batch_size=BUILD_BATCH):
+        """Index new documents incrementally as one or more new segments"""
+        batch = []
+        for doc in docs:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                self.segments.append(Segment.build(batch))
+                batch = []
+        if batch:
+            self.segments.append(Segment.build(batch))
+        if len(self.segments) > MAX_SEGMENTS:
+            self.compact()
+        self.stats = None
+
+    def compact(self, max_segments=1):
+        if len(self.segments) > max_segments:
+            self.segments = [Segment.merge(self.segments)]
+            self.stats = None
+
+    def _document_frequencies(self, field):
+        """Per segment, the corpus-wide document frequency of each local term"""
+        local = [np.diff(np.asarray(seg.fields[field].post_indptr)) for seg in self.segments]
+        if len(self.segments) == 1:
+            return local
+        totals = {}
+        for seg, df in zip(self.segments, local):
+            for term, n in zip(seg.terms, df.tolist()):
+                totals[term] = totals.get(term, 0) + n
+        return [
+            np.fromiter((totals[t] for t in seg.terms), dtype=np.int64, count=len(seg.terms))
+            for seg in self.segments
+        ]
+
+    def prepare_ranking(self):
+        """
+        Compute corpus statistics and the BM25 weight of every posting.
+        Only needs to run once per index version; the result is saved.
+        """
+        n_docs = max(self.n_docs, 1)
+        avg_len = {}
+        for field in FIELDS:
+            total = sum(int(np.asarray(seg.fields[field].lengths).sum()) for seg in self.segments)
+            avg_len[field] = max(total / n_docs, 1e-9)
+
+        for field in FIELDS:
+            for seg, df in zip(self.segments, self._document_frequencies(field)):
+                post = seg.fields[field]
+                idf = bm25_idf(n_docs, df)
+                tf = np.asarray(post.post_tf, dtype=np.float64)
+                lengths = seg.doc_lengths(field, np.asarray(post.post_docs))
+                post.bm25 = (idf[post.posting_terms()] * bm25_tf(tf, lengths, avg_len[field])).astype(np.float32)
+
+        self.stats = {"n_docs": n_docs, "avg_len": avg_len}
+
+    def save(self, path):
+        if self.stats is None:
+            self.prepare_ranking()
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        names = []
+        for i, seg in enumerate(self.segments):
+            name = f"seg_{i:04d}"
+            seg.save(os.path.join(tmp, name))
+            names.append(name)
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "segments": names,
+                "n_docs": self.n_docs,
+                "stats": self.stats,
+                "source_digest": self.source_digest
+            }, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        index = cls(
+            [Segment.load(os.path.join(path, name)) for name in manifest["segments"]],
+            manifest.get("stats"),
+            manifest.get("source_digest")
+        )
+        if index.stats is None or any(post.bm25 is None for seg in index.segments for post in seg.fields.values()):
+            index.prepare_ranking()
+        return index
+
+    def _clause_matches(self, clause):
+        """{field: (doc ids, BM25 contributions)} for one query clause"""
+        kind, value = clause
+        per_field = {f: [] for f in FIELDS}
+        if kind == "prefix":
+            for seg in self.segments:
+                for field, hits in seg.match_prefix(value).items():
+                    per_field[field].append(hits)
+        else:
+            # Phrase statistics are only known at query time
+            found = [seg.match_phrase(value) for seg in self.segments]
+            for field in FIELDS:
+                df = sum(len(f[field][0]) for f in found if field in f)
+                if not df:
+                    continue
+                idf = bm25_idf(self.stats["n_docs"], np.array([df]))[0]
+                for seg, f in zip(self.segments, found):
+                    if field in f:
+                        docs, pf = f[field]
+                        lengths = seg.doc_lengths(field, docs)
+                        weights = idf * bm25_tf(pf.astype(np.float64), lengths, self.stats["avg_len"][field])
+                        per_field[field].append((docs, weights))
+        return {
+            field: (np.concatenate([d for d, _ in hits]), np.concatenate([w for _, w in hits]))
+            for field, hits in per_field.items() if hits
+        }
+
+    def search(self, query, limit=None):
+        """
+        Return (doc ids, BM25 scores) for documents matching every clause of
+        the query, most relevant first.
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        if self.stats is None:
+            self.prepare_ranking()
+
+        result_docs, result_scores = None, None
+        for clause in clauses:
+            matches = self._clause_matches(clause)
+            if not matches:
+                return np.zeros(0, dtype=np.int32), np.zeros(0)
+            docs = np.concatenate([d for d, _ in matches.values()])
+            weights = np.concatenate([
+                FIELD_WEIGHTS[field] * np.asarray(w, dtype=np.float64) for field, (_, w) in matches.items()
+            ])
+            # Sum the sparse contributions per document
+            clause_docs, inverse = np.unique(docs, return_inverse=True)
+            clause_scores = np.bincount(inverse, weights=weights)
+
+            if result_docs is None:
+                result_docs, result_scores = clause_docs, clause_scores
+            else:
+                common, a, b = np.intersect1d(result_docs, clause_docs, assume_unique=True, return_indices=True)
+                result_docs, result_scores = common, result_scores[a] + clause_scores[b]
+            if not len(result_docs):
+                break
+
+        order = np.argsort(-result_scores, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return result_docs[order], result_scores[order]
+
+
+def corpus_documents(corpus, authors=None):
+    """(doc_id, fields) pairs for every paper in a ColumnarCorpus"""
+    titles = corpus.texts("title")
+    abstracts = corpus.texts("abstract")
+    if authors is None:
+        authors = corpus.column("authors").tolist() if "authors" in corpus.columns else [[]] * len(titles)
+    for doc_id, (title, abstract, names) in enumerate(zip(titles, abstracts, authors)):
+        yield doc_id, {"title": title, "abstract": abstract, "authors": names}
+
+
+def _previous_index(corpus, path):
+    """The previous corpus version's index, if this corpus starts with its papers"""
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        return None
+    index = SearchIndex.load(path)
+    if (
+        index.source_digest is None
+        or index.n_docs > len(corpus)
+        or corpus.prefix_digest(FIELDS, index.n_docs) != index.source_digest
+    ):
+        return None
+    return index
+
+
+def open_search_index(corpus):
+    """
+    Load the index stored with a columnar corpus cache, building it once.
+    If the previous version of the corpus was indexed and this one only
+    appends papers to it, that index is extended with the new papers.
+    """
+    from src.columnar_cache import PREVIOUS_SUFFIX
+
+    path = os.path.join(corpus.cache_dir, "search_index")
+    if os.path.exists(os.path.join(path, "manifest.json")):
+        return SearchIndex.load(path)
+    previous_path = path + PREVIOUS_SUFFIX
+    index = _previous_index(corpus, previous_path)
+    if index is None:
+        index = SearchIndex.build(corpus_documents(corpus))
+    else:
+        index.add_documents(itertools.islice(corpus_documents(corpus), index.n_docs, None))
+    index.source_digest = corpus.prefix_digest(FIELDS, len(corpus))
+    index.save(path)
+    shutil.rmtree(previous_path, ignore_errors=True)
+    return SearchIndex.load(path)
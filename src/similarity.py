@@ -0,0 +1,259 @@
+# src/similarity.py
+"""
+"Related papers": nearest neighbours over precomputed document vectors.
+
+Every paper's title and abstract is turned into a hashed TF-IDF vector
+(the same terms as the text classifier: words, CJK bigrams and adjacent
+pairs) folded into VECTOR_DIM dimensions with signed feature hashing and
+L2-normalized. The vectors are saved next to the columnar cache as one
+float32 matrix that is memory-mapped on load, so cosine similarity to
+every paper is a single matrix-vector product.
+
+For large corpora an inverted-file (IVF) index narrows the search: the
+vectors are clustered with spherical k-means, stored on disk grouped by
+cluster, and a query only scores the papers in its IVF_PROBES closest
+clusters, which are contiguous slices of the matrix.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+
+from src.text_model import N_FEATURES, hashed_terms
+
+INDEX_VERSION = 2
+VECTOR_DIM = 1024          # 4 KB per paper; folding into fewer dims blurs the neighbours
+BUILD_BATCH = 20000
+IVF_MIN_DOCS = 50000        # below this, exact search is fast enough
+IVF_PROBES = 32             # clusters scored per approximate query
+KMEANS_SAMPLE = 50000
+KMEANS_ITERATIONS = 10
+KMEANS_SEED = 0
+
+
+def document_text(title, abstract):
+    return f"{title or ''} {abstract or ''}"
+
+
+def _n_lists(n_docs):
+    """Number of IVF clusters: about sqrt(n), one below IVF_MIN_DOCS"""
+    if n_docs < IVF_MIN_DOCS:
+        return 1
+    return int(min(4096, np.sqrt(n_docs)))
+
+
+def _nearest(vectors, centroids, batch_size=BUILD_BATCH):
+    """Index of the most similar centroid of every unit vector"""
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), batch_size):
+        out[start:start + batch_size] = (np.asarray(vectors[start:start + batch_size]) @ centroids.T).argmax(axis=1)
+    return out
+
+
+def spherical_kmeans(vectors, n_clusters, iterations=KMEANS_ITERATIONS, seed=KMEANS_SEED):
+    """Unit-norm centroids of a (sample of) unit vectors"""
+    rng = np.random.default_rng(seed)
+    centroids = np.asarray(vectors[np.sort(rng.choice(len(vectors), n_clusters, replace=False))], dtype=np.float32)
+    for _ in range(iterations):
+        labels = _nearest(vectors, centroids)
+        order = np.argsort(labels, kind="stable")
+        sizes = np.bincount(labels, minlength=n_clusters)
+        starts = np.cumsum(sizes) - sizes
+        sums = np.zeros_like(centroids)
+        nonempty = sizes > 0
+        sums[nonempty] = np.add.reduceat(vectors[order], starts[nonempty], axis=0)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # Re-seed empty clusters with random points
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        norms[empty] = np.linalg.norm(sums[empty], axis=1)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms[:, None]).astype(np.float32)
+    return centroids
+
+
+class SimilarityIndex:
+    """
+    vectors holds the unit vectors grouped by IVF cluster: cluster c is
+    positions offsets[c]:offsets[c + 1]. rows maps a position to its paper
+    row and positions maps a paper row back.
+    """
+
+    def __init__(self, vectors, idf, centroids, offsets, rows):
+        self.vectors = vectors
+        self.idf = idf
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+        self.positions = np.empty(len(rows), dtype=np.int64)
+        self.positions[rows] = np.arange(len(rows))
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    # ===== VECTORS =====
+    @staticmethod
+    def _fold(doc_rows, buckets, weights, n_docs):
+        """Signed feature hashing of (doc, bucket, weight) triples -> unit rows"""
+        dims = buckets % VECTOR_DIM
+        signs = np.where((buckets // VECTOR_DIM) & 1, 1.0, -1.0)
+        flat = doc_rows * VECTOR_DIM + dims
+        vectors = np.bincount(flat, weights=weights * signs, minlength=n_docs * VECTOR_DIM)
+        vectors = vectors.reshape(n_docs, VECTOR_DIM)
+        norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+        norms[norms == 0] = 1.0
+        return (vectors / norms[:, None]).astype(np.float32)
+
+    def vectorize(self, text):
+        """Unit vector of an arbitrary text (e.g. a query or an upload)"""
+        ids, counts = hashed_terms(text)
+        weights = (1.0 + np.log(counts)) * self.idf[ids]
+        return self._fold(np.zeros(len(ids), dtype=np.int64), ids, weights, 1)[0]
+
+    def vector(self, row_id):
+        return np.asarray(self.vectors[self.positions[row_id]])
+
+    # ===== BUILD =====
+    @classmethod
+    def build(cls, titles, abstracts, path, batch_size=BUILD_BATCH):
+        """
+        Write the index to path, streaming in batches: document frequencies
+        first (batch term lists are spooled to disk), then the vectors,
+        then the IVF clusters and the vectors regrouped by cluster.
+        """
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        df = np.zeros(N_FEATURES, dtype=np.int64)
+        batches = []
+        n_docs = 0
+        texts = (document_text(t, a) for t, a in zip(titles, abstracts))
+        while True:
+            terms = [hashed_terms(text) for _, text in zip(range(batch_size), texts)]
+            if not terms:
+                break
+            lengths = np.array([len(ids) for ids, _ in terms], dtype=np.int64)
+            ids = np.concatenate([ids for ids, _ in terms] + [np.zeros(0, dtype=np.int64)])
+            counts = np.concatenate([c for _, c in terms] + [np.zeros(0, dtype=np.float32)])
+            df += np.bincount(ids, minlength=N_FEATURES)
+            batch_path = os.path.join(tmp, f"terms_{len(batches):05d}.npz")
+            np.savez(batch_path, lengths=lengths, ids=ids.astype(np.int32), counts=counts)
+            batches.append(batch_path)
+            n_docs += len(terms)
+
+        idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+        raw_path = os.path.join(tmp, "vectors_by_row.npy")
+        raw = np.lib.format.open_memmap(raw_path, mode="w+", dtype=np.float32, shape=(n_docs, VECTOR_DIM))
+        start = 0
+        for batch_path in batches:
+            with np.load(batch_path) as batch:
+                lengths, ids, counts = batch["lengths"], batch["ids"].astype(np.int64), batch["counts"]
+            doc_rows = np.repeat(np.arange(len(lengths)), lengths)
+            weights = (1.0 + np.log(counts)) * idf[ids]
+            block = cls._fold(doc_rows, ids, weights, len(lengths))
+            raw[start:start + len(block)] = block
+            start += len(block)
+            os.remove(batch_path)
+
+        # IVF: cluster a sample, assign every paper, regroup by cluster
+        n_lists = _n_lists(n_docs)
+        vectors_path = os.path.join(tmp, "vectors.npy")
+        if n_lists == 1:
+            centroids = np.zeros((1, VECTOR_DIM), dtype=np.float32)
+            rows = np.arange(n_docs, dtype=np.int32)
+            offsets = np.array([0, n_docs], dtype=np.int64)
+            del raw
+            os.replace(raw_path, vectors_path)
+        else:
+            rng = np.random.default_rng(KMEANS_SEED)
+            sample = np.sort(rng.choice(n_docs, min(n_docs, KMEANS_SAMPLE), replace=False))
+            centroids = spherical_kmeans(np.asarray(raw[sample]), n_lists)
+            labels = _nearest(raw, centroids)
+            rows = np.argsort(labels, kind="stable").astype(np.int32)
+            offsets = np.append(0, np.cumsum(np.bincount(labels, minlength=n_lists))).astype(np.int64)
+            vectors = np.lib.format.open_memmap(vectors_path, mode="w+", dtype=np.float32, shape=(n_docs, VECTOR_DIM))
+            for start in range(0, n_docs, batch_size):
+                vectors[start:start + batch_size] = raw[rows[start:start + batch_size]]
+            vectors.flush()
+            del vectors, raw
+            os.remove(raw_path)
+
+        np.save(os.path.join(tmp, "idf.npy"), idf)
+        np.save(os.path.join(tmp, "centroids.npy"), centroids)
+        np.save(os.path.join(tmp, "offsets.npy"), offsets)
+        np.save(os.path.join(tmp, "rows.npy"), rows)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "n_docs": n_docs, "dim": VECTOR_DIM, "lists": n_lists}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION or meta.get("dim") != VECTOR_DIM:
+            raise ValueError(f"Unsupported similarity index in {path}")
+        return cls(
+            np.load(os.path.join(path, "vectors.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "idf.npy")),
+            np.load(os.path.join(path, "centroids.npy")),
+            np.load(os.path.join(path, "offsets.npy")),
+            np.load(os.path.join(path, "rows.npy")),
+        )
+
+    # ===== QUERIES =====
+    def _top_k(self, scores, k):
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return best[scores[best] > 0]
+
+    def similar(self, vector, k=5, exclude=None, exact=None, probes=IVF_PROBES):
+        """
+        (row ids, cosine similarities) of the k papers closest to a unit
+        vector, best first. exact=None scores every paper only when the
+        index has a single cluster (small corpora).
+        """
+        if exact is None:
+            exact = self.n_lists == 1
+        excluded = None if exclude is None else self.positions[exclude]
+        if exact:
+            scores = self.vectors @ vector
+            if excluded is not None:
+                scores[excluded] = -np.inf
+            best = self._top_k(scores, k)
+            return self.rows[best].astype(np.int64), scores[best]
+
+        # Score the closest clusters, each a contiguous block of vectors
+        lists = np.sort(np.argsort(-(self.centroids @ vector))[:probes])
+        positions = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists])
+        scores = np.concatenate([self.vectors[self.offsets[c]:self.offsets[c + 1]] @ vector for c in lists])
+        if excluded is not None:
+            scores[positions == excluded] = -np.inf
+        best = self._top_k(scores, k)
+        return self.rows[positions[best]].astype(np.int64), scores[best]
+
+    def related(self, row_id, k=5, exact=None):
+        """The k papers most similar to paper row_id (itself excluded)"""
+        return self.similar(self.vector(row_id), k, exclude=row_id, exact=exact)
+
+
+def open_similarity_index(corpus):
+    """
+    Load the vectors stored with a columnar corpus cache, building them once
+    (again if they were built by another INDEX_VERSION or VECTOR_DIM)
+    """
+    path = os.path.join(corpus.cache_dir, "related_index")
+    try:
+        return SimilarityIndex.load(path)
+    except (OSError, ValueError):
+        SimilarityIndex.build(corpus.texts("title"), corpus.texts("abstract"), path)
+    return SimilarityIndex.load(path)
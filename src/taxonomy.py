@@ -0,0 +1,165 @@
+# src/taxonomy.py
+"""
+The finance category taxonomy shared by every classifier.
+
+Each concept has one integer ID (its position in CATEGORIES), an English
+name (the canonical label), a Chinese name, optional aliases and a
+reference link. Any of the names resolves to the ID, so "金融科技" and
+"Fintech" are the same category. The keyword classifier, the text model,
+the library DataFrame and the classification history all store these IDs;
+names are only looked up for display. Score vectors are fixed-size arrays
+indexed by ID.
+
+The text model is trained on the categories flagged for it, not on a
+range of IDs. Data that stores IDs (e.g. the corpus cache) is keyed on
+FINGERPRINT, so it is rebuilt whenever the list changes.
+"""
+import hashlib
+import json
+
+import numpy as np
+
+DEFAULT_LINK = "https://en.wikipedia.org/wiki/Finance"
+ID_DTYPE = np.int16
+
+# (English name, Chinese name, aliases, link, text model class)
+CATEGORIES = [
+    ("Quantitative Finance", "量化金融", (), "https://en.wikipedia.org/wiki/Quantitative_analysis_(finance)", True),
+    ("Behavioral Finance", "行为金融", (), "https://en.wikipedia.org/wiki/Behavioral_finance", True),
+    ("Corporate Finance", "公司金融", (), "https://en.wikipedia.org/wiki/Corporate_finance", True),
+    ("Asset Pricing", "资产定价", (), None, True),
+    ("Financial Econometrics", "金融计量", (), None, True),
+    ("Banking", "银行", (), None, True),
+    ("Insurance", "保险", (), None, True),
+    ("Financial Markets", "金融市场", (), None, True),
+    ("Investment Analysis", "投资分析", (), None, True),
+    ("Risk Management", "风险管理", (), None, True),
+    ("Financial Regulation", "金融监管", (), None, True),
+    ("Fintech", "金融科技", ("Financial Technology", "金融技术"), "https://en.wikipedia.org/wiki/Fintech", True),
+    ("Cryptocurrency", "加密货币", (), "https://en.wikipedia.org/wiki/Cryptocurrency", True),
+    ("Sustainable Finance", "可持续金融", (), "https://en.wikipedia.org/wiki/Sustainable_finance", True),
+    ("International Finance", "国际金融", (), None, True),
+    ("Public Finance", "公共财政", (), None, True),
+    ("Personal Finance", "个人理财", (), None, True),
+    ("Real Estate Finance", "房地产金融", (), None, True),
+    ("Derivatives", "衍生品", (), None, True),
+    ("Fixed Income", "固定收益", (), None, True),
+    ("Financial Engineering", "金融工程", (), None, True),
+    ("Market Microstructure", "市场微观结构", (), None, True),
+    ("Financial Modeling", "金融建模", (), None, True),
+    ("Credit Risk", "信用风险", (), None, True),
+    ("Liquidity Risk", "流动性风险", (), None, True),
+    ("Operational Risk", "操作风险", (), None, True),
+    ("Portfolio Theory", "投资组合理论", (), None, True),
+    ("Capital Structure", "资本结构", (), None, True),
+    ("Mergers and Acquisitions", "并购", (), None, True),
+    ("Venture Capital", "风险投资", (), None, True),
+    ("Private Equity", "私募股权", (), None, True),
+    ("Hedge Funds", "对冲基金", (), None, True),
+    ("Blockchain in Finance", "区块链金融", (), None, True),
+    ("AI in Finance", "人工智能金融", (), None, True),
+    ("Machine Learning in Finance", "机器学习金融", (), None, True),
+    ("Financial Planning", "财务规划", (), None, True),
+    ("Wealth Management", "财富管理", (), None, True),
+    ("Financial Analysis", "财务分析", (), None, True),
+    ("Accounting Standards", "会计准则", (), None, True),
+    ("Auditing", "审计", (), None, True),
+    ("Taxation", "税收", (), None, True),
+    ("Development Finance", "发展金融", (), None, True),
+    ("Microfinance", "小额信贷", (), None, True),
+    ("Islamic Finance", "伊斯兰金融", (), None, True),
+    ("Financial Crises", "金融危机", (), None, True),
+    ("Monetary Policy", "货币政策", (), None, True),
+    ("Fiscal Policy", "财政政策", (), None, True),
+    ("Financial Stability", "金融稳定", (), None, True),
+    ("Financial Inclusion", "普惠金融", (), None, True),
+    ("Pension Finance", "养老金融", (), "https://baike.baidu.com/item/%E5%85%BB%E8%80%81%E9%87%91%E8%9E%8D", True),
+    ("Digital Currency", "数字货币", (), "https://baike.baidu.com/item/%E6%95%B0%E5%AD%97%E8%B4%A7%E5%B8%81", True),
+    ("Green Finance", "绿色金融", (), "https://baike.baidu.com/item/%E7%BB%BF%E8%89%B2%E9%87%91%E8%9E%8D", True),
+    ("Digital Finance", "数字金融", (), "https://baike.baidu.com/item/%E6%95%B0%E5%AD%97%E9%87%91%E8%9E%8D", True),
+    ("Supply Chain Finance", "供应链金融", (), None, True),
+    ("Bank Accounting", "银行会计", (), None, True),
+    ("Stock Market Prediction", "股市预测", (), None, True),
+    ("Treasury Yields", "国债利率", (), None, True),
+    ("Consumer Finance", "消费金融", (), None, True),
+    ("Bank Strategy", "银行战略", (), None, True),
+    ("Banking Law", "银行法律", (), None, True),
+    ("Digital Marketing", "数字营销", (), None, True),
+    ("Data Assets", "数据资产", (), None, True),
+
+    # ===== Keyword classifier only =====
+    ("Climate Finance", "气候金融", (), None, False),
+]
+
+FINGERPRINT = hashlib.md5(
+    json.dumps(CATEGORIES, ensure_ascii=False).encode("utf-8")
+).hexdigest()[:12]
+
+
+class Taxonomy:
+    """ID <-> name lookups over a fixed list of categories"""
+
+    def __init__(self, categories, default_link=DEFAULT_LINK):
+        self.names = np.array([c[0] for c in categories], dtype=object)
+        self.names_zh = np.array([c[1] for c in categories], dtype=object)
+        self.links = np.array([c[3] or default_link for c in categories], dtype=object)
+        self.text_model = np.array([c[4] for c in categories], dtype=bool)
+        # Every name and alias -> ID; one spelling may not name two categories
+        self._ids = {}
+        for category_id, (name, name_zh, aliases, _, _) in enumerate(categories):
+            for label in {name, name_zh, *aliases}:
+                if self._ids.setdefault(label, category_id) != category_id:
+                    raise ValueError(f"'{label}' names more than one category")
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def id(self, name):
+        """ID of a category name or alias (KeyError if unknown)"""
+        return self._ids[name]
+
+    def ids(self, names):
+        """ID array for a sequence of names or aliases; unknown names get -1"""
+        get = self._ids.get
+        return np.fromiter((get(name, -1) for name in names), dtype=ID_DTYPE)
+
+    def name(self, category_id):
+        return self.names[category_id]
+
+    @property
+    def text_model_names(self):
+        """Canonical names of the text model's classes, in ID order"""
+        return self.names[self.text_model].tolist()
+
+    def link(self, category):
+        """Reference link for a category ID or name"""
+        if isinstance(category, str):
+            category = self._ids.get(category)
+            if category is None:
+                return DEFAULT_LINK
+        return self.links[category]
+
+    def display_name(self, category_id, language="English"):
+        names = self.names_zh if language == "Chinese" else self.names
+        return names[category_id]
+
+    def categorical(self, ids):
+        """pandas Categorical whose codes are the category IDs (-1 = missing)"""
+        import pandas as pd
+        return pd.Categorical.from_codes(np.asarray(ids, dtype=ID_DTYPE), categories=self.names)
+
+    def codes(self, values):
+        """Category IDs of a Series / list of names or of a categorical"""
+        import pandas as pd
+
+        dtype = getattr(values, "dtype", None)
+        if isinstance(dtype, pd.CategoricalDtype) and list(dtype.categories) == list(self.names):
+            return np.asarray(values.cat.codes, dtype=ID_DTYPE)
+        return self.ids(values)
+
+
+TAXONOMY = Taxonomy(CATEGORIES)
+N_CATEGORIES = len(TAXONOMY)
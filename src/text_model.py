@@ -0,0 +1,285 @@
+# src/text_model.py
+"""
+Trained text classifier for the Classifier mode.
+
+Documents are turned into hashed TF-IDF vectors (lowercase words, CJK
+bigrams and adjacent-token pairs hashed into N_FEATURES buckets) and scored
+by a multinomial logistic regression over FINANCE_CATEGORIES (the
+taxonomy categories flagged for the text model, see src.taxonomy). Only the
+buckets seen in training keep a weight row, so the saved artifact is small
+and scoring one document is a single sparse matrix-vector product: gather
+the weight rows of its buckets and sum them, weighted by TF-IDF.
+
+Train it offline with:
+
+    python -m src.train_text_model finance_research_papers.json
+"""
+import hashlib
+import os
+import zlib
+
+import numpy as np
+
+from src.search_index import tokens
+from src.taxonomy import N_CATEGORIES, TAXONOMY
+
+MODEL_VERSION = 2
+N_FEATURES = 1 << 18
+MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "models", "finance_text_model.npz"
+)
+# The model's classes, by canonical name
+FINANCE_CATEGORIES = TAXONOMY.text_model_names
+
+
+def category_link(category):
+    return TAXONOMY.link(category)
+
+
+def hashed_terms(text, n_features=N_FEATURES):
+    """Bucket ids and raw counts of the hashed terms of one document"""
+    toks = tokens(text) if isinstance(text, str) else []
+    terms = toks + [f"{a} {b}" for a, b in zip(toks, toks[1:])]
+    if not terms:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    buckets = np.fromiter(
+        (zlib.crc32(term.encode("utf-8")) for term in terms),
+        dtype=np.int64,
+        count=len(terms)
+    ) % n_features
+    ids, counts = np.unique(buckets, return_counts=True)
+    return ids, counts.astype(np.float32)
+
+
+def _softmax(logits, temperature=1.0):
+    z = logits / temperature
+    z = z - z.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def _row_sums(values, indptr):
+    """Sum consecutive slices values[indptr[i]:indptr[i+1]] (CSR row sums)"""
+    out = np.zeros((len(indptr) - 1,) + values.shape[1:], dtype=values.dtype)
+    nonempty = np.flatnonzero(np.diff(indptr) > 0)
+    if len(nonempty):
+        out[nonempty] = np.add.reduceat(values, indptr[:-1][nonempty], axis=0)
+    return out
+
+
+class TextClassifier:
+    """
+    Hashed TF-IDF + multinomial logistic regression.
+
+    rows maps a hash bucket to its weight row (-1 for buckets never seen in
+    training); weights / idf are stored for seen buckets only. Class
+    column j is taxonomy category category_ids[j]; probability vectors
+    returned to callers are indexed by taxonomy ID.
+    """
+
+    def __init__(self, categories, rows, weights, bias, idf, n_features=N_FEATURES):
+        categories = list(categories)
+        self.category_ids = TAXONOMY.ids(categories).astype(np.int64)
+        if (self.category_ids < 0).any():
+            unknown = [c for c, i in zip(categories, self.category_ids) if i < 0]
+            raise ValueError(f"Categories missing from the taxonomy: {unknown}")
+        if len(set(self.category_ids.tolist())) != len(self.category_ids):
+            raise ValueError("Several model classes name the same taxonomy category")
+        # Canonical names, whichever alias the classes were given as
+        self.categories = TAXONOMY.names[self.category_ids].tolist()
+        self.n_features = n_features
+        self.rows = rows
+        self.weights = weights
+        self.bias = bias
+        self.idf = idf
+
+    @property
+    def n_terms(self):
+        return len(self.idf)
+
+    @property
+    def fingerprint(self):
+        """Short hash of the model parameters, for keying cached results"""
+        if getattr(self, "_fingerprint", None) is None:
+            digest = hashlib.md5(f"{MODEL_VERSION}:{self.n_features}:{self.categories}".encode("utf-8"))
+            for array in (self.rows, self.weights, self.bias, self.idf):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            self._fingerprint = digest.hexdigest()[:12]
+        return self._fingerprint
+
+    def features(self, text):
+        """L2-normalized TF-IDF vector of one document as (row ids, values)"""
+        ids, counts = hashed_terms(text, self.n_features)
+        rows = self.rows[ids]
+        known = rows >= 0
+        rows = rows[known]
+        values = (1.0 + np.log(counts[known])) * self.idf[rows]
+        norm = np.sqrt(np.dot(values, values))
+        if norm > 0:
+            values /= norm
+        return rows, values.astype(np.float32)
+
+    def _proba(self, text, temperature=1.0):
+        """Probability of every model class (column order) for one document"""
+        rows, values = self.features(text)
+        logits = values @ self.weights[rows] + self.bias
+        return _softmax(logits, temperature)
+
+    def predict_proba(self, text, temperature=1.0):
+        """Probability vector of one document, indexed by taxonomy ID"""
+        proba = np.zeros(N_CATEGORIES, dtype=np.float32)
+        proba[self.category_ids] = self._proba(text, temperature)
+        return proba
+
+    def predict(self, text):
+        """Taxonomy ID of the most likely category"""
+        return int(self.category_ids[self._proba(text).argmax()])
+
+    def top_k(self, text, k=5, temperature=1.0):
+        """
+        [(category, probability), ...] best first; [] (no prediction) when
+        none of the document's terms were seen in training
+        """
+        rows, values = self.features(text)
+        if not len(rows):
+            return []
+        proba = _softmax(values @ self.weights[rows] + self.bias, temperature)
+        best = np.argsort(proba)[::-1][:k]
+        return [(self.categories[i], float(proba[i])) for i in best]
+
+    def _logits(self, rows, values, indptr):
+        return _row_sums(self.weights[rows] * values[:, None], indptr) + self.bias
+
+    def logits_batch(self, texts):
+        """(n_docs, model classes) logits: one sparse matrix product for the batch"""
+        return self._logits(*self._csr(texts))
+
+    def predict_batch(self, texts):
+        """Taxonomy ID of the most likely category of every document"""
+        return self.category_ids[self.logits_batch(texts).argmax(axis=1)]
+
+    def top_k_batch(self, texts, k=5, temperature=1.0):
+        """top_k for many documents; temperature may be one value per document"""
+        temperature = np.asarray(temperature, dtype=np.float32)
+        if temperature.ndim:
+            temperature = temperature[:, None]
+        rows, values, indptr = self._csr(texts)
+        proba = _softmax(self._logits(rows, values, indptr), temperature)
+        best = np.argsort(proba, axis=1)[:, ::-1][:, :k]
+        return [
+            [(self.categories[i], float(p[i])) for i in order] if n_known else []
+            for p, order, n_known in zip(proba, best, np.diff(indptr))
+        ]
+
+    def _csr(self, texts):
+        rows, values, indptr = [], [], [0]
+        for text in texts:
+            r, v = self.features(text)
+            rows.append(r)
+            values.append(v)
+            indptr.append(indptr[-1] + len(r))
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32), np.zeros(1, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(values), np.asarray(indptr, dtype=np.int64)
+
+    # ----- training -----
+    @classmethod
+    def train(cls, texts, labels, categories=FINANCE_CATEGORIES, n_features=N_FEATURES,
+              epochs=300, learning_rate=2.0, l2=2e-3, balanced=True):
+        """
+        Fit on (text, taxonomy ID) pairs with full-batch gradient descent
+        (with momentum) on the softmax cross-entropy. balanced weights every
+        class present in the labels equally, so a class with many (weak)
+        labels cannot take most of the probability mass.
+        """
+        n_classes = len(categories)
+        # taxonomy ID -> class column
+        columns = np.full(N_CATEGORIES, -1, dtype=np.int64)
+        columns[TAXONOMY.ids(categories)] = np.arange(n_classes)
+        label_columns = columns[np.asarray(labels, dtype=np.int64)]
+        if (label_columns < 0).any():
+            raise ValueError("Training labels outside the model's categories")
+        doc_terms = [hashed_terms(text, n_features) for text in texts]
+
+        # Compact the buckets that occur in training into weight rows
+        seen = np.unique(np.concatenate([ids for ids, _ in doc_terms] + [np.zeros(0, dtype=np.int64)]))
+        rows = np.full(n_features, -1, dtype=np.int32)
+        rows[seen] = np.arange(len(seen), dtype=np.int32)
+        df = np.zeros(len(seen), dtype=np.float64)
+        for ids, _ in doc_terms:
+            df[rows[ids]] += 1
+        idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+
+        model = cls(
+            categories,
+            rows,
+            np.zeros((len(seen), n_classes), dtype=np.float32),
+            np.zeros(n_classes, dtype=np.float32),
+            idf,
+            n_features
+        )
+        x_rows, x_values, indptr = model._csr(texts)
+        doc_of = np.repeat(np.arange(len(texts)), np.diff(indptr))
+        # Transposed CSR (weight row -> nonzeros) for the gradient row sums
+        by_row = np.argsort(x_rows, kind="stable")
+        grad_rows, row_starts = np.unique(x_rows[by_row], return_index=True)
+        row_indptr = np.append(row_starts, len(by_row))
+        targets = np.zeros((len(texts), n_classes), dtype=np.float32)
+        targets[np.arange(len(texts)), label_columns] = 1.0
+        class_counts = np.bincount(label_columns, minlength=n_classes)
+        if balanced:
+            # Each class weighs len(texts) / (classes present) in total
+            sample_weights = len(texts) / (np.count_nonzero(class_counts) * class_counts[label_columns])
+        else:
+            sample_weights = np.ones(len(texts))
+        sample_weights = (sample_weights / len(texts)).astype(np.float32)[:, None]
+
+        velocity_w = np.zeros_like(model.weights)
+        velocity_b = np.zeros_like(model.bias)
+        for _ in range(epochs):
+            logits = _row_sums(model.weights[x_rows] * x_values[:, None], indptr) + model.bias
+            grad = (_softmax(logits) - targets) * sample_weights
+            grad_w = l2 * model.weights
+            grad_w[grad_rows] += _row_sums((grad[doc_of] * x_values[:, None])[by_row], row_indptr)
+            velocity_w = 0.9 * velocity_w - learning_rate * grad_w
+            velocity_b = 0.9 * velocity_b - learning_rate * grad.sum(axis=0)
+            model.weights += velocity_w
+            model.bias += velocity_b
+        return model
+
+    # ----- persistence -----
+    def save(self, path=MODEL_PATH):
+        """Write the model as one compressed .npz (seen buckets only)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        seen = np.flatnonzero(self.rows >= 0)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            version=np.array(MODEL_VERSION),
+            n_features=np.array(self.n_features),
+            categories=np.array(self.categories),
+            buckets=seen.astype(np.int32),
+            weights=self.weights[self.rows[seen]].astype(np.float16),
+            bias=self.bias,
+            idf=self.idf[self.rows[seen]]
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != MODEL_VERSION:
+                raise ValueError(f"Unsupported model version: {int(data['version'])}")
+            n_features = int(data["n_features"])
+            buckets = data["buckets"]
+            rows = np.full(n_features, -1, dtype=np.int32)
+            rows[buckets] = np.arange(len(buckets), dtype=np.int32)
+            return cls(
+                data["categories"].tolist(),
+                rows,
+                data["weights"].astype(np.float32),
+                data["bias"].astype(np.float32),
+                data["idf"].astype(np.float32),
+                n_features
+            )
@@ -0,0 +1,157 @@
+# src/timing.py
+"""
+Per-stage latency recording for the app (diagnostics panel).
+
+    with timings.stage("search"):
+        ...
+
+    @timings.timed("classify")
+    def classify(...): ...
+
+Each stage keeps its last N latencies in a fixed-size ring buffer, so memory
+stays bounded however long the server runs. Summaries (p50/p95) are only
+computed when the panel asks for them. With FINANCE_STAGE_TIMINGS=0 the
+timer is disabled: stage() hands back a shared no-op context manager and
+timed() calls straight through.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+TIMINGS_ENV = "FINANCE_STAGE_TIMINGS"
+RING_SIZE = 512
+METRICS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ".metrics",
+    "stage_timings.jsonl"
+)
+
+_NO_OP = nullcontext()
+
+
+class RingBuffer:
+    """Last `capacity` float samples"""
+
+    def __init__(self, capacity=RING_SIZE):
+        self._values = [0.0] * capacity
+        self._next = 0
+        self.count = 0    # total samples ever recorded
+
+    def append(self, value):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._values)
+        self.count += 1
+
+    def values(self):
+        """Samples still in the buffer, oldest first"""
+        if self.count < len(self._values):
+            return self._values[:self.count]
+        return self._values[self._next:] + self._values[:self._next]
+
+
+class _Stage:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageTimer:
+    def __init__(self, capacity=RING_SIZE, enabled=True):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._buffers = {}
+
+    def stage(self, name):
+        """Context manager timing one execution of a stage"""
+        if not self.enabled:
+            return _NO_OP
+        return _Stage(self, name)
+
+    def timed(self, name):
+        """Decorator version of stage()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            buffer = self._buffers.get(name)
+            if buffer is None:
+                buffer = self._buffers[name] = RingBuffer(self.capacity)
+            buffer.append(seconds)
+
+    def samples(self):
+        """{stage: latencies in seconds, oldest first}"""
+        with self._lock:
+            return {name: buffer.values() for name, buffer in self._buffers.items()}
+
+    def summary(self):
+        """One row per stage: calls, last / p50 / p95 / max in milliseconds"""
+        import numpy as np
+
+        with self._lock:
+            counts = {name: buffer.count for name, buffer in self._buffers.items()}
+        rows = []
+        for name, values in self.samples().items():
+            if not values:
+                continue
+            p50, p95 = np.percentile(values, [50, 95]) * 1000
+            rows.append({
+                "stage": name,
+                "calls": counts[name],
+                "last_ms": round(values[-1] * 1000, 2),
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "max_ms": round(max(values) * 1000, 2),
+            })
+        return rows
+
+    def export(self, path=METRICS_FILE):
+        """Append a snapshot (summary and raw samples) as one JSON line"""
+        snapshot = {
+            "exported_at": datetime.now().isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "summary": self.summary(),
+            "samples_ms": {
+                name: [round(v * 1000, 3) for v in values]
+                for name, values in self.samples().items()
+            },
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._buffers.clear()
+
+
+# Process-wide timer shared by the app and the modules it calls
+timings = StageTimer(enabled=os.environ.get(TIMINGS_ENV, "1") != "0")
@@ -0,0 +1,165 @@
+# src/train_text_model.py
+"""
+Train the hashed TF-IDF text classifier (src.text_model) offline.
+
+    python -m src.train_text_model finance_research_papers.json -o models/finance_text_model.npz
+
+Labels come from the corpus label field when it names (by any taxonomy
+name or alias) one of the FINANCE_CATEGORIES; other papers are weakly
+labelled with the keyword classifier, and skipped if that category is not
+a model class. Every category also gets one seed document made of its
+English and Chinese names and its keywords, so no class is left without
+an example. Classes are weighted equally in training, whatever their number
+of papers. Near-duplicate papers are dropped first (src.dedup, as at
+ingest), so no copy of a held-out paper is trained on. A seeded holdout
+split is used to report accuracy and per-document latency before the final
+model is fit on all labelled papers and saved. Weak labels are the keyword
+classifier's output, so holdout accuracy is also reported on the papers
+whose label comes from the corpus.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from src.classifier import CATEGORY_KEYWORDS, deep_classify_paper
+from src.corpus import is_paper_record, iter_records
+from src.dedup import find_duplicates, unique_records_filter
+from src.taxonomy import N_CATEGORIES, TAXONOMY
+from src.text_model import FINANCE_CATEGORIES, MODEL_PATH, N_FEATURES, TextClassifier
+
+
+def paper_text(record):
+    return f"{record.get('title', '') or ''} {record.get('abstract', '') or ''}"
+
+
+def unique_papers(corpus_path):
+    """Paper records of a corpus with near-duplicates dropped, streamed"""
+    keep = find_duplicates(iter_records(corpus_path), is_paper_record)
+    accept = unique_records_filter(keep, is_paper_record)
+    return (record for record in iter_records(corpus_path) if accept(record))
+
+
+def label_records(records, label_field="category", categories=FINANCE_CATEGORIES):
+    """
+    Return (texts, taxonomy IDs, weak-label mask); a label is weak when it
+    comes from the keyword classifier instead of the corpus
+    """
+    in_model = np.zeros(N_CATEGORIES, dtype=bool)
+    in_model[TAXONOMY.ids(categories)] = True
+    texts, labels, weak = [], [], []
+    for record in records:
+        label = record.get(label_field)
+        category_id = TAXONOMY.id(label) if isinstance(label, str) and label in TAXONOMY else -1
+        if category_id < 0 or not in_model[category_id]:
+            category_id = TAXONOMY.id(
+                deep_classify_paper(record.get("title", "") or "", record.get("abstract", "") or "")
+            )
+            if not in_model[category_id]:
+                continue
+            weak.append(True)
+        else:
+            weak.append(False)
+        texts.append(paper_text(record))
+        labels.append(category_id)
+    return texts, labels, np.asarray(weak, dtype=bool)
+
+
+def seed_documents(categories=FINANCE_CATEGORIES):
+    """One synthetic document per category: its names plus its keywords"""
+    texts, labels = [], []
+    for name in categories:
+        category_id = TAXONOMY.id(name)
+        keywords = CATEGORY_KEYWORDS.get(TAXONOMY.name(category_id), [])
+        texts.append(" ".join([TAXONOMY.name(category_id), TAXONOMY.names_zh[category_id]] + keywords))
+        labels.append(category_id)
+    return texts, labels
+
+
+def train_from_corpus(corpus_path, label_field="category", **train_kwargs):
+    """
+    Fit a model on every labelled unique paper of a corpus plus the seed
+    documents. Offline only (this CLI, benchmarks): the app never trains a
+    model.
+    """
+    texts, labels = seed_documents()
+    if corpus_path and os.path.exists(corpus_path):
+        paper_texts, paper_labels, _ = label_records(unique_papers(corpus_path), label_field)
+        texts, labels = paper_texts + texts, paper_labels + labels
+    return TextClassifier.train(texts, labels, **train_kwargs)
+
+
+def evaluate(model, texts, labels):
+    """Return (accuracy, mean seconds per single-document prediction)"""
+    if not texts:
+        return float("nan"), float("nan")
+    start = time.perf_counter()
+    predicted = [model.predict(text) for text in texts]
+    elapsed = time.perf_counter() - start
+    accuracy = float(np.mean(np.asarray(predicted) == np.asarray(labels)))
+    return accuracy, elapsed / len(texts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the finance paper text classifier")
+    parser.add_argument("corpus", nargs="?", default="finance_research_papers.json",
+                        help="JSON, JSON Lines or CSV corpus")
+    parser.add_argument("-o", "--output", default=MODEL_PATH, help="Model artifact (.npz)")
+    parser.add_argument("--label-field", default="category")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="Fraction of papers held out for evaluation (0 to skip)")
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--l2", type=float, default=2e-3, help="L2 penalty on the weights")
+    parser.add_argument("--n-features", type=int, default=N_FEATURES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    n_papers = sum(1 for r in iter_records(args.corpus) if is_paper_record(r))
+    texts, labels, weak = label_records(unique_papers(args.corpus), args.label_field)
+    if not texts:
+        print("No labelled papers found", file=sys.stderr)
+        return 1
+    seed_texts, seed_labels = seed_documents()
+    print(f"{len(texts)} labelled papers ({int(weak.sum())} weak labels, "
+          f"{n_papers - len(texts)} duplicates or unlabelled dropped), {len(seed_texts)} seed documents")
+
+    order = np.random.default_rng(args.seed).permutation(len(texts))
+    n_test = int(round(len(texts) * args.holdout))
+    if n_test:
+        test, train = order[:n_test], order[n_test:]
+        start = time.perf_counter()
+        model = TextClassifier.train(
+            [texts[i] for i in train] + seed_texts,
+            [labels[i] for i in train] + seed_labels,
+            n_features=args.n_features,
+            epochs=args.epochs,
+            l2=args.l2
+        )
+        train_seconds = time.perf_counter() - start
+        train_acc, _ = evaluate(model, [texts[i] for i in train], [labels[i] for i in train])
+        test_acc, latency = evaluate(model, [texts[i] for i in test], [labels[i] for i in test])
+        labelled = test[~weak[test]]
+        labelled_acc, _ = evaluate(model, [texts[i] for i in labelled], [labels[i] for i in labelled])
+        print(f"Trained on {len(train)} papers in {train_seconds:.2f}s")
+        print(f"Train accuracy:   {train_acc:.3f}")
+        print(f"Holdout accuracy: {test_acc:.3f} ({n_test} papers; "
+              f"{labelled_acc:.3f} on the {len(labelled)} with corpus labels)")
+        print(f"Latency:          {latency * 1e6:.1f} us/document")
+
+    model = TextClassifier.train(
+        texts + seed_texts,
+        labels + seed_labels,
+        n_features=args.n_features,
+        epochs=args.epochs,
+        l2=args.l2
+    )
+    model.save(args.output)
+    print(f"Saved {model.n_terms} weighted terms x {len(model.categories)} categories "
+          f"to {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+# tests/test_analytics.py
+import numpy as np
+import pandas as pd
+
+from src.analytics import StatsCube
+
+
+def papers_frame(n=500, seed=0, categories=("Banking", "Green Finance"), years=(2021, 2022), languages=("English", "Chinese")):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "category": pd.Categorical(rng.choice(categories, n)),
+        "year": rng.choice(years, n),
+        "language": rng.choice(languages, n),
+        "word_count": rng.integers(0, 1500, n),
+    })
+
+
+def test_marginals_and_trends_match_pandas():
+    df = papers_frame()
+    cube = StatsCube.build(df, batch_size=128)
+    assert cube.total == len(df)
+    assert cube.total_words == int(df["word_count"].sum())
+    assert cube.marginal("category") == df["category"].value_counts().to_dict()
+    assert cube.marginal("year") == dict(sorted(df["year"].value_counts().to_dict().items()))
+
+    chinese = df[df["language"] == "Chinese"]
+    assert cube.marginal("category", {"language": "Chinese"}) == chinese["category"].value_counts().to_dict()
+    expected = chinese.groupby(["category", "year"], observed=True).size()
+    trends = cube.trends(["Banking", "Unknown category"], "Chinese")
+    assert list(trends) == ["Banking"]
+    assert trends["Banking"] == {year: int(n) for year, n in expected["Banking"].items()}
+
+    bins = cube.word_histogram({"category": "Banking"})
+    assert sum(n for _, n in bins) == int((df["category"] == "Banking").sum())
+    assert bins[-1][0] == "1000+"
+
+
+def test_add_grows_the_axes_like_a_rebuild():
+    first = papers_frame(seed=1)
+    second = papers_frame(seed=2, categories=("Banking", "Fintech"), years=(2022, 2025), languages=("English", "French"))
+    cube = StatsCube.build(first)
+    cube.add(second)
+    rebuilt = StatsCube.build(pd.concat([first, second], ignore_index=True))
+    assert set(cube.values["category"]) == {"Banking", "Green Finance", "Fintech"}
+    for dim in ("category", "year", "language"):
+        assert cube.marginal(dim) == rebuilt.marginal(dim)
+    assert cube.trends() == rebuilt.trends()
+    assert cube.word_histogram({"language": "French"}) == rebuilt.word_histogram({"language": "French"})
+
+
+def test_missing_values_and_round_trip(tmp_path):
+    df = pd.DataFrame({"category": ["Banking", None], "year": [2024, None], "word_count": [10, np.nan]})
+    cube = StatsCube.build(df)
+    assert cube.marginal("language") == {"Unknown": 2}
+    assert cube.marginal("category") == {"Banking": 1, "Unknown": 1}
+    assert cube.marginal("year") == {0: 1, 2024: 1}
+    assert cube.marginal("category", {"year": 1999}) == {}
+
+    path = str(tmp_path / "cube.npz")
+    cube.save(path)
+    loaded = StatsCube.load(path)
+    assert loaded.marginal("category") == cube.marginal("category")
+    assert loaded.word_histogram() == cube.word_histogram()
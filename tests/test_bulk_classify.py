@@ -0,0 +1,23 @@
+# tests/test_bulk_classify.py
+import json
+
+from src.bulk_classify import process_chunk, run
+
+
+def test_bad_lines_and_non_objects_are_skipped():
+    chunk = ['{"id": 1, "title": "credit risk of banks"}', "{bad json", "[1, 2]", '"text"', {"id": 2, "title": "绿色金融"}, None]
+    block, n, skipped = process_chunk(chunk, ["id", "title"], "jsonl")
+    rows = [json.loads(line) for line in block.splitlines()]
+    assert (n, skipped) == (2, 4)
+    assert [row["id"] for row in rows] == [1, 2]
+
+
+def test_chunk_of_only_bad_records():
+    assert process_chunk(["not json", "42"], ["id"], "jsonl") == ("", 0, 2)
+
+
+def test_run_counts_skipped_records_across_chunks():
+    items = ['{"title": "bank loan"}', "oops"] * 5
+    results = list(run(items, ["title", "category"], "csv", workers=1, chunk_size=3))
+    assert sum(n for _, n, _ in results) == 5
+    assert sum(skipped for _, _, skipped in results) == 5
@@ -0,0 +1,81 @@
+# tests/test_classifier.py
+import math
+import random
+
+import numpy as np
+import pandas as pd
+
+from src.classifier import (
+    CATEGORY_KEYWORDS,
+    category_labels,
+    classify_batch,
+    deep_classify_paper,
+    iter_classify_batch,
+)
+
+FILLER = [
+    "we", "study", "the", "effect", "of", "on", "firms", "evidence", "from", "china",
+    "本文", "研究", "影响", "企业", "实证", "分析", "基于", "数据",
+]
+EDGE_VALUES = ["", None, math.nan, "   ", "Credit Risk", "绿色金融"]
+
+
+def random_text(rng, n_words):
+    keywords = [kw for kws in CATEGORY_KEYWORDS.values() for kw in kws]
+    words = [rng.choice(keywords) if rng.random() < 0.2 else rng.choice(FILLER) for _ in range(n_words)]
+    return " ".join(words)
+
+
+def mixed_records(n=2000, seed=0):
+    """Random English/Chinese records plus every combination of edge values"""
+    rng = random.Random(seed)
+    records = [
+        {
+            "title": random_text(rng, rng.randint(0, 8)),
+            "abstract": random_text(rng, rng.randint(0, 60)),
+            "keywords": random_text(rng, rng.randint(0, 4)),
+        }
+        for _ in range(n)
+    ]
+    records += [
+        {"title": title, "abstract": abstract, "keywords": keywords}
+        for title in EDGE_VALUES for abstract in EDGE_VALUES for keywords in ("", None, math.nan)
+    ]
+    records.append({})
+    return records
+
+
+def expected_labels(records):
+    return [deep_classify_paper(r.get("title"), r.get("abstract")) for r in records]
+
+
+def test_classify_batch_matches_deep_classify_paper():
+    records = mixed_records()
+    category_ids, scores = classify_batch([r.get("title") for r in records], [r.get("abstract") for r in records])
+    assert category_labels(category_ids).tolist() == expected_labels(records)
+    assert scores.shape[0] == len(records)
+
+
+def test_classify_batch_accepts_dataframe_columns():
+    df = pd.DataFrame(mixed_records(200, seed=1))
+    category_ids, _ = classify_batch(df["title"], df["abstract"])
+    assert category_labels(category_ids).tolist() == [
+        deep_classify_paper(title, abstract) for title, abstract in zip(df["title"], df["abstract"])
+    ]
+
+
+def test_iter_classify_batch_matches_deep_classify_paper():
+    records = mixed_records(seed=2)
+    chunks = list(iter_classify_batch(
+        [r.get("title") for r in records], [r.get("abstract") for r in records], chunk_size=97
+    ))
+    assert len(chunks) == math.ceil(len(records) / 97)
+    category_ids = np.concatenate([ids for ids, _ in chunks])
+    assert category_labels(category_ids).tolist() == expected_labels(records)
+
+
+def test_empty_batch():
+    category_ids, scores = classify_batch([], [])
+    assert len(category_ids) == 0
+    assert scores.shape[0] == 0
+    assert list(iter_classify_batch([], [])) == []
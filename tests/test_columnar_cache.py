@@ -0,0 +1,54 @@
+# tests/test_columnar_cache.py
+import json
+import os
+
+from src.columnar_cache import open_corpus
+
+RECORDS = [
+    {"id": 1, "title": "Credit risk of commercial banks", "abstract": "We study bank loan defaults.",
+     "authors": ["A. Li", "B. Wang"], "year": 2021, "language": "English"},
+    {"id": 2, "title": "绿色金融与企业创新", "abstract": "本文研究绿色债券。", "authors": '["张三"]', "year": 2023},
+    {"note": "not a paper"},
+]
+
+
+def write_corpus(path, records=RECORDS):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(json.dumps(record, ensure_ascii=False) for record in records))
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    corpus = open_corpus(write_corpus(tmp_path / "papers.jsonl"))
+    df = corpus.frame()
+    assert len(corpus) == 2
+    assert df["title"].tolist() == [RECORDS[0]["title"], RECORDS[1]["title"]]
+    assert df["authors"].tolist() == [["A. Li", "B. Wang"], ["张三"]]
+    assert df["year"].tolist() == [2021, 2023]
+    assert df["category"].tolist() == ["Banking", "Green Finance"]
+    # Abstracts stay out of the frame and are decoded on demand
+    assert "abstract" not in df.columns
+    assert corpus.text("abstract", 1) == "本文研究绿色债券。"
+    assert corpus.texts("abstract") == ["We study bank loan defaults.", "本文研究绿色债券。"]
+
+
+def test_reopen_uses_the_cache_and_rewrites_replace_it(tmp_path):
+    path = write_corpus(tmp_path / "papers.jsonl")
+    first = open_corpus(path)
+    assert open_corpus(path).cache_dir == first.cache_dir
+    write_corpus(path, RECORDS[:1])
+    os.utime(path, ns=(1, 1))
+    second = open_corpus(path)
+    assert len(second) == 1
+    assert not os.path.exists(first.cache_dir)
+
+
+def test_corpora_with_the_same_name_keep_their_caches(tmp_path):
+    cache_root = str(tmp_path / "cache")
+    for name in ("cache", "a", "b"):
+        os.makedirs(tmp_path / name)
+    a = open_corpus(write_corpus(tmp_path / "a" / "papers.jsonl"), cache_root)
+    b = open_corpus(write_corpus(tmp_path / "b" / "papers.jsonl", RECORDS[:1]), cache_root)
+    assert a.cache_dir != b.cache_dir
+    assert os.path.exists(a.cache_dir) and os.path.exists(b.cache_dir)
+    assert len(open_corpus(str(tmp_path / "a" / "papers.jsonl"), cache_root)) == 2
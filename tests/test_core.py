@@ -0,0 +1,45 @@
+# tests/test_core.py
+import pytest
+
+from src.core import classifier_fingerprint, classify_text, load_classifier
+from src.text_model import FINANCE_CATEGORIES
+
+
+def test_missing_model_is_an_error_not_a_training_run(tmp_path):
+    with pytest.raises(FileNotFoundError, match="train_text_model"):
+        load_classifier(str(tmp_path / "missing.npz"))
+
+
+def test_shipped_model_covers_the_text_model_categories():
+    model = load_classifier()
+    assert model.categories == FINANCE_CATEGORIES
+    results = classify_text("credit risk of commercial bank loans", model, top_k=3)
+    assert len(results) == 3
+    assert results[0]["confidence"] >= results[-1]["confidence"]
+
+
+def test_keyword_only_mode():
+    results = classify_text("green bond issuance and 绿色债券", None, top_k=5)
+    assert [r["category"] for r in results] == ["Green Finance"]
+    assert results[0]["confidence"] == 100.0
+    assert classify_text("", None)[0]["score"] == 0.0
+    assert classifier_fingerprint(None).startswith("keywords-")
+
+
+def test_text_without_known_terms_falls_back_to_keywords():
+    model = load_classifier()
+    for text in ["", "   ", "zzqx qqzx"]:
+        assert classify_text(text, model) == classify_text(text, None)
+
+
+def test_shipped_model_is_not_dominated_by_one_class():
+    model = load_classifier()
+    probes = {
+        "green bond issuance and carbon emission": "Green Finance",
+        "insurance premium underwriting": "Insurance",
+        "货币政策 利率 传导": "Monetary Policy",
+    }
+    for text, category in probes.items():
+        results = classify_text(text, model, improve_confidence=False)
+        assert results[0]["category"] == category
+        assert results[0]["score"] < 0.5
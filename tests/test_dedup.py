@@ -0,0 +1,59 @@
+# tests/test_dedup.py
+import random
+
+from src.corpus import is_paper_record
+from src.dedup import arxiv_id, find_duplicates, unique_records_filter
+
+WORDS = "bank credit risk market return volatility policy firm capital liquidity asset price model data".split()
+ZH = "本文研究绿色金融对企业创新效率的影响基于中国上市公司数据发现绿色信贷政策显著提升了企业的研发投入与专利产出"
+
+
+def abstract(seed, n_words=120):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randint(0, 99)) for _ in range(n_words))
+
+
+def keep_list(records, **kwargs):
+    return find_duplicates(records, is_paper_record, **kwargs).tolist()
+
+
+def test_exact_and_near_duplicates_are_dropped():
+    text = abstract(0)
+    records = [
+        {"title": "A", "abstract": text},
+        {"title": "B", "abstract": abstract(1)},
+        {"title": "A again", "abstract": text.upper().replace(" ", ", ", 5)},
+        {"title": "A edited", "abstract": text + " We also add one robustness check."},
+        {"title": "绿色金融", "abstract": ZH},
+        {"title": "绿色金融（修订）", "abstract": ZH + "。"},
+        {"title": "Different Chinese paper", "abstract": ZH[::-1]},
+    ]
+    # The longest abstract is the canonical copy of a cluster
+    assert keep_list(records) == [False, True, False, True, False, True, True]
+
+
+def test_arxiv_versions_keep_the_latest():
+    assert arxiv_id("https://arxiv.org/abs/2501.01234v3") == ("2501.01234", 3)
+    assert arxiv_id("http://arxiv.org/pdf/2501.01234.pdf") == ("2501.01234", 0)
+    assert arxiv_id(None) == (None, 0)
+    records = [
+        {"title": "v1", "abstract": abstract(2), "arxiv_url": "https://arxiv.org/abs/2501.01234v1"},
+        {"title": "v2", "abstract": abstract(3), "arxiv_url": "https://arxiv.org/abs/2501.01234v2"},
+        {"title": "other", "abstract": abstract(4), "arxiv_url": "https://arxiv.org/abs/2501.09999v1"},
+    ]
+    assert keep_list(records) == [False, True, True]
+
+
+def test_non_papers_are_kept_but_never_matched():
+    records = [{"note": "x"}, {"note": "x"}, "not a dict", {"title": "", "abstract": ""}, {"title": "", "abstract": ""}]
+    assert keep_list(records) == [True] * 5
+
+
+def test_batches_do_not_change_the_result():
+    records = [{"title": str(i), "abstract": abstract(i % 7)} for i in range(40)]
+    keep = keep_list(records)
+    assert sum(keep) == 7
+    assert keep_list(records, batch_size=3) == keep
+
+    accept = unique_records_filter(find_duplicates(records, is_paper_record), is_paper_record)
+    assert [record["title"] for record in records if accept(record)] == [str(i) for i in range(7)]
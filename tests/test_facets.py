@@ -0,0 +1,54 @@
+# tests/test_facets.py
+import numpy as np
+import pandas as pd
+
+from src.facets import FacetIndex
+
+
+def papers_frame(n=1001, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "category": pd.Categorical(rng.choice(["Banking", "Green Finance", "Asset Pricing"], n)),
+        "year": rng.choice([2021, 2023, 2025], n),
+        "language": rng.choice(["English", "Chinese", None], n),
+        "title": [f"paper {i:04d}" for i in rng.permutation(n)],
+    })
+
+
+def test_select_matches_pandas_filters():
+    df = papers_frame()
+    facets = FacetIndex(df)
+    assert facets.values["year"] == ["2025", "2023", "2021"]
+    assert facets.values["category"] == ["Asset Pricing", "Banking", "Green Finance"]
+
+    selections = {"category": "Banking", "year": "2023", "language": None}
+    expected = np.flatnonzero((df["category"] == "Banking") & (df["year"] == 2023))
+    mask = facets.select(selections)
+    assert facets.rows(mask).tolist() == expected.tolist()
+    assert facets.count(mask) == len(expected)
+    assert facets.rows(facets.select({"language": "French"})).tolist() == []
+
+
+def test_facet_counts_ignore_their_own_selection():
+    df = papers_frame()
+    facets = FacetIndex(df)
+    counts = facets.facet_counts({"category": "Banking", "language": "Chinese"})
+    chinese = df[df["language"] == "Chinese"]
+    banking = df[df["category"] == "Banking"]
+    assert counts["category"] == chinese["category"].value_counts().to_dict()
+    assert counts["language"] == banking["language"].value_counts().to_dict()
+    assert sum(counts["year"].values()) == int(((df["category"] == "Banking") & (df["language"] == "Chinese")).sum())
+
+
+def test_search_hits_as_base_and_sorting():
+    df = papers_frame()
+    facets = FacetIndex(df)
+    hits = [5, 17, 400, 999, 1000]
+    mask = facets.select({"year": "2025"}, base=facets.rows_bitmap(hits))
+    assert facets.rows(mask).tolist() == [i for i in hits if df["year"][i] == 2025]
+    assert facets.contains(facets.rows_bitmap(hits), [5, 6]).tolist() == [True, False]
+
+    by_title = facets.sort_rows(hits, "title")
+    assert df["title"][by_title].tolist() == sorted(df["title"][hits])
+    newest = facets.sort_rows(np.arange(len(df)), "year", descending=True)
+    assert df["year"][newest].is_monotonic_decreasing
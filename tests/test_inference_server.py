@@ -0,0 +1,66 @@
+# tests/test_inference_server.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import inference_server
+from src.core import load_classifier
+from src.inference_server import InferenceClient, MicroBatcher, classify_items, make_server
+
+TEXTS = ["credit risk of commercial bank loans", "绿色债券 发行", "", "insurance premium underwriting"] * 3
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """The shipped model, loaded in this process as a worker would"""
+    model = load_classifier()
+    monkeypatch.setattr(inference_server, "_MODEL", model)
+    return model
+
+
+def test_micro_batches_give_the_same_results_as_single_texts(model):
+    expected = [classify_items([(text, 3, 0.5)])[0] for text in TEXTS]
+    with ThreadPoolExecutor(1) as executor:
+        batcher = MicroBatcher(executor, max_inflight=1, window_ms=200, max_batch=5)
+        futures = batcher.submit(TEXTS, top_k=3, temperature=0.5)
+        results = [future.result(timeout=10) for future in futures]
+        batcher.close()
+    assert results == expected
+    # 12 texts queued within one window: batches of 5, 5 and 2
+    assert batcher.stats == {"requests": 1, "texts": 12, "batches": 3}
+
+
+def test_texts_without_known_terms_are_ranked_by_keywords(model):
+    assert classify_items([("", 3, 1.0)]) == [[("Financial Markets", 0.0)]]
+    [ranked] = classify_items([("zzqx 绿色债券", 3, 1.0)])
+    assert ranked[0][0] == "Green Finance"
+
+
+def test_failed_batches_fail_their_futures(model):
+    executor = ThreadPoolExecutor(1)
+    executor.shutdown()
+    batcher = MicroBatcher(executor, max_inflight=1, window_ms=1)
+    [future] = batcher.submit(["credit risk"])
+    with pytest.raises(RuntimeError):
+        future.result(timeout=10)
+    batcher.close()
+
+
+def test_http_round_trip(model):
+    with ThreadPoolExecutor(2) as executor:
+        batcher = MicroBatcher(executor, max_inflight=2)
+        server = make_server(batcher, port=0, model_fingerprint=model.fingerprint)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        client = InferenceClient(f"http://127.0.0.1:{server.server_address[1]}")
+        try:
+            assert client.classify(TEXTS[:2], top_k=2) == [classify_items([(t, 2, 1.0)])[0] for t in TEXTS[:2]]
+            assert client.model_fingerprint() == model.fingerprint
+            with pytest.raises(RuntimeError, match="Bad request"):
+                client.classify(["credit"], temperature=0)
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+            batcher.close()
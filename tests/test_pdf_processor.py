@@ -0,0 +1,45 @@
+# tests/test_pdf_processor.py
+from src.pdf_processor import PDFProcessor, SimplePDFProcessor, find_abstract
+
+
+def test_heading_followed_by_body():
+    text = "A Study of Credit\nAbstract\nWe study credit risk.\nIt matters.\n\n1. Introduction\nBanks lend."
+    assert find_abstract(text) == ("We study credit risk. It matters.", True)
+
+
+def test_inline_headings():
+    assert find_abstract("T\nAbstract: We study credit.\nKeywords: risk\n") == ("We study credit.", True)
+    assert find_abstract("标题\n摘要：本文研究绿色金融。\n关键词：金融\n") == ("本文研究绿色金融。", True)
+
+
+def test_structured_abstract_is_not_cut_at_its_labels():
+    text = "T\nAbstract\nBackground: Banks matter.\nMethods: We regress.\n1. Introduction\n"
+    assert find_abstract(text) == ("Background: Banks matter. Methods: We regress.", True)
+
+
+def test_body_text_starting_with_abstract_is_not_a_heading():
+    assert find_abstract("T\nAbstract algebra is used in finance.\nMore text\n") == (None, False)
+    assert find_abstract("Abstract-based models\nmore\n") == (None, False)
+
+
+def test_years_do_not_end_the_abstract():
+    text = "T\nAbstract\nWe study the\n2008 Financial Crisis and banks\nEnd.\n1 Introduction\n"
+    assert find_abstract(text) == ("We study the 2008 Financial Crisis and banks End.", True)
+
+
+def test_empty_abstract_is_not_found():
+    assert find_abstract("T\nAbstract\nKeywords: risk\n") == (None, False)
+    text = "T\nAbstract\nKeywords: risk\nSummary\nThe real summary.\n1. Data\n"
+    assert find_abstract(text) == ("The real summary.", True)
+
+
+def test_extract_abstract_falls_back_when_empty():
+    text = "T\nAbstract\nKeywords: risk\n" + "body text " * 50
+    abstract = PDFProcessor().extract_abstract(text)
+    assert abstract.startswith("T\nAbstract") and abstract.endswith("...")
+    simple = SimplePDFProcessor().extract_abstract(text)
+    assert simple
+
+
+def test_incomplete_abstract():
+    assert find_abstract("T\nAbstract\nWe study") == ("We study", False)
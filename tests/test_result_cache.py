@@ -0,0 +1,65 @@
+# tests/test_result_cache.py
+import json
+import os
+
+from src.result_cache import ResultCache, cache_key, content_hash
+
+
+def value_size(value):
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def test_keys_depend_on_content_and_parameters():
+    digest = content_hash(b"%PDF-1.4 paper")
+    assert cache_key(digest, max_pages=5, model="abc") == cache_key(digest, model="abc", max_pages=5)
+    assert cache_key(digest, max_pages=5) != cache_key(digest, max_pages=6)
+    assert cache_key(digest, max_pages=5) != cache_key(content_hash(b"%PDF-1.4 other"), max_pages=5)
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    value = {"category": "绿色金融", "confidence": 87.5}
+    assert cache.get("k") is None
+    cache.put("k", value)
+    assert cache.get("k") == value
+    assert cache.stats["memory_hits"] == 1
+
+    # A new process starts with an empty memory tier but the same files
+    reopened = ResultCache(str(tmp_path))
+    assert reopened.disk_size == value_size(value)
+    assert reopened.get("k") == value
+    assert reopened.stats["disk_hits"] == 1
+    assert reopened.get("k") == value
+    assert (reopened.hits, reopened.misses) == (2, 0)
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    value = {"text": "x" * 100}
+    cache = ResultCache(str(tmp_path), memory_bytes=2 * value_size(value))
+    cache.put("a", value)
+    cache.put("b", value)
+    cache.get("a")
+    cache.put("c", value)
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.memory_size == 2 * value_size(value)
+    # Still served from disk
+    assert cache.get("b") == value
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    value = {"text": "x" * 100}
+    cache = ResultCache(str(tmp_path), disk_bytes=2 * value_size(value))
+    for i, key in enumerate(["a", "b"]):
+        cache.put(key, value)
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    # The disk index is read from the file times on startup
+    cache = ResultCache(str(tmp_path), disk_bytes=2 * value_size(value))
+    cache.put("c", value)
+    assert sorted(cache._disk) == ["b", "c"]
+    assert not os.path.exists(cache._path("a"))
+    assert cache.disk_size == 2 * value_size(value)
+
+    cache.clear()
+    assert (cache.disk_size, cache.memory_size) == (0, 0)
+    assert cache.get("c") is None
@@ -0,0 +1,85 @@
+# tests/test_search_index.py
+import json
+import os
+
+from src.columnar_cache import open_corpus
+from src.search_index import SearchIndex, open_search_index, parse_query, tokens
+
+DOCS = [
+    (0, {"title": "Credit risk of commercial banks", "abstract": "Bank credit risk and loan defaults.", "authors": ["A. Li"]}),
+    (1, {"title": "Stock returns", "abstract": "We find that credit spreads predict risk premia.", "authors": ["B. Wang"]}),
+    (2, {"title": "绿色金融与企业创新", "abstract": "本文研究绿色金融对企业创新的影响。", "authors": ["张三"]}),
+    (3, {"title": "Asset pricing with risk", "abstract": "Risk factors and credit.", "authors": ["Credit Suisse Research"]}),
+]
+
+
+def hits(index, query):
+    return index.search(query)[0].tolist()
+
+
+def test_cjk_text_is_indexed_as_bigrams():
+    assert tokens("Bank 绿色金融") == ["bank", "绿色", "色金", "金融", "融"]
+    assert parse_query('credit "asset pricing"') == [("prefix", "credit"), ("phrase", ["asset", "pricing"])]
+
+
+def test_prefix_phrase_and_cjk_queries():
+    index = SearchIndex.build(DOCS)
+    assert sorted(hits(index, "cred")) == [0, 1, 3]
+    assert sorted(hits(index, "credit risk")) == [0, 1, 3]
+    assert hits(index, '"credit risk"') == [0]
+    assert hits(index, "绿色金融") == [2]
+    assert hits(index, "色金 zzz") == []
+    assert hits(index, '""') == []
+
+
+def test_bm25_prefers_title_matches_and_frequent_terms():
+    index = SearchIndex.build(DOCS)
+    # Title matches weigh three times an abstract match
+    assert hits(index, "credit risk")[0] == 0
+    docs, scores = index.search("risk", limit=2)
+    assert len(docs) == 2
+    assert scores[0] >= scores[1]
+
+
+def test_added_documents_are_searchable_and_ranked_like_a_rebuild(tmp_path):
+    index = SearchIndex.build(DOCS[:2])
+    index.add_documents(DOCS[2:])
+    assert len(index.segments) == 2
+    index.save(str(tmp_path / "index"))
+    loaded = SearchIndex.load(str(tmp_path / "index"))
+    rebuilt = SearchIndex.build(DOCS)
+    for query in ["credit", '"credit risk"', "绿色", "risk"]:
+        docs, scores = loaded.search(query)
+        expected_docs, expected_scores = rebuilt.search(query)
+        assert docs.tolist() == expected_docs.tolist()
+        assert scores.tolist() == expected_scores.tolist()
+
+
+def write_corpus(path, docs):
+    with open(path, "w", encoding="utf-8") as f:
+        for doc_id, fields in docs:
+            f.write(json.dumps(dict(fields, id=doc_id, year=2024), ensure_ascii=False) + "\n")
+
+
+def test_appended_papers_extend_the_previous_index(tmp_path):
+    path = str(tmp_path / "papers.jsonl")
+    write_corpus(path, DOCS[:2])
+    first = open_search_index(open_corpus(path))
+    assert hits(first, "绿色") == []
+
+    write_corpus(path, DOCS)
+    os.utime(path, ns=(1, 1))
+    corpus = open_corpus(path)
+    assert os.path.exists(os.path.join(corpus.cache_dir, "search_index.previous"))
+    extended = open_search_index(corpus)
+    # The two original papers kept their segment; the new ones got another
+    assert len(extended.segments) == 2
+    assert hits(extended, "绿色") == [2]
+    assert not os.path.exists(os.path.join(corpus.cache_dir, "search_index.previous"))
+
+    # Edited (not appended) papers: the index is rebuilt
+    write_corpus(path, DOCS[1:])
+    os.utime(path, ns=(2, 2))
+    rebuilt = open_search_index(open_corpus(path))
+    assert len(rebuilt.segments) == 1
+    assert hits(rebuilt, "绿色") == [1]
@@ -0,0 +1,89 @@
+# tests/test_similarity.py
+import json
+import os
+import random
+
+import numpy as np
+
+from src import similarity
+from src.similarity import SimilarityIndex, open_similarity_index
+
+TOPICS = [
+    "green bond carbon emission climate disclosure",
+    "bank credit loan default capital requirement",
+    "option pricing stochastic volatility implied surface",
+    "绿色金融 碳排放 环境信息披露",
+]
+FILLER = "we study the effect of on firms evidence from data model".split()
+
+
+def papers(n_per_topic=60, seed=0):
+    rng = random.Random(seed)
+    titles, abstracts, topics = [], [], []
+    for i in range(n_per_topic * len(TOPICS)):
+        topic = i % len(TOPICS)
+        words = TOPICS[topic].split()
+        titles.append(" ".join(rng.sample(words, 2)))
+        abstracts.append(" ".join(rng.choice(words) if rng.random() < 0.5 else rng.choice(FILLER) for _ in range(40)))
+        topics.append(topic)
+    return titles, abstracts, np.array(topics)
+
+
+def test_related_papers_share_the_topic(tmp_path):
+    titles, abstracts, topics = papers()
+    path = str(tmp_path / "related_index")
+    SimilarityIndex.build(titles, abstracts, path, batch_size=50)
+    index = SimilarityIndex.load(path)
+    assert len(index) == len(titles) and index.n_lists == 1
+    assert np.allclose(np.linalg.norm(index.vectors, axis=1), 1.0, atol=1e-5)
+
+    for row in [0, 1, 2, 3, 101]:
+        rows, scores = index.related(row, k=10)
+        assert row not in rows
+        assert (topics[rows] == topics[row]).all()
+        assert (np.diff(scores) <= 1e-6).all()
+
+    rows, _ = index.similar(index.vectorize("carbon emission of green bond issuers"), k=5)
+    assert (topics[rows] == 0).all()
+
+
+def test_ivf_search_with_every_cluster_is_exact(tmp_path, monkeypatch):
+    monkeypatch.setattr(similarity, "IVF_MIN_DOCS", 100)
+    titles, abstracts, topics = papers(n_per_topic=100, seed=1)
+    path = str(tmp_path / "related_index")
+    SimilarityIndex.build(titles, abstracts, path)
+    index = SimilarityIndex.load(path)
+    assert index.n_lists == 20
+    assert sorted(index.rows.tolist()) == list(range(len(titles)))
+
+    for row in [0, 7, 250]:
+        exact_rows, exact_scores = index.related(row, k=10, exact=True)
+        ivf_rows, ivf_scores = index.similar(index.vector(row), k=10, exclude=row, exact=False, probes=index.n_lists)
+        assert ivf_rows.tolist() == exact_rows.tolist()
+        assert np.allclose(ivf_scores, exact_scores)
+        approximate, _ = index.related(row, k=10)
+        assert (topics[approximate] == topics[row]).all()
+
+
+class FakeCorpus:
+    def __init__(self, cache_dir, titles, abstracts):
+        self.cache_dir = cache_dir
+        self._texts = {"title": titles, "abstract": abstracts}
+
+    def texts(self, name):
+        return self._texts[name]
+
+
+def test_indexes_of_another_version_are_rebuilt(tmp_path):
+    titles, abstracts, _ = papers(n_per_topic=5)
+    corpus = FakeCorpus(str(tmp_path), titles, abstracts)
+    index = open_similarity_index(corpus)
+    meta_path = os.path.join(str(tmp_path), "related_index", "meta.json")
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    assert meta["dim"] == similarity.VECTOR_DIM
+
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(dict(meta, dim=256), f)
+    rebuilt = open_similarity_index(corpus)
+    assert rebuilt.vectors.shape == index.vectors.shape == (len(titles), similarity.VECTOR_DIM)
@@ -0,0 +1,28 @@
+# tests/test_taxonomy.py
+from src.classifier import CATEGORY_KEYWORDS, KEYWORD_MATCHER
+from src.taxonomy import CATEGORIES, DEFAULT_LINK, TAXONOMY
+from src.text_model import FINANCE_CATEGORIES
+
+
+def test_one_id_per_concept():
+    assert len(set(TAXONOMY.names)) == len(TAXONOMY)
+    assert len(set(TAXONOMY.names_zh)) == len(TAXONOMY)
+    for chinese, english in [("金融科技", "Fintech"), ("货币政策", "Monetary Policy"),
+                             ("绿色金融", "Green Finance"), ("数字金融", "Digital Finance"),
+                             ("Financial Technology", "Fintech")]:
+        assert TAXONOMY.id(chinese) == TAXONOMY.id(english)
+
+
+def test_text_model_classes_come_from_the_flag():
+    flagged = [c[0] for c in CATEGORIES if c[4]]
+    assert FINANCE_CATEGORIES == flagged
+    assert "Climate Finance" not in FINANCE_CATEGORIES
+
+
+def test_keyword_categories_are_canonical():
+    assert list(TAXONOMY.names[KEYWORD_MATCHER.category_ids]) == list(CATEGORY_KEYWORDS)
+
+
+def test_unknown_names():
+    assert TAXONOMY.ids(["Fintech", "No Such Category"]).tolist() == [TAXONOMY.id("Fintech"), -1]
+    assert TAXONOMY.link("No Such Category") == DEFAULT_LINK
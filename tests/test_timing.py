@@ -0,0 +1,62 @@
+# tests/test_timing.py
+import json
+
+import pytest
+
+from src.timing import RingBuffer, StageTimer
+
+
+def test_ring_buffer_keeps_the_last_samples():
+    buffer = RingBuffer(3)
+    for value in range(5):
+        buffer.append(float(value))
+    assert buffer.values() == [2.0, 3.0, 4.0]
+    assert buffer.count == 5
+
+
+def test_stages_and_summary():
+    timer = StageTimer(capacity=4)
+    for seconds in [0.001, 0.002, 0.003, 0.004, 0.010]:
+        timer.record("search", seconds)
+
+    @timer.timed("classify")
+    def classify(text):
+        raise ValueError(text)
+
+    with pytest.raises(ValueError):
+        classify("failed calls are timed too")
+    with timer.stage("filters"):
+        pass
+
+    rows = {row["stage"]: row for row in timer.summary()}
+    assert set(rows) == {"search", "classify", "filters"}
+    search = rows["search"]
+    assert search["calls"] == 5
+    assert (search["last_ms"], search["max_ms"]) == (10.0, 10.0)
+    assert search["p50_ms"] == 3.5
+    assert rows["classify"]["calls"] == 1
+
+    timer.reset()
+    assert timer.summary() == []
+
+
+def test_disabled_timer_records_nothing():
+    timer = StageTimer(enabled=False)
+    with timer.stage("search"):
+        pass
+    assert timer.timed("classify")(lambda: 42)() == 42
+    timer.record("filters", 1.0)
+    assert timer.samples() == {}
+
+
+def test_export_appends_snapshots(tmp_path):
+    timer = StageTimer()
+    timer.record("search", 0.0125)
+    path = str(tmp_path / "metrics" / "stage_timings.jsonl")
+    timer.export(path)
+    timer.export(path)
+    with open(path, encoding="utf-8") as f:
+        snapshots = [json.loads(line) for line in f]
+    assert len(snapshots) == 2
+    assert snapshots[0]["samples_ms"] == {"search": [12.5]}
+    assert snapshots[0]["summary"][0]["stage"] == "search"